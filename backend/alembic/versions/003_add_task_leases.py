@@ -0,0 +1,40 @@
+"""Add task claim leases
+
+Revision ID: 003_add_task_leases
+Revises: 002_add_cli_agent_support
+Create Date: 2026-10-16 20:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '003_add_task_leases'
+down_revision = '002_add_cli_agent_support'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add claim lease columns and claim indexes to tasks table"""
+    # Replica currently holding the task and when its claim lapses
+    op.add_column('tasks', sa.Column('claimed_by', sa.String(255), nullable=True))
+    op.add_column('tasks', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Partial indexes keep the claim scan limited to claimable rows
+    op.create_index(
+        'idx_tasks_claimable', 'tasks', ['priority', 'created_at'],
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    op.create_index(
+        'idx_tasks_lease_expiry', 'tasks', ['lease_expires_at'],
+        postgresql_where=sa.text("lease_expires_at IS NOT NULL")
+    )
+
+
+def downgrade():
+    """Remove claim lease columns and indexes"""
+    op.drop_index('idx_tasks_lease_expiry', table_name='tasks')
+    op.drop_index('idx_tasks_claimable', table_name='tasks')
+    op.drop_column('tasks', 'lease_expires_at')
+    op.drop_column('tasks', 'claimed_by')
@@ -0,0 +1,62 @@
+"""Add workflow checkpoints
+
+Revision ID: 004_add_workflow_checkpoints
+Revises: 003_add_task_leases
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '004_add_workflow_checkpoints'
+down_revision = '003_add_task_leases'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add tables holding workflow execution and per-stage checkpoints"""
+    op.create_table(
+        'workflow_checkpoints',
+        sa.Column('execution_id', sa.String(255), primary_key=True),
+        sa.Column('workflow_id', sa.String(255), nullable=False),
+        sa.Column('status', sa.String(50), server_default='running'),
+        sa.Column('metadata', postgresql.JSONB(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('idx_workflow_checkpoints_workflow', 'workflow_checkpoints', ['workflow_id'])
+    op.create_index('idx_workflow_checkpoints_status', 'workflow_checkpoints', ['status'])
+    
+    op.create_table(
+        'workflow_stage_checkpoints',
+        sa.Column('task_id', sa.String(255), primary_key=True),
+        sa.Column(
+            'execution_id', sa.String(255),
+            sa.ForeignKey('workflow_checkpoints.execution_id', ondelete='CASCADE'),
+            nullable=False
+        ),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('task_type', sa.String(50), nullable=False),
+        sa.Column('priority', sa.Integer(), server_default='3'),
+        sa.Column('dependencies', postgresql.JSONB(), nullable=True),
+        sa.Column('context', postgresql.JSONB(), nullable=True),
+        sa.Column('payload', postgresql.JSONB(), nullable=True),
+        sa.Column('status', sa.String(50), server_default='pending'),
+        sa.Column('assigned_agent', sa.String(255), nullable=True),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('idx_workflow_stage_checkpoints_execution', 'workflow_stage_checkpoints', ['execution_id'])
+
+
+def downgrade():
+    """Remove workflow checkpoint tables"""
+    op.drop_index('idx_workflow_stage_checkpoints_execution', table_name='workflow_stage_checkpoints')
+    op.drop_table('workflow_stage_checkpoints')
+    op.drop_index('idx_workflow_checkpoints_status', table_name='workflow_checkpoints')
+    op.drop_index('idx_workflow_checkpoints_workflow', table_name='workflow_checkpoints')
+    op.drop_table('workflow_checkpoints')
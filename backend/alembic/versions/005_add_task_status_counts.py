@@ -0,0 +1,86 @@
+"""Add trigger-maintained task status counters
+
+Revision ID: 005_add_task_status_counts
+Revises: 004_add_workflow_checkpoints
+Create Date: 2026-10-16 21:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '005_add_task_status_counts'
+down_revision = '004_add_workflow_checkpoints'
+branch_labels = None
+depends_on = None
+
+# Applies per-statement status deltas from the transition tables, so bulk
+# inserts and cleanups touch each counter row once
+MAINTAIN_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_task_status_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_status_counts (status, count)
+        SELECT COALESCE(status, 'unknown'), COUNT(*) FROM new_rows GROUP BY 1
+        ON CONFLICT (status) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_status_counts (status, count)
+        SELECT COALESCE(status, 'unknown'), -COUNT(*) FROM old_rows GROUP BY 1
+        ON CONFLICT (status) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO task_status_counts (status, count)
+        SELECT status, SUM(delta) FROM (
+            SELECT COALESCE(status, 'unknown') AS status, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT COALESCE(status, 'unknown') AS status, 1 AS delta FROM new_rows
+        ) deltas
+        GROUP BY status
+        HAVING SUM(delta) <> 0
+        ON CONFLICT (status) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade():
+    """Add task_status_counts, its maintenance triggers and the initial counts"""
+    op.create_table(
+        'task_status_counts',
+        sa.Column('status', sa.String(50), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0')
+    )
+    
+    op.execute(MAINTAIN_COUNTS_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts()
+    """)
+    
+    # Seed from the existing rows; the lock keeps writes out until the triggers own the counts
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        INSERT INTO task_status_counts (status, count)
+        SELECT COALESCE(status, 'unknown'), COUNT(*) FROM tasks GROUP BY 1
+    """)
+
+
+def downgrade():
+    """Remove task status counters"""
+    op.execute("DROP TRIGGER IF EXISTS tasks_status_counts_delete ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_status_counts_update ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_status_counts_insert ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS maintain_task_status_counts()")
+    op.drop_table('task_status_counts')
@@ -0,0 +1,50 @@
+"""Add composite indexes for keyset task listing
+
+Revision ID: 006_add_task_keyset_indexes
+Revises: 005_add_task_status_counts
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '006_add_task_keyset_indexes'
+down_revision = '005_add_task_status_counts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add (filter, created_at, id) indexes matching the task list sort order"""
+    op.create_index(
+        'idx_tasks_created', 'tasks',
+        [sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'idx_tasks_status_created', 'tasks',
+        ['status', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+    # The composite indexes lead with the same column, so they replace the
+    # single-column agent and workflow indexes
+    op.execute('DROP INDEX IF EXISTS idx_tasks_agent')
+    op.create_index(
+        'idx_tasks_agent_created', 'tasks',
+        ['assigned_agent_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.execute('DROP INDEX IF EXISTS idx_tasks_workflow')
+    op.create_index(
+        'idx_tasks_workflow_created', 'tasks',
+        ['workflow_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade():
+    """Restore single-column task indexes"""
+    op.drop_index('idx_tasks_workflow_created', table_name='tasks')
+    op.create_index('idx_tasks_workflow', 'tasks', ['workflow_id'])
+    op.drop_index('idx_tasks_agent_created', table_name='tasks')
+    op.create_index('idx_tasks_agent', 'tasks', ['assigned_agent_id'])
+    op.drop_index('idx_tasks_status_created', table_name='tasks')
+    op.drop_index('idx_tasks_created', table_name='tasks')
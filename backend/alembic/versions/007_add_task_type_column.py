@@ -0,0 +1,41 @@
+"""Promote task type to a column and index task metadata
+
+Revision ID: 007_add_task_type_column
+Revises: 006_add_task_keyset_indexes
+Create Date: 2026-10-16 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '007_add_task_type_column'
+down_revision = '006_add_task_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add indexed type column and GIN index on task metadata"""
+    op.add_column('tasks', sa.Column('type', sa.String(100), nullable=True))
+    op.execute("UPDATE tasks SET type = metadata->>'type' WHERE metadata ? 'type'")
+
+    # Same sort suffix as the other listing indexes so type-scoped pages seek too
+    op.create_index(
+        'idx_tasks_type_created', 'tasks',
+        ['type', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+
+    # jsonb_path_ops only serves @> containment, but is far smaller than the default opclass
+    op.create_index(
+        'idx_tasks_metadata', 'tasks', ['metadata'],
+        postgresql_using='gin',
+        postgresql_ops={'metadata': 'jsonb_path_ops'}
+    )
+
+
+def downgrade():
+    """Remove task type column and metadata index"""
+    op.drop_index('idx_tasks_metadata', table_name='tasks')
+    op.drop_index('idx_tasks_type_created', table_name='tasks')
+    op.drop_column('tasks', 'type')
@@ -0,0 +1,130 @@
+"""Partition tasks by day of creation
+
+Revision ID: 008_partition_tasks_by_day
+Revises: 007_add_task_type_column
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '008_partition_tasks_by_day'
+down_revision = '007_add_task_type_column'
+branch_labels = None
+depends_on = None
+
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_task_partition(day DATE) RETURNS boolean AS $$
+DECLARE
+    partition_name TEXT := 'tasks_p' || to_char(day, 'YYYYMMDD');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        day::timestamp AT TIME ZONE 'UTC',
+        (day + 1)::timestamp AT TIME ZONE 'UTC'
+    );
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Everything that hangs off tasks and is lost when the table is rebuilt
+TASK_INDEXES = [
+    "CREATE INDEX idx_tasks_status_priority ON tasks(status, priority DESC, created_at)",
+    "CREATE INDEX idx_tasks_created ON tasks(created_at DESC, id DESC)",
+    "CREATE INDEX idx_tasks_status_created ON tasks(status, created_at DESC, id DESC)",
+    "CREATE INDEX idx_tasks_agent_created ON tasks(assigned_agent_id, created_at DESC, id DESC)",
+    "CREATE INDEX idx_tasks_workflow_created ON tasks(workflow_id, created_at DESC, id DESC)",
+    "CREATE INDEX idx_tasks_type_created ON tasks(type, created_at DESC, id DESC)",
+    "CREATE INDEX idx_tasks_metadata ON tasks USING GIN (metadata jsonb_path_ops)",
+    "CREATE INDEX idx_tasks_claimable ON tasks(priority, created_at) WHERE status = 'pending'",
+    "CREATE INDEX idx_tasks_lease_expiry ON tasks(lease_expires_at) WHERE lease_expires_at IS NOT NULL",
+]
+
+TASK_FOREIGN_KEYS = [
+    "ALTER TABLE tasks ADD FOREIGN KEY (assigned_agent_id) REFERENCES agents(id) ON DELETE SET NULL",
+    "ALTER TABLE tasks ADD FOREIGN KEY (workflow_id) REFERENCES workflows(id) ON DELETE SET NULL",
+    "ALTER TABLE tasks ADD FOREIGN KEY (execution_id) REFERENCES executions(id) ON DELETE SET NULL",
+]
+
+TASK_TRIGGERS = [
+    """
+    CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts()
+    """,
+    """
+    CREATE TRIGGER tasks_status_counts_update AFTER UPDATE ON tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts()
+    """,
+    """
+    CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts()
+    """,
+]
+
+
+def _rebuild_tasks(create_table_sql, primary_key, after_create=()):
+    """Copy tasks into a table built by create_table_sql and swap it in.
+
+    The copy runs before the counter triggers are attached, so task_status_counts
+    stays valid without reseeding.
+    """
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    op.execute(create_table_sql)
+    op.execute("ALTER TABLE tasks RENAME TO tasks_old")
+    op.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    for statement in after_create:
+        op.execute(statement)
+
+    op.execute("INSERT INTO tasks SELECT * FROM tasks_old")
+    op.execute("DROP TABLE tasks_old")
+    op.execute(f"ALTER TABLE tasks ADD PRIMARY KEY ({primary_key})")
+
+    for statement in TASK_FOREIGN_KEYS + TASK_INDEXES + TASK_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    """Rebuild tasks as a daily range-partitioned table on created_at"""
+    # The partition key must be set on every row
+    op.execute("UPDATE tasks SET created_at = NOW() WHERE created_at IS NULL")
+    op.alter_column('tasks', 'created_at', nullable=False)
+
+    _rebuild_tasks(
+        """
+        CREATE TABLE tasks_new (LIKE tasks INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+        """,
+        'id, created_at',
+        after_create=[
+            ENSURE_PARTITION_FUNCTION,
+            "CREATE TABLE tasks_default PARTITION OF tasks DEFAULT",
+            # One partition per day of existing data, plus a week ahead
+            """
+            SELECT ensure_task_partition(day::date)
+            FROM generate_series(
+                (SELECT COALESCE(MIN(created_at), NOW()) AT TIME ZONE 'UTC' FROM tasks_old)::date,
+                (NOW() AT TIME ZONE 'UTC')::date + 7,
+                INTERVAL '1 day'
+            ) AS day
+            """,
+        ]
+    )
+
+
+def downgrade():
+    """Rebuild tasks as a single unpartitioned table"""
+    _rebuild_tasks(
+        "CREATE TABLE tasks_new (LIKE tasks INCLUDING DEFAULTS)",
+        'id'
+    )
+    op.execute("DROP FUNCTION IF EXISTS ensure_task_partition(date)")
+    op.alter_column('tasks', 'created_at', nullable=True)
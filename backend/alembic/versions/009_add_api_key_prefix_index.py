@@ -0,0 +1,25 @@
+"""Index API keys by prefix
+
+Revision ID: 009_add_api_key_prefix_index
+Revises: 008_partition_tasks_by_day
+Create Date: 2026-10-16 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009_add_api_key_prefix_index'
+down_revision = '008_partition_tasks_by_day'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add key_prefix index used to find the candidate key for validation"""
+    op.create_index('idx_api_keys_key_prefix', 'api_keys', ['key_prefix'])
+
+
+def downgrade():
+    """Remove key_prefix index"""
+    op.drop_index('idx_api_keys_key_prefix', table_name='api_keys')
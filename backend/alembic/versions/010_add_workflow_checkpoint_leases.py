@@ -0,0 +1,35 @@
+"""Add workflow checkpoint leases
+
+Revision ID: 010_add_workflow_checkpoint_leases
+Revises: 009_add_api_key_prefix_index
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010_add_workflow_checkpoint_leases'
+down_revision = '009_add_api_key_prefix_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add owner and lease columns to workflow checkpoints"""
+    # Replica driving the execution and when its lease lapses
+    op.add_column('workflow_checkpoints', sa.Column('owner', sa.String(255), nullable=True))
+    op.add_column('workflow_checkpoints', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Resume only scans running executions for lapsed leases
+    op.create_index(
+        'idx_workflow_checkpoints_lease_expiry', 'workflow_checkpoints', ['lease_expires_at'],
+        postgresql_where=sa.text("status = 'running'")
+    )
+
+
+def downgrade():
+    """Remove workflow checkpoint lease columns"""
+    op.drop_index('idx_workflow_checkpoints_lease_expiry', table_name='workflow_checkpoints')
+    op.drop_column('workflow_checkpoints', 'lease_expires_at')
+    op.drop_column('workflow_checkpoints', 'owner')
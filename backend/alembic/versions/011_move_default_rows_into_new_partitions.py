@@ -0,0 +1,74 @@
+"""Move default-partition rows into newly created task partitions
+
+Revision ID: 011_move_default_rows_into_new_partitions
+Revises: 010_add_workflow_checkpoint_leases
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '011_move_default_rows_into_new_partitions'
+down_revision = '010_add_workflow_checkpoint_leases'
+branch_labels = None
+depends_on = None
+
+# Rows for a day can land in tasks_default while its partition is missing (e.g.
+# after a long outage), and CREATE TABLE ... PARTITION OF then fails. Build the
+# partition standalone, move those rows into it and attach it instead.
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_task_partition(day DATE) RETURNS boolean AS $$
+DECLARE
+    partition_name TEXT := 'tasks_p' || to_char(day, 'YYYYMMDD');
+    day_start TIMESTAMPTZ := day::timestamp AT TIME ZONE 'UTC';
+    day_end TIMESTAMPTZ := (day + 1)::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE tasks INCLUDING DEFAULTS)', partition_name);
+    IF to_regclass('tasks_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM tasks_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            day_start, day_end, partition_name
+        );
+    END IF;
+    EXECUTE format(
+        'ALTER TABLE tasks ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, day_start, day_end
+    );
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_task_partition(day DATE) RETURNS boolean AS $$
+DECLARE
+    partition_name TEXT := 'tasks_p' || to_char(day, 'YYYYMMDD');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF tasks FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        day::timestamp AT TIME ZONE 'UTC',
+        (day + 1)::timestamp AT TIME ZONE 'UTC'
+    );
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade():
+    """Let ensure_task_partition take over rows already in the default partition"""
+    op.execute(ENSURE_PARTITION_FUNCTION)
+
+
+def downgrade():
+    """Restore the ensure_task_partition that fails on default-partition rows"""
+    op.execute(PREVIOUS_ENSURE_PARTITION_FUNCTION)
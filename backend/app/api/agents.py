@@ -27,7 +27,9 @@ from ..core.auth_deps import get_current_user_context
 
 router = APIRouter()
 
-from app.core.database import SessionLocal
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
 from app.models.agent import Agent as ORMAgent
 
 
@@ -75,8 +77,8 @@ async def get_agents(
         HTTPException: If database query fails
     """
     try:
-        with SessionLocal() as db:
-            db_agents = db.query(ORMAgent).all()
+        async with AsyncSessionLocal() as db:
+            db_agents = (await db.execute(select(ORMAgent))).scalars().all()
             agents_list = []
             for db_agent in db_agents:
                 agent_model = AgentModel(
@@ -176,8 +178,8 @@ async def register_agent(
     
     try:
         # Check if agent ID already exists
-        with SessionLocal() as db:
-            existing_agent = db.query(ORMAgent).filter(ORMAgent.id == agent_data.id).first()
+        async with AsyncSessionLocal() as db:
+            existing_agent = await db.get(ORMAgent, agent_data.id)
             if existing_agent:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -263,8 +265,8 @@ async def get_agent(
         HTTPException: If agent not found or query fails
     """
     try:
-        with SessionLocal() as db:
-            db_agent = db.query(ORMAgent).filter(ORMAgent.id == agent_id).first()
+        async with AsyncSessionLocal() as db:
+            db_agent = await db.get(ORMAgent, agent_id)
             if not db_agent:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -356,8 +358,8 @@ async def unregister_agent(
         )
     
     try:
-        with SessionLocal() as db:
-            db_agent = db.query(ORMAgent).filter(ORMAgent.id == agent_id).first()
+        async with AsyncSessionLocal() as db:
+            db_agent = await db.get(ORMAgent, agent_id)
             if not db_agent:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -375,8 +377,8 @@ async def unregister_agent(
             hive_coordinator.remove_agent(agent_id)
             
             # Remove from database
-            db.delete(db_agent)
-            db.commit()
+            await db.delete(db_agent)
+            await db.commit()
             
     except HTTPException:
         raise
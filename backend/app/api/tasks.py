@@ -18,6 +18,7 @@ from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,8 @@ from ..models.responses import (
     TaskListResponse,
     TaskCreationResponse,
     TaskCreationRequest,
+    TaskBatchCreationRequest,
+    TaskBatchCreationResponse,
     TaskModel,
     ErrorResponse
 )
@@ -125,7 +128,7 @@ async def create_task(
         
         # Create task using coordinator
         try:
-            task = coordinator.create_task(
+            task = await coordinator.create_task(
                 task_type=agent_type,
                 context=task_data.context,
                 priority=task_data.priority
@@ -175,6 +178,165 @@ async def create_task(
         )
 
 
+@router.post(
+    "/tasks/batch",
+    response_model=TaskBatchCreationResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create many development tasks at once",
+    description="""
+    Create and submit up to 5000 development tasks in a single request.
+    
+    Intended for fan-out workloads such as CI pipelines that request a review task
+    per changed file. The whole batch costs one HTTP request and one database transaction.
+    
+    **Batch Creation Process:**
+    1. Validate every task specification in one pass
+    2. Reject the whole batch if any specification is invalid
+    3. Persist all tasks with batched multi-row inserts in one transaction
+    4. Hand the batch to the coordinator in one scheduling call
+    5. Return the created task IDs in request order
+    
+    Each task accepts the same fields as `POST /tasks`.
+    """,
+    responses={
+        201: {"description": "All tasks created and queued successfully"},
+        400: {"model": ErrorResponse, "description": "One or more invalid task configurations"},
+        500: {"model": ErrorResponse, "description": "Batch creation failed"}
+    }
+)
+async def create_tasks_batch(
+    batch: TaskBatchCreationRequest,
+    coordinator: UnifiedCoordinator = Depends(get_coordinator),
+    current_user: Dict[str, Any] = Depends(get_current_user_context)
+) -> TaskBatchCreationResponse:
+    """
+    Create a batch of development tasks and submit them for execution.
+    
+    Args:
+        batch: Task configurations to create
+        coordinator: Unified coordinator instance for task management
+        current_user: Current authenticated user context
+        
+    Returns:
+        TaskBatchCreationResponse: IDs of the created tasks
+        
+    Raises:
+        HTTPException: If any task is invalid or the batch cannot be persisted
+    """
+    if not coordinator:
+        raise coordinator_unavailable_error()
+    
+    # Validate all task types before touching the database
+    specs = []
+    invalid = []
+    for index, task_data in enumerate(batch.tasks):
+        try:
+            specs.append((AgentType(task_data.type), task_data.context, task_data.priority))
+        except ValueError:
+            invalid.append(f"tasks[{index}]: invalid task type {task_data.type}")
+    if invalid:
+        raise validation_error("tasks", "; ".join(invalid))
+    
+    try:
+        tasks = await coordinator.create_tasks(specs)
+    except Exception as e:
+        logger.error(f"Batch task creation failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create tasks: {str(e)}"
+        )
+    
+    return JSONResponse(
+        status_code=201,
+        content={
+            "status": "success",
+            "timestamp": datetime.utcnow().isoformat(),
+            "task_ids": [task.id for task in tasks],
+            "count": len(tasks),
+            "message": f"{len(tasks)} tasks created successfully"
+        }
+    )
+
+
+@router.get(
+    "/tasks/archive",
+    status_code=status.HTTP_200_OK,
+    summary="Query archived tasks",
+    description="""
+    Query completed and failed tasks that retention has moved out of the tasks table.
+    
+    Expired tasks are written to compressed segments on disk before they are removed
+    from the database, so history stays available for capacity planning without
+    growing the hot table.
+    
+    **Query Behaviour:**
+    - Each segment's manifest (time range, statuses, types, agents) is checked first,
+      and segments that cannot match are never read
+    - Remaining segments are streamed and filtered row by row
+    - Results are returned oldest segment first, up to `limit` rows
+    """,
+    responses={
+        200: {"description": "Archived tasks retrieved successfully"},
+        404: {"model": ErrorResponse, "description": "Task archive not enabled"},
+        500: {"model": ErrorResponse, "description": "Failed to query archive"}
+    }
+)
+async def get_archived_tasks(
+    created_after: Optional[datetime] = Query(None, description="Only tasks created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only tasks created before this time"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by final task status"),
+    task_type: Optional[str] = Query(None, alias="type", description="Filter by task type"),
+    agent: Optional[str] = Query(None, description="Filter by assigned agent ID"),
+    limit: int = Query(1000, description="Maximum number of tasks to return", ge=1, le=10000),
+    coordinator: UnifiedCoordinator = Depends(get_coordinator),
+    current_user: Dict[str, Any] = Depends(get_current_user_context)
+) -> Dict[str, Any]:
+    """
+    Query archived tasks with predicate pushdown to segment manifests.
+    
+    Args:
+        created_after: Optional lower bound on task creation time
+        created_before: Optional upper bound on task creation time
+        status_filter: Optional final status filter
+        task_type: Optional task type filter
+        agent: Optional agent ID filter
+        limit: Maximum number of tasks to return
+        coordinator: Unified coordinator instance
+        current_user: Current authenticated user context
+        
+    Returns:
+        Dict with matching archived tasks and segment scan counts
+        
+    Raises:
+        HTTPException: If archiving is disabled or the scan fails
+    """
+    if not coordinator:
+        raise coordinator_unavailable_error()
+    
+    archive = coordinator.task_service.archive
+    if not archive:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task archive is not enabled"
+        )
+    
+    try:
+        return jsonable_encoder(await asyncio.to_thread(
+            archive.query,
+            created_after=created_after,
+            created_before=created_before,
+            status=status_filter,
+            task_type=task_type,
+            agent_id=agent,
+            limit=limit
+        ))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to query task archive: {str(e)}"
+        )
+
+
 @router.get(
     "/tasks/{task_id}",
     response_model=TaskModel,
@@ -234,7 +396,7 @@ async def get_task(
         raise coordinator_unavailable_error()
     
     try:
-        task = coordinator.get_task_status(task_id)
+        task = await coordinator.get_task_status(task_id)
         if not task:
             raise task_not_found_error(task_id)
         
@@ -273,12 +435,13 @@ async def get_task(
     This endpoint provides powerful querying capabilities for task management:
     
     **Filtering Options:**
-    - **Status**: Filter by execution status (pending, in_progress, completed, failed)
+    - **Status**: Filter by execution status (pending, assigned, in_progress, completed, failed)
     - **Agent**: Filter by assigned agent ID or specialization
     - **Workflow**: Filter by workflow ID for workflow-related tasks
     - **User**: Filter by user who created the task
     - **Date Range**: Filter by creation or completion date
     - **Priority**: Filter by task priority level
+    - **Type**: Filter by task type
     
     **Sorting Options:**
     - **Created Date**: Most recent first (default)
@@ -288,7 +451,8 @@ async def get_task(
     
     **Performance Features:**
     - Efficient database indexing for fast queries
-    - Pagination support for large result sets
+    - Cursor pagination: pass `next_cursor` from the previous page as `cursor`
+      (deep pages cost the same as the first; `offset` is kept for compatibility)
     - Streaming responses for real-time updates
     - Caching for frequently accessed data
     
@@ -306,13 +470,15 @@ async def get_task(
     }
 )
 async def get_tasks(
-    status: Optional[str] = Query(None, description="Filter by task status (pending, in_progress, completed, failed)"),
+    status: Optional[str] = Query(None, description="Filter by task status (pending, assigned, in_progress, completed, failed)"),
     agent: Optional[str] = Query(None, description="Filter by assigned agent ID"),
     workflow_id: Optional[str] = Query(None, description="Filter by workflow ID"),
     user_id: Optional[str] = Query(None, description="Filter by user who created the task"),
     priority: Optional[int] = Query(None, description="Filter by priority level (1-5)", ge=1, le=5),
+    task_type: Optional[str] = Query(None, alias="type", description="Filter by task type"),
     limit: int = Query(50, description="Maximum number of tasks to return", ge=1, le=1000),
     offset: int = Query(0, description="Number of tasks to skip for pagination", ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     coordinator: UnifiedCoordinator = Depends(get_coordinator),
     current_user: Dict[str, Any] = Depends(get_current_user_context)
 ) -> TaskListResponse:
@@ -325,8 +491,10 @@ async def get_tasks(
         workflow_id: Optional workflow ID filter
         user_id: Optional user ID filter
         priority: Optional priority level filter
+        task_type: Optional task type filter
         limit: Maximum number of tasks to return
         offset: Number of tasks to skip for pagination
+        cursor: Opaque cursor returned as next_cursor by the previous page
         coordinator: Unified coordinator instance
         current_user: Current authenticated user context
         
@@ -341,42 +509,59 @@ async def get_tasks(
     
     try:
         # Validate status filter
-        valid_statuses = ["pending", "in_progress", "completed", "failed", "cancelled", "timeout"]
+        valid_statuses = ["pending", "assigned", "in_progress", "completed", "failed", "cancelled", "timeout"]
         if status and status not in valid_statuses:
             raise validation_error("status", f"Must be one of: {', '.join(valid_statuses)}")
         
+        # Validate pagination cursor
+        after = None
+        if cursor:
+            if offset:
+                raise validation_error("cursor", "Cannot be combined with offset")
+            try:
+                after = coordinator.task_service.decode_cursor(cursor)
+            except ValueError:
+                raise validation_error("cursor", "Malformed pagination cursor")
+        
         # Get tasks from database with filtering
+        next_cursor = None
         try:
-            db_tasks = coordinator.task_service.get_tasks(
+            db_tasks = await coordinator.task_service.get_tasks(
                 status=status,
                 agent_id=agent,
                 workflow_id=workflow_id,
                 limit=limit,
-                offset=offset
+                offset=offset,
+                after=after,
+                task_type=task_type
             )
-            
             # Convert ORM tasks to response models
             tasks = []
             for orm_task in db_tasks:
-                coordinator_task = coordinator.task_service.coordinator_task_from_orm(orm_task)
+                task = coordinator.task_service.coordinator_task_from_orm(orm_task)
                 task_model = TaskModel(
-                    id=coordinator_task.id,
-                    type=coordinator_task.type.value,
-                    priority=coordinator_task.priority,
-                    status=coordinator_task.status.value,
-                    context=coordinator_task.context,
-                    assigned_agent=coordinator_task.assigned_agent,
-                    result=coordinator_task.result,
-                    created_at=coordinator_task.created_at,
-                    completed_at=coordinator_task.completed_at,
-                    error_message=getattr(coordinator_task, 'error_message', None)
+                    id=task["id"],
+                    type=task["type"],
+                    priority=task["priority"],
+                    status=task["status"],
+                    context=task["context"],
+                    assigned_agent=task["assigned_agent"],
+                    result=task.get("result"),
+                    created_at=task["created_at"],
+                    started_at=task["started_at"],
+                    completed_at=task["completed_at"],
+                    error_message=task.get("error_message")
                 )
                 tasks.append(task_model)
             
+            if len(db_tasks) == limit:
+                next_cursor = coordinator.task_service.encode_cursor(db_tasks[-1])
+            
             source = "database"
             
         except Exception as db_error:
-            # Fallback to in-memory tasks
+            # Fallback to in-memory tasks; cursors only apply to the database listing
+            next_cursor = None
             all_tasks = coordinator.get_all_tasks()
             
             # Apply filters
@@ -390,6 +575,8 @@ async def get_tasks(
                     continue
                 if priority and task.get("priority") != priority:
                     continue
+                if task_type and task.get("type") != task_type:
+                    continue
                     
                 filtered_tasks.append(task)
             
@@ -423,15 +610,18 @@ async def get_tasks(
             "workflow_id": workflow_id,
             "user_id": user_id,
             "priority": priority,
+            "type": task_type,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "cursor": cursor
         }
         
         return TaskListResponse(
             tasks=tasks,
             total=len(tasks),
-            filtered=any(v is not None for v in [status, agent, workflow_id, user_id, priority]),
+            filtered=any(v is not None for v in [status, agent, workflow_id, user_id, priority, task_type]),
             filters_applied=filters_applied,
+            next_cursor=next_cursor,
             message=f"Retrieved {len(tasks)} tasks from {source}"
         )
         
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
@@ -30,6 +31,34 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the request path and coordinator bookkeeping; the sync
+# engine above remains for scripts, migrations and schema creation
+def _async_database_url(url: str) -> str:
+    """Switch a database URL to its asyncio driver"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+if "sqlite" in ASYNC_DATABASE_URL:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=False
+    )
+
+# Objects stay usable after commit, since async sessions cannot lazy-load on attribute access
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 @event.listens_for(engine, "connect")
@@ -56,6 +85,16 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Async database session dependency"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logging.error(f"Database error: {e}")
+            await db.rollback()
+            raise
+
 def test_database_connection():
     """Test database connectivity"""
     try:
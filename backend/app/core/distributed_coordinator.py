@@ -5,24 +5,37 @@ Enhanced orchestration system for cluster-wide development workflows
 
 import asyncio
 import time
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import aiohttp
 import redis.asyncio as redis
-from prometheus_client import Counter, Histogram, Gauge
+from prometheus_client import Counter, Gauge
 import logging
+import random
 from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import heapq
+import itertools
 import json
 import hashlib
+import uuid
+import zlib
+
+from .ollama_streaming import OLLAMA_STREAM_RESPONSES, stream_generate, socketio_progress
+from .task_stream import RedisTaskStream, StreamEntry
+from ..services.performance_service import TASK_COUNTER, TASK_DURATION, ACTIVE_TASKS, AGENT_UTILIZATION, TIME_TO_FIRST_TOKEN
 
 logger = logging.getLogger(__name__)
 
-# Performance Metrics
-TASK_COUNTER = Counter('hive_tasks_total', 'Total tasks processed', ['task_type', 'agent'])
-TASK_DURATION = Histogram('hive_task_duration_seconds', 'Task execution time', ['task_type', 'agent'])
-ACTIVE_TASKS = Gauge('hive_active_tasks', 'Currently active tasks', ['agent'])
-AGENT_UTILIZATION = Gauge('hive_agent_utilization', 'Agent utilization percentage', ['agent'])
+# Performance Metrics (the per-task series are shared with the performance service)
+COALESCED_TASKS = Counter('hive_coalesced_tasks_total', 'Tasks served by an identical in-flight agent call (GPU calls saved)', ['task_type'])
+MODEL_PREWARMS = Counter('hive_model_prewarms_total', 'Model load requests issued ahead of a dependent stage', ['agent'])
+HEDGED_REQUESTS = Counter('hive_hedged_requests_total', 'Hedged agent calls by which attempt finished first', ['winner'])
+CIRCUIT_STATE = Gauge('hive_agent_circuit_state', 'Agent circuit breaker state (0 closed, 1 half-open, 2 open)', ['agent'])
+CACHE_LOOKUPS = Counter('hive_result_cache_lookups_total', 'Result cache lookups', ['tier', 'outcome'])
+CACHE_EVICTIONS = Counter('hive_result_cache_evictions_total', 'Entries evicted from the in-process result cache')
+CACHE_SIZE = Gauge('hive_result_cache_bytes', 'Bytes held by the in-process result cache')
 
 class TaskType(Enum):
     """Task types for specialized agent assignment"""
@@ -41,6 +54,113 @@ class TaskPriority(Enum):
     NORMAL = 3
     LOW = 4
 
+# Result cache TTLs (seconds) per task type
+DEFAULT_CACHE_TTL = 3600
+RESULT_CACHE_TTLS = {
+    TaskType.CODE_GENERATION: 3600,
+    TaskType.CODE_REVIEW: 1800,
+    TaskType.TESTING: 1800,
+    TaskType.COMPILATION: 900,
+    TaskType.OPTIMIZATION: 3600,
+    TaskType.DOCUMENTATION: 7200,
+    TaskType.DEPLOYMENT: 600,
+}
+
+# Extra selection cost for agents that would have to load their model first
+COLD_MODEL_PENALTY = 0.5
+
+# Random agents probed per selection; if none is free the rest of the pool is scanned,
+# and only when no agent has a slot does the task park until one releases a slot
+SELECTION_PROBES = 8
+
+# Weight of the newest sample in an agent's EWMA latency
+LATENCY_EWMA_ALPHA = 0.3
+
+# Generation token budget sent to agents
+DEFAULT_NUM_PREDICT = 4000
+
+# How long a pre-warmed model should stay loaded while its upstream stage runs
+PREWARM_KEEP_ALIVE = "10m"
+
+# Prompt template per task type, filled from the task payload
+TASK_PROMPTS = {
+    TaskType.CODE_GENERATION: """
+You are an expert software developer. Generate high-quality, production-ready code based on the requirements.
+
+Requirements: {requirements}
+Context: {context}
+Target Language: {target_language}
+
+Please provide:
+1. Clean, well-documented code
+2. Error handling
+3. Performance considerations
+4. Test examples
+
+Code:
+""",
+    TaskType.CODE_REVIEW: """
+You are a senior code reviewer. Analyze the provided code for quality, security, and performance issues.
+
+Please review for:
+1. Code quality and maintainability
+2. Security vulnerabilities
+3. Performance bottlenecks
+4. Best practices compliance
+5. Documentation completeness
+
+Provide specific feedback and improvement suggestions.
+
+Code Review:
+""",
+    TaskType.TESTING: """
+You are a testing specialist. Create comprehensive tests for the provided code.
+
+Test Types Required: {test_types}
+
+Please provide:
+1. Unit tests with edge cases
+2. Integration tests
+3. Performance tests
+4. Test documentation
+
+Tests:
+""",
+    TaskType.COMPILATION: """
+You are a build and deployment specialist. Analyze the code and provide compilation/build instructions.
+
+Build Configuration: {build_config}
+
+Please provide:
+1. Build scripts
+2. Dependency management
+3. Optimization flags
+4. Deployment configuration
+
+Build Instructions:
+""",
+    TaskType.OPTIMIZATION: """
+You are a performance optimization expert. Analyze and optimize the provided code.
+
+Optimization Targets: {optimization_targets}
+
+Please provide:
+1. Performance analysis
+2. Bottleneck identification
+3. Optimization recommendations
+4. Benchmarking strategies
+
+Optimization Report:
+"""
+}
+
+# Payload fields that identify a task rather than shape its output
+TASK_IDENTIFIER_FIELDS = ("workflow_id", "task_id")
+
+def normalize_model_name(name: str) -> str:
+    """Normalize an Ollama model name so untagged names match their :latest tag"""
+    return name if ":" in name else f"{name}:latest"
+
 @dataclass
 class Agent:
     """Enhanced agent representation with performance tracking"""
@@ -53,8 +173,19 @@ class Agent:
     current_load: int = 0
     performance_score: float = 1.0
     last_response_time: float = 0.0
+    ewma_latency: float = 0.0
     connection_pool: Optional[aiohttp.TCPConnector] = None
     health_status: str = "healthy"
+    loaded_models: Optional[Set[str]] = None  # Models resident in VRAM per /api/ps, None if unknown
+    concurrency_limit: Optional["AdaptiveConcurrencyLimit"] = None
+    circuit_breaker: Optional["CircuitBreaker"] = None
+    
+    @property
+    def model_resident(self) -> bool:
+        """Whether the agent's model is loaded (assumed so when residency is unknown)"""
+        if self.loaded_models is None:
+            return True
+        return normalize_model_name(self.model) in self.loaded_models
     
     def __post_init__(self):
         """Initialize connection pool for this agent"""
@@ -64,6 +195,14 @@ class Agent:
             keepalive_timeout=30,
             enable_cleanup_closed=True
         )
+        # Configured max_concurrent is where the adaptive limit starts and the most it may allow
+        if self.concurrency_limit is None:
+            self.concurrency_limit = AdaptiveConcurrencyLimit(
+                initial_limit=self.max_concurrent,
+                max_limit=self.max_concurrent
+            )
+        if self.circuit_breaker is None:
+            self.circuit_breaker = CircuitBreaker(self.id)
 
 @dataclass
 class Task:
@@ -74,33 +213,126 @@ class Task:
     payload: Dict[str, Any]
     dependencies: List[str] = field(default_factory=list)
     estimated_duration: float = 0.0
+    critical_path: float = 0.0  # Expected seconds from this task's start to the end of its DAG
     created_at: float = field(default_factory=time.time)
     assigned_agent: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
     status: str = "pending"
     subtasks: List[str] = field(default_factory=list)
+    preferred_agent: Optional[str] = None  # Agent whose model was pre-warmed for this task
+    
+    @property
+    def prompt(self) -> str:
+        """The prompt sent to the agent, built from the task's payload"""
+        prompt_template = TASK_PROMPTS.get(self.type, "Complete the following task: {payload}")
+        return prompt_template.format(**self.payload)
     
     @property
     def cache_key(self) -> str:
-        """Generate cache key for task result"""
-        payload_hash = hashlib.md5(json.dumps(self.payload, sort_keys=True).encode()).hexdigest()
-        return f"task_result:{self.type.value}:{payload_hash}"
+        """Generate cache key for task result
+        
+        Only what the generation sees goes into the key, so identical stages of
+        different workflows share one result.
+        """
+        try:
+            inputs = {"prompt": self.prompt}
+        except (KeyError, IndexError):
+            inputs = {k: v for k, v in self.payload.items() if k not in TASK_IDENTIFIER_FIELDS}
+        inputs["model"] = self.payload.get("model")
+        inputs_hash = hashlib.md5(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+        return f"task_result:{self.type.value}:{inputs_hash}"
+    
+    def to_record(self) -> Dict[str, Any]:
+        """Serialize the task for the shared task store"""
+        return {
+            "id": self.id,
+            "type": self.type.value,
+            "priority": self.priority.value,
+            "payload": self.payload,
+            "dependencies": self.dependencies,
+            "estimated_duration": self.estimated_duration,
+            "critical_path": self.critical_path,
+            "created_at": self.created_at,
+            "assigned_agent": self.assigned_agent,
+            "result": self.result,
+            "status": self.status,
+            "preferred_agent": self.preferred_agent
+        }
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Task":
+        """Rebuild a task from its stored record"""
+        return cls(
+            id=record["id"],
+            type=TaskType(record["type"]),
+            priority=TaskPriority(record["priority"]),
+            payload=record["payload"],
+            dependencies=record.get("dependencies", []),
+            estimated_duration=record.get("estimated_duration", 0.0),
+            critical_path=record.get("critical_path", 0.0),
+            created_at=record.get("created_at", time.time()),
+            assigned_agent=record.get("assigned_agent"),
+            result=record.get("result"),
+            status=record.get("status", "pending"),
+            preferred_agent=record.get("preferred_agent")
+        )
 
 class DistributedCoordinator:
     """Enhanced coordinator for distributed development workflows"""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379",
+                 cache_ttls: Optional[Dict[TaskType, int]] = None,
+                 local_cache_bytes: int = 64 * 1024 * 1024,
+                 stream_responses: Optional[bool] = None,
+                 hedge_requests: bool = False,
+                 lease_timeout: float = 120.0,
+                 prefetch: int = 32):
         self.agents: Dict[str, Agent] = {}
         self.tasks: Dict[str, Task] = {}
+        # Reverse-dependency index: task id -> ids of tasks waiting on it
+        self.dependents: Dict[str, Set[str]] = {}
+        # Number of not-yet-completed dependencies per task
+        self.remaining_dependencies: Dict[str, int] = {}
         self.active_sessions: Dict[str, aiohttp.ClientSession] = {}
         self.redis = redis.from_url(redis_url)
-        self.task_queue = asyncio.Queue()
-        self.result_cache = {}
+        # Ready tasks are published to a Redis stream shared by all coordinator replicas;
+        # each replica leases entries from it while it has capacity
+        self.task_stream = RedisTaskStream(self.redis, lease_timeout=lease_timeout)
+        self.prefetch = prefetch
+        # Stream entry leased by this replica for each task it holds
+        self.stream_entries: Dict[str, str] = {}
+        # Leased tasks ordered by _queue_key, with insertion order breaking ties
+        self.task_queue = asyncio.PriorityQueue()
+        self._queue_sequence = itertools.count()
+        # Tasks waiting for a free agent slot, kept as one heap per task type
+        self.parked_tasks: Dict[TaskType, List[Tuple[Tuple[int, float], int, Task]]] = {}
+        self.running_tasks: Set[asyncio.Task] = set()
+        # Agents with a model pre-warm request in flight
+        self.prewarming_agents: Set[str] = set()
+        # Singleflight: cache key of an in-flight task -> identical tasks waiting on its result
+        self.inflight_tasks: Dict[str, List[Task]] = {}
+        # In-process tier in front of the Redis result cache
+        self.result_cache = LocalResultCache(max_bytes=local_cache_bytes)
+        self.cache_ttls = {**RESULT_CACHE_TTLS, **(cache_ttls or {})}
         self.executor = ThreadPoolExecutor(max_workers=20)
         
+        # Streaming generation forwards partial output to Socket.IO rooms when a manager is attached
+        self.stream_responses = OLLAMA_STREAM_RESPONSES if stream_responses is None else stream_responses
+        self.socketio_manager = None
+        
+        # Re-issue tasks to a second agent once they run past the first agent's p95
+        self.hedge_requests = hedge_requests
+        
         # Performance tracking
         self.performance_history: Dict[str, List[float]] = {}
+        # All agents, the specialization index and healthy-agent counts for constant-time
+        # selection, kept in step by add_agent/remove_agent
+        self.agent_pool: List[Agent] = []
+        self.agents_by_type: Dict[TaskType, List[Agent]] = {}
+        self.healthy_counts: Dict[TaskType, int] = {}
+        self.started = False
         self.load_balancer = AdaptiveLoadBalancer()
+        self.duration_predictor = TaskDurationPredictor()
         
         # Cluster configuration based on CLUSTER_INFO.md
         self._initialize_cluster_agents()
@@ -146,27 +378,66 @@ class DistributedCoordinator:
         }
         
         for agent_id, config in cluster_config.items():
-            self.agents[agent_id] = Agent(
+            self.add_agent(Agent(
                 id=agent_id,
                 endpoint=config["endpoint"],
                 model=config["model"],
                 gpu_type=config["gpu_type"],
                 specializations=config["specializations"],
                 max_concurrent=config["max_concurrent"]
-            )
+            ))
+    
+    def add_agent(self, agent: Agent):
+        """Register an agent and add it to the selection indexes"""
+        if agent.id in self.agents:
+            raise ValueError(f"Agent {agent.id} is already registered")
+        
+        self.agents[agent.id] = agent
+        self.agent_pool.append(agent)
+        for task_type in agent.specializations:
+            self.agents_by_type.setdefault(task_type, []).append(agent)
+            if agent.health_status == "healthy":
+                self.healthy_counts[task_type] = self.healthy_counts.get(task_type, 0) + 1
+        
+        if self.started:
+            self._open_session(agent)
+    
+    async def remove_agent(self, agent_id: str):
+        """Unregister an agent; tasks already running on it are left to finish"""
+        agent = self.agents.pop(agent_id, None)
+        if not agent:
+            return
+        
+        self.agent_pool.remove(agent)
+        for task_type in agent.specializations:
+            self.agents_by_type[task_type].remove(agent)
+            if agent.health_status == "healthy":
+                self.healthy_counts[task_type] -= 1
+        
+        session = self.active_sessions.pop(agent_id, None)
+        if session:
+            await session.close()
+    
+    def _open_session(self, agent: Agent):
+        """Create the HTTP session used for requests to an agent"""
+        self.active_sessions[agent.id] = aiohttp.ClientSession(
+            connector=agent.connection_pool,
+            timeout=aiohttp.ClientTimeout(total=120)
+        )
     
     async def start(self):
         """Start the distributed coordinator"""
         logger.info("Starting Distributed Development Coordinator")
         
         # Initialize agent sessions
-        for agent in self.agents.values():
-            self.active_sessions[agent.id] = aiohttp.ClientSession(
-                connector=agent.connection_pool,
-                timeout=aiohttp.ClientTimeout(total=120)
-            )
+        self.started = True
+        for agent in self.agent_pool:
+            self._open_session(agent)
         
         # Start background tasks
+        await self.task_stream.ensure_group()
+        asyncio.create_task(self._stream_reader())
+        asyncio.create_task(self._lease_keeper())
         asyncio.create_task(self._task_processor())
         asyncio.create_task(self._health_monitor())
         asyncio.create_task(self._performance_optimizer())
@@ -175,7 +446,8 @@ class DistributedCoordinator:
     
     async def submit_workflow(self, workflow: Dict[str, Any]) -> str:
         """Submit a complete development workflow for distributed execution"""
-        workflow_id = f"workflow_{int(time.time())}"
+        # Replicas share the task stream, so ids must not collide across them
+        workflow_id = f"workflow_{uuid.uuid4().hex}"
         
         # Parse workflow into tasks
         tasks = self._parse_workflow_to_tasks(workflow, workflow_id)
@@ -256,260 +528,601 @@ class DistributedCoordinator:
         """Schedule tasks with dependency resolution"""
         for task in tasks:
             self.tasks[task.id] = task
-            
+            task.estimated_duration = self._estimate_duration(task)
+        
+        for task in tasks:
+            self._index_dependencies(task)
+        
+        self._compute_critical_paths(tasks)
+        
+        await self.task_stream.save(
+            [self._task_record(task) for task in tasks],
+            {task.id: self.remaining_dependencies[task.id] for task in tasks}
+        )
+        
+        for task in tasks:
             # Check if dependencies are met
             if await self._dependencies_satisfied(task):
-                await self.task_queue.put(task)
+                await self._enqueue(task)
+    
+    def _index_dependencies(self, task: Task):
+        """Register a task in the reverse-dependency index"""
+        remaining = 0
+        for dep_id in task.dependencies:
+            dep_task = self.tasks.get(dep_id)
+            if dep_task and dep_task.status == "completed":
+                continue
+            self.dependents.setdefault(dep_id, set()).add(task.id)
+            remaining += 1
+        self.remaining_dependencies[task.id] = remaining
     
     async def _dependencies_satisfied(self, task: Task) -> bool:
         """Check if all task dependencies are satisfied"""
-        for dep_id in task.dependencies:
-            if dep_id not in self.tasks or self.tasks[dep_id].status != "completed":
-                return False
-        return True
+        return self.remaining_dependencies.get(task.id, 0) == 0
     
-    async def _task_processor(self):
-        """Main task processing loop with distributed execution"""
+    def _estimate_duration(self, task: Task) -> float:
+        """Predict a task's duration, averaged over the agents it could be routed to"""
+        candidates = self.agents_by_type.get(task.type) or self.agent_pool
+        if not candidates:
+            return 0.0
+        
+        try:
+            prompt_size = len(self._build_task_prompt(task))
+        except (KeyError, IndexError):
+            prompt_size = len(json.dumps(task.payload))
+        
+        estimates = [
+            self.duration_predictor.predict(task.type, agent, prompt_size, DEFAULT_NUM_PREDICT)
+            for agent in candidates
+        ]
+        return sum(estimates) / len(estimates)
+    
+    def _compute_critical_paths(self, tasks: List[Task]):
+        """Set each DAG task's critical path: its own duration plus the longest chain of dependents"""
+        paths: Dict[str, float] = {}
+        
+        def critical_path(task_id: str, visiting: Set[str]) -> float:
+            if task_id in paths:
+                return paths[task_id]
+            task = self.tasks.get(task_id)
+            if not task or task_id in visiting:
+                return 0.0
+            
+            visiting.add(task_id)
+            longest_tail = max(
+                (critical_path(dep_id, visiting) for dep_id in self.dependents.get(task_id, ())),
+                default=0.0
+            )
+            visiting.discard(task_id)
+            
+            paths[task_id] = task.estimated_duration + longest_tail
+            return paths[task_id]
+        
+        for task in tasks:
+            # Independent tasks are ordered by their own duration instead
+            if task.dependencies or self.dependents.get(task.id):
+                task.critical_path = critical_path(task.id, set())
+    
+    def _queue_key(self, task: Task) -> Tuple[int, float]:
+        """Dispatch order: priority, then longest critical path first for DAG tasks
+        or shortest expected duration first for independent tasks"""
+        if task.critical_path > 0:
+            return (task.priority.value, -task.critical_path)
+        return (task.priority.value, task.estimated_duration)
+    
+    def _task_record(self, task: Task) -> Dict[str, Any]:
+        """Stored form of a task, carrying its dependents so any replica can release them"""
+        record = task.to_record()
+        record["dependents"] = sorted(self.dependents.get(task.id, ()))
+        return record
+    
+    async def _enqueue(self, task: Task):
+        """Publish a ready task to the shared task stream"""
+        await self.task_stream.publish(task.id)
+    
+    async def _stream_reader(self):
+        """Lease tasks from the shared stream into the local dispatch queue while this replica has capacity"""
+        await self._accept_entries(await self.task_stream.read_own_pending())
         while True:
             try:
-                # Get tasks with concurrent processing
-                tasks_batch = []
-                for _ in range(min(10, self.task_queue.qsize())):
-                    if not self.task_queue.empty():
-                        task = await asyncio.wait_for(self.task_queue.get(), timeout=1.0)
-                        tasks_batch.append(task)
-                
-                if tasks_batch:
-                    await self._execute_tasks_batch(tasks_batch)
-                
-                await asyncio.sleep(0.1)
-                
-            except asyncio.TimeoutError:
-                continue
+                held = self.task_queue.qsize() + sum(len(parked) for parked in self.parked_tasks.values())
+                if held >= self.prefetch:
+                    # Leave the backlog in the stream for other replicas
+                    await asyncio.sleep(0.1)
+                    continue
+                await self._accept_entries(await self.task_stream.read(self.prefetch - held))
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"Error in task processor: {e}")
+                logger.error(f"Error reading task stream: {e}")
                 await asyncio.sleep(1)
     
-    async def _execute_tasks_batch(self, tasks: List[Task]):
-        """Execute a batch of tasks concurrently across available agents"""
-        execution_futures = []
+    async def _lease_keeper(self):
+        """Renew leases on held tasks and take over tasks whose lease expired elsewhere"""
+        while True:
+            try:
+                await asyncio.sleep(self.task_stream.lease_timeout / 3)
+                await self.task_stream.renew(self.stream_entries.values())
+                reclaimed, dead = await self.task_stream.reclaim()
+                await self._fail_dead_letters(dead)
+                if reclaimed:
+                    logger.info(f"Reclaimed {len(reclaimed)} tasks with expired leases")
+                await self._accept_entries(reclaimed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Lease keeper error: {e}")
+    
+    async def _accept_entries(self, entries: List[StreamEntry]):
+        """Queue leased stream entries for dispatch on this replica"""
+        records = await self.task_stream.load([task_id for _, task_id in entries])
         
-        for task in tasks:
-            # Check cache first
-            cached_result = await self._get_cached_result(task)
-            if cached_result:
-                task.result = cached_result
-                task.status = "completed"
+        for entry_id, task_id in entries:
+            if task_id in self.stream_entries:
+                # Already held here; keep the newest lease
+                self.stream_entries[task_id] = entry_id
+                continue
+            
+            task = self.tasks.get(task_id)
+            if task is None:
+                record = records.get(task_id)
+                if record is None:
+                    await self.task_stream.ack(entry_id)
+                    continue
+                task = Task.from_record(record)
+                self.tasks[task_id] = task
+                self.dependents[task_id] = set(record.get("dependents", []))
+            elif task_id in records:
+                # Another replica may have pre-warmed an agent for the task since it was submitted here
+                task.preferred_agent = records[task_id].get("preferred_agent")
+            
+            self.stream_entries[task_id] = entry_id
+            if task.status in ("completed", "failed"):
+                # Finished by a replica that died before acknowledging it
                 await self._handle_task_completion(task)
                 continue
             
-            # Select optimal agent
-            agent = await self._select_optimal_agent(task)
-            if agent and agent.current_load < agent.max_concurrent:
-                future = asyncio.create_task(self._execute_task(task, agent))
-                execution_futures.append(future)
-            else:
-                # Re-queue if no agent available
-                await self.task_queue.put(task)
-        
-        # Wait for batch completion
-        if execution_futures:
-            await asyncio.gather(*execution_futures, return_exceptions=True)
-    
-    async def _select_optimal_agent(self, task: Task) -> Optional[Agent]:
-        """Select the optimal agent for a task using performance-based load balancing"""
-        suitable_agents = [
-            agent for agent in self.agents.values()
-            if task.type in agent.specializations and agent.health_status == "healthy"
-        ]
+            await self.task_queue.put((self._queue_key(task), next(self._queue_sequence), task))
+    
+    async def _fail_dead_letters(self, entries: List[StreamEntry]):
+        """Mark tasks that exhausted their deliveries as failed, here and in the shared store"""
+        error = {"error": f"Task lease expired {self.task_stream.max_deliveries} times"}
+        for _, task_id in entries:
+            task = self.tasks.get(task_id)
+            if task and task.status not in ("completed", "failed"):
+                task.status = "failed"
+                task.result = error
         
-        if not suitable_agents:
-            # Fallback to any available agent
-            suitable_agents = [
-                agent for agent in self.agents.values()
-                if agent.health_status == "healthy"
-            ]
+        records = await self.task_stream.load([task_id for _, task_id in entries])
+        for record in records.values():
+            record["status"] = "failed"
+            record["result"] = error
+        if records:
+            await self.task_stream.save(list(records.values()))
+    
+    async def _task_processor(self):
+        """Main dispatch loop: hands each queued task to a free agent slot as soon as it arrives"""
+        while True:
+            try:
+                _, _, task = await self.task_queue.get()
+                await self._dispatch_task(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in task processor: {e}")
+    
+    async def _dispatch_task(self, task: Task):
+        """Start a task on a free agent slot, or park it until a slot frees up"""
+        # Check cache first
+        cached_result = await self._get_cached_result(task)
+        if cached_result:
+            task.result = cached_result
+            task.status = "completed"
+            await self._handle_task_completion(task)
+            return
         
-        if not suitable_agents:
-            return None
+        # Share the agent call of an identical task that is already in flight
+        cache_key = task.cache_key
+        if cache_key in self.inflight_tasks:
+            self.inflight_tasks[cache_key].append(task)
+            COALESCED_TASKS.labels(task_type=task.type.value).inc()
+            return
+        self.inflight_tasks[cache_key] = []
+        
+        # Queue behind already parked tasks of the same type rather than jumping them
+        if self.parked_tasks.get(task.type) or not await self._try_start_task(task):
+            heapq.heappush(
+                self.parked_tasks.setdefault(task.type, []),
+                (self._queue_key(task), next(self._queue_sequence), task)
+            )
+    
+    async def _try_start_task(self, task: Task, released: Optional[Agent] = None) -> bool:
+        """Reserve a slot on the optimal agent and start the task without waiting for it
         
-        # Select based on performance score and current load
-        best_agent = min(
-            suitable_agents,
-            key=lambda a: (a.current_load / a.max_concurrent) - (a.performance_score * 0.1)
+        An agent that just released a slot is offered the task ahead of random
+        sampling, which would usually miss a single free slot in a large busy pool.
+        """
+        agent = (
+            self._preferred_agent(task)
+            or self._released_agent(task, released)
+            or await self._select_optimal_agent(task)
         )
+        if not agent:
+            return False
+        
+        agent.current_load += 1
+        probe = agent.circuit_breaker.on_dispatch()
+        execution = asyncio.create_task(self._execute_task(task, agent, probe))
+        self.running_tasks.add(execution)
+        execution.add_done_callback(self.running_tasks.discard)
+        return True
+    
+    async def _dispatch_parked_tasks(self, released: Optional[Agent] = None):
+        """Place parked tasks now that agent capacity may have freed up, starting with
+        the agent whose slot was released, if any"""
+        for task_type in list(self.parked_tasks.keys()):
+            parked = self.parked_tasks[task_type]
+            while parked and await self._try_start_task(parked[0][2], released):
+                heapq.heappop(parked)
+            if not parked:
+                del self.parked_tasks[task_type]
+    
+    async def _select_optimal_agent(self, task: Task, exclude: Optional[Set[str]] = None) -> Optional[Agent]:
+        """Select an agent with power-of-two-choices over in-flight load and EWMA latency"""
+        if self.healthy_counts.get(task.type):
+            pool = self.agents_by_type[task.type]
+        else:
+            # Fallback to any available agent
+            pool = self.agent_pool
+        
+        choices = []
+        for agent in random.sample(pool, min(len(pool), SELECTION_PROBES)):
+            if self._agent_available(agent, exclude):
+                choices.append(agent)
+                if len(choices) == 2:
+                    break
         
-        return best_agent
+        if not choices:
+            # Every probed agent was busy; only park the task if the whole pool is
+            available = [agent for agent in pool if self._agent_available(agent, exclude)]
+            if not available:
+                return None
+            choices = random.sample(available, min(len(available), 2))
+        
+        return min(choices, key=self._selection_cost)
+    
+    def _agent_available(self, agent: Agent, exclude: Optional[Set[str]] = None) -> bool:
+        """Only healthy agents with a free concurrency slot and a closed circuit can take a task"""
+        return (
+            agent.health_status == "healthy"
+            and agent.current_load < agent.max_concurrent
+            and agent.circuit_breaker.allows_request()
+            and not (exclude and agent.id in exclude)
+        )
     
-    async def _execute_task(self, task: Task, agent: Agent):
+    def _preferred_agent(self, task: Task) -> Optional[Agent]:
+        """The agent pre-warmed for the task, if it can take the task right now"""
+        agent = self.agents.get(task.preferred_agent) if task.preferred_agent else None
+        if agent and self._agent_available(agent):
+            return agent
+        return None
+    
+    def _released_agent(self, task: Task, agent: Optional[Agent]) -> Optional[Agent]:
+        """The agent that just released a slot, if selection could have picked it for the task"""
+        if not agent or agent.id not in self.agents or not self._agent_available(agent):
+            return None
+        if task.type in agent.specializations or not self.healthy_counts.get(task.type):
+            return agent
+        return None
+    
+    def _selection_cost(self, agent: Agent) -> float:
+        """Expected cost of sending one more request to an agent"""
+        # Agents without latency history are treated as fast so they get sampled
+        latency = agent.ewma_latency or 1.0
+        cost = latency * (agent.current_load + 1)
+        if not agent.model_resident:
+            cost *= 1 + COLD_MODEL_PENALTY
+        return cost
+    
+    async def _execute_task(self, task: Task, agent: Agent, probe: bool = False):
         """Execute a single task on the selected agent"""
         task.assigned_agent = agent.id
         task.status = "executing"
-        agent.current_load += 1
         
-        start_time = time.time()
         ACTIVE_TASKS.labels(agent=agent.id).inc()
         
         try:
-            session = self.active_sessions[agent.id]
+            await self._prewarm_next_stage(task)
             
-            # Prepare payload for agent
-            agent_payload = {
-                "model": agent.model,
-                "prompt": self._build_task_prompt(task),
-                "stream": False,
-                "options": {
-                    "temperature": 0.1,
-                    "top_p": 0.9,
-                    "num_predict": 4000
-                }
-            }
+            # Execute task, possibly hedged onto a second agent
+            result, winner, execution_time = await self._run_generation(task, agent)
+            task.assigned_agent = winner.id
+            task.result = result
+            task.status = "completed"
+            
+            # Cache result
+            await self._cache_result(task, result)
+            
+            # Update performance metrics
+            winner.last_response_time = execution_time
+            self._update_agent_performance(winner.id, execution_time)
+            self.duration_predictor.record(task.type, winner, DEFAULT_NUM_PREDICT, result, execution_time)
+            
+            # Per-token latency tracks how loaded the GPU is independent of output length
+            latency_sample = execution_time / result["eval_count"] if result.get("eval_count") else execution_time
+            winner.max_concurrent = winner.concurrency_limit.on_sample(latency_sample, winner.current_load)
+            if winner.loaded_models is not None:
+                winner.loaded_models.add(normalize_model_name(winner.model))
+            
+            TASK_COUNTER.labels(task_type=task.type.value, agent=winner.id).inc()
+            TASK_DURATION.labels(task_type=task.type.value, agent=winner.id).observe(execution_time)
+            if result.get("time_to_first_token") is not None:
+                TIME_TO_FIRST_TOKEN.labels(task_type=task.type.value, agent=winner.id).observe(result["time_to_first_token"])
             
-            # Execute task
-            async with session.post(
-                f"{agent.endpoint}/api/generate",
-                json=agent_payload,
-                timeout=aiohttp.ClientTimeout(total=300)
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    task.result = result
-                    task.status = "completed"
-                    
-                    # Cache result
-                    await self._cache_result(task, result)
-                    
-                    # Update performance metrics
-                    execution_time = time.time() - start_time
-                    agent.last_response_time = execution_time
-                    self._update_agent_performance(agent.id, execution_time)
-                    
-                    TASK_COUNTER.labels(task_type=task.type.value, agent=agent.id).inc()
-                    TASK_DURATION.labels(task_type=task.type.value, agent=agent.id).observe(execution_time)
-                    
-                else:
-                    task.status = "failed"
-                    task.result = {"error": f"HTTP {response.status}"}
-                    
         except Exception as e:
             task.status = "failed"
             task.result = {"error": str(e)}
             logger.error(f"Task execution failed: {e}")
+            agent.max_concurrent = agent.concurrency_limit.on_drop()
             
         finally:
             agent.current_load -= 1
+            if probe:
+                agent.circuit_breaker.release_probe()
             ACTIVE_TASKS.labels(agent=agent.id).dec()
-            await self._handle_task_completion(task)
+            await self._finish_task(task)
+            await self._complete_coalesced_tasks(task)
+            await self._dispatch_parked_tasks(released=agent)
     
-    def _build_task_prompt(self, task: Task) -> str:
-        """Build optimized prompt for task execution"""
-        base_prompts = {
-            TaskType.CODE_GENERATION: """
-You are an expert software developer. Generate high-quality, production-ready code based on the requirements.
-
-Requirements: {requirements}
-Context: {context}
-Target Language: {target_language}
-
-Please provide:
-1. Clean, well-documented code
-2. Error handling
-3. Performance considerations
-4. Test examples
-
-Code:
-""",
-            TaskType.CODE_REVIEW: """
-You are a senior code reviewer. Analyze the provided code for quality, security, and performance issues.
-
-Please review for:
-1. Code quality and maintainability
-2. Security vulnerabilities
-3. Performance bottlenecks
-4. Best practices compliance
-5. Documentation completeness
-
-Provide specific feedback and improvement suggestions.
-
-Code Review:
-""",
-            TaskType.TESTING: """
-You are a testing specialist. Create comprehensive tests for the provided code.
-
-Test Types Required: {test_types}
-
-Please provide:
-1. Unit tests with edge cases
-2. Integration tests
-3. Performance tests
-4. Test documentation
-
-Tests:
-""",
-            TaskType.COMPILATION: """
-You are a build and deployment specialist. Analyze the code and provide compilation/build instructions.
-
-Build Configuration: {build_config}
-
-Please provide:
-1. Build scripts
-2. Dependency management
-3. Optimization flags
-4. Deployment configuration
-
-Build Instructions:
-""",
-            TaskType.OPTIMIZATION: """
-You are a performance optimization expert. Analyze and optimize the provided code.
-
-Optimization Targets: {optimization_targets}
-
-Please provide:
-1. Performance analysis
-2. Bottleneck identification
-3. Optimization recommendations
-4. Benchmarking strategies
-
-Optimization Report:
-"""
+    async def _prewarm_next_stage(self, task: Task):
+        """Load the models for dependents that only wait on this task, so they start warm
+        
+        Each dependent is pinned to the agent chosen for it, so its dispatch, on
+        whichever replica leases it, goes to the warm agent while that has a slot.
+        """
+        pinned = []
+        for dep_task_id in self.dependents.get(task.id, ()):
+            if self.remaining_dependencies.get(dep_task_id) != 1:
+                continue
+            dep_task = self.tasks.get(dep_task_id)
+            if not dep_task or dep_task.status != "pending":
+                continue
+            
+            agent = self._preferred_agent(dep_task) or await self._select_optimal_agent(dep_task)
+            if not agent:
+                continue
+            if dep_task.preferred_agent != agent.id:
+                dep_task.preferred_agent = agent.id
+                pinned.append(dep_task)
+            
+            if agent.id in self.prewarming_agents:
+                continue
+            if agent.loaded_models is not None and normalize_model_name(agent.model) in agent.loaded_models:
+                continue
+            
+            self.prewarming_agents.add(agent.id)
+            prewarm = asyncio.create_task(self._prewarm_agent_model(agent))
+            self.running_tasks.add(prewarm)
+            prewarm.add_done_callback(self.running_tasks.discard)
+        
+        if pinned:
+            # Store the pins before this task completes and releases its dependents;
+            # they are only a preference, so failing to store them must not fail the task
+            try:
+                await self.task_stream.save([self._task_record(dep_task) for dep_task in pinned])
+            except Exception as e:
+                logger.warning(f"Could not store pre-warmed agents for dependents of {task.id}: {e}")
+    
+    async def _prewarm_agent_model(self, agent: Agent):
+        """Ask an agent to load its model without generating anything"""
+        try:
+            session = self.active_sessions[agent.id]
+            async with session.post(
+                f"{agent.endpoint}/api/generate",
+                json={"model": agent.model, "keep_alive": PREWARM_KEEP_ALIVE},
+                timeout=aiohttp.ClientTimeout(total=120)
+            ) as response:
+                if response.status == 200:
+                    MODEL_PREWARMS.labels(agent=agent.id).inc()
+                    if agent.loaded_models is not None:
+                        agent.loaded_models.add(normalize_model_name(agent.model))
+        except Exception as e:
+            logger.debug(f"Model pre-warm failed for {agent.id}: {e}")
+        finally:
+            self.prewarming_agents.discard(agent.id)
+    
+    async def _run_generation(self, task: Task, agent: Agent) -> Tuple[Dict[str, Any], Agent, float]:
+        """Run the task on its agent, hedging on a second agent once it exceeds the first agent's p95
+        
+        Returns the result, the agent that produced it and that agent's latency.
+        """
+        primary = asyncio.create_task(self._generate_on(agent, task))
+        hedge_delay = self._hedge_delay(agent) if self.hedge_requests else None
+        if hedge_delay is None:
+            result, elapsed = await primary
+            return result, agent, elapsed
+        
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        hedge_agent = None if done else await self._select_optimal_agent(task, exclude={agent.id})
+        if not hedge_agent:
+            result, elapsed = await primary
+            return result, agent, elapsed
+        
+        hedge_agent.current_load += 1
+        hedge_probe = hedge_agent.circuit_breaker.on_dispatch()
+        ACTIVE_TASKS.labels(agent=hedge_agent.id).inc()
+        hedge = asyncio.create_task(self._generate_on(hedge_agent, task))
+        attempts = {primary: agent, hedge: hedge_agent}
+        
+        try:
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        HEDGED_REQUESTS.labels(winner="hedge" if attempt is hedge else "primary").inc()
+                        result, elapsed = attempt.result()
+                        return result, attempts[attempt], elapsed
+                    error = attempt.exception()
+            raise error
+        finally:
+            # Cancelling the loser closes its connection, which aborts the generation
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            hedge_agent.current_load -= 1
+            if hedge_probe:
+                hedge_agent.circuit_breaker.release_probe()
+            ACTIVE_TASKS.labels(agent=hedge_agent.id).dec()
+    
+    def _hedge_delay(self, agent: Agent) -> Optional[float]:
+        """The agent's p95 execution time, once enough history exists to trust it"""
+        history = self.performance_history.get(agent.id, [])
+        if len(history) < 20:
+            return None
+        ordered = sorted(history)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+    
+    async def _generate_on(self, agent: Agent, task: Task) -> Tuple[Dict[str, Any], float]:
+        """Run the task on one agent, feeding the outcome to its circuit breaker"""
+        start_time = time.time()
+        
+        # Prepare payload for agent
+        agent_payload = {
+            "model": agent.model,
+            "prompt": self._build_task_prompt(task),
+            "stream": False,
+            "options": {
+                "temperature": 0.1,
+                "top_p": 0.9,
+                "num_predict": DEFAULT_NUM_PREDICT
+            }
         }
         
-        prompt_template = base_prompts.get(task.type, "Complete the following task: {payload}")
-        return prompt_template.format(**task.payload)
+        try:
+            result = await self._generate(self.active_sessions[agent.id], agent, agent_payload, task)
+        except Exception:
+            agent.circuit_breaker.record_failure()
+            raise
+        
+        agent.circuit_breaker.record_success()
+        return result, time.time() - start_time
+    
+    async def _generate(self, session: aiohttp.ClientSession, agent: Agent,
+                        agent_payload: Dict[str, Any], task: Task) -> Dict[str, Any]:
+        """Run a generation on the agent, streaming partial output when enabled"""
+        timeout = aiohttp.ClientTimeout(total=300)
+        
+        if self.stream_responses:
+            return await stream_generate(
+                session,
+                agent.endpoint,
+                agent_payload,
+                timeout=timeout,
+                on_progress=socketio_progress(self.socketio_manager, task.id, agent.id)
+            )
+        
+        async with session.post(
+            f"{agent.endpoint}/api/generate",
+            json=agent_payload,
+            timeout=timeout
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status}")
+            return await response.json()
+    
+    async def _complete_coalesced_tasks(self, task: Task):
+        """Hand the result of a finished agent call to every identical task waiting on it"""
+        for waiting_task in self.inflight_tasks.pop(task.cache_key, []):
+            waiting_task.assigned_agent = task.assigned_agent
+            waiting_task.result = task.result
+            waiting_task.status = task.status
+            await self._finish_task(waiting_task)
+    
+    def _build_task_prompt(self, task: Task) -> str:
+        """Build optimized prompt for task execution"""
+        return task.prompt
     
     async def _get_cached_result(self, task: Task) -> Optional[Dict[str, Any]]:
-        """Get cached result for task if available"""
+        """Get cached result for task if available, checking the in-process tier first"""
+        cache_key = task.cache_key
+        result = self.result_cache.get(cache_key)
+        if result is not None:
+            CACHE_LOOKUPS.labels(tier="local", outcome="hit").inc()
+            return result
+        CACHE_LOOKUPS.labels(tier="local", outcome="miss").inc()
+        
         try:
-            cached = await self.redis.get(task.cache_key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(cache_key)
+                pipe.ttl(cache_key)
+                cached, remaining_ttl = await pipe.execute()
+            
             if cached:
-                return json.loads(cached)
+                CACHE_LOOKUPS.labels(tier="redis", outcome="hit").inc()
+                encoded = self._decompress_cached(cached)
+                result = json.loads(encoded)
+                ttl = remaining_ttl if remaining_ttl and remaining_ttl > 0 else self._cache_ttl(task)
+                self.result_cache.set(cache_key, result, len(encoded), ttl)
+                return result
+            CACHE_LOOKUPS.labels(tier="redis", outcome="miss").inc()
         except Exception as e:
             logger.warning(f"Cache retrieval failed: {e}")
         return None
     
     async def _cache_result(self, task: Task, result: Dict[str, Any]):
-        """Cache task result for future use"""
+        """Cache task result in both tiers for future use"""
+        ttl = self._cache_ttl(task)
+        encoded = json.dumps(result).encode()
+        self.result_cache.set(task.cache_key, result, len(encoded), ttl)
+        
         try:
-            await self.redis.setex(
-                task.cache_key,
-                3600,  # 1 hour TTL
-                json.dumps(result)
-            )
+            await self.redis.setex(task.cache_key, ttl, zlib.compress(encoded))
         except Exception as e:
             logger.warning(f"Cache storage failed: {e}")
     
+    def _cache_ttl(self, task: Task) -> int:
+        """Result cache TTL for a task's type"""
+        return self.cache_ttls.get(task.type, DEFAULT_CACHE_TTL)
+    
+    @staticmethod
+    def _decompress_cached(cached: bytes) -> bytes:
+        """Decode a Redis cache value, accepting entries written before compression"""
+        try:
+            return zlib.decompress(cached)
+        except zlib.error:
+            return cached
+    
+    async def _finish_task(self, task: Task):
+        """Complete a task that ran here without letting a task store error escape
+        
+        If the outcome cannot be stored, the lease is no longer renewed, so the
+        entry is redelivered and its completion retried from the local outcome.
+        """
+        try:
+            await self._handle_task_completion(task)
+        except Exception as e:
+            self.stream_entries.pop(task.id, None)
+            logger.error(f"Could not record completion of task {task.id}, retrying on redelivery: {e}")
+    
     async def _handle_task_completion(self, task: Task):
-        """Handle task completion and trigger dependent tasks"""
+        """Handle task completion, trigger dependent tasks and release the task's lease"""
+        # Persist the outcome before releasing anything so a redelivery sees it
+        await self.task_stream.save([self._task_record(task)])
+        
         if task.status == "completed":
-            # Check for dependent tasks
-            dependent_tasks = [
-                t for t in self.tasks.values()
-                if task.id in t.dependencies and t.status == "pending"
-            ]
-            
-            for dep_task in dependent_tasks:
-                if await self._dependencies_satisfied(dep_task):
-                    await self.task_queue.put(dep_task)
+            # Only the direct children of this task can become ready; the shared
+            # counter publishes each child exactly once, whichever replica finishes last
+            for dep_task_id in self.dependents.pop(task.id, ()):
+                remaining = await self.task_stream.release_dependency(task.id, dep_task_id)
+                if remaining >= 0:
+                    self.remaining_dependencies[dep_task_id] = remaining
+        
+        entry_id = self.stream_entries.pop(task.id, None)
+        if entry_id:
+            await self.task_stream.ack(entry_id)
     
     def _update_agent_performance(self, agent_id: str, execution_time: float):
         """Update agent performance metrics"""
@@ -524,7 +1137,14 @@ Optimization Report:
         
         # Update performance score (lower execution time = higher score)
         avg_time = sum(self.performance_history[agent_id]) / len(self.performance_history[agent_id])
-        self.agents[agent_id].performance_score = max(0.1, 1.0 / (avg_time + 1.0))
+        agent = self.agents[agent_id]
+        agent.performance_score = max(0.1, 1.0 / (avg_time + 1.0))
+        
+        # Decaying latency estimate used for agent selection
+        if agent.ewma_latency:
+            agent.ewma_latency += LATENCY_EWMA_ALPHA * (execution_time - agent.ewma_latency)
+        else:
+            agent.ewma_latency = execution_time
     
     async def _health_monitor(self):
         """Monitor agent health and availability"""
@@ -535,6 +1155,9 @@ Optimization Report:
                     health_checks.append(self._check_agent_health(agent))
                 
                 await asyncio.gather(*health_checks, return_exceptions=True)
+                
+                # Recovered agents may be able to take parked tasks
+                await self._dispatch_parked_tasks()
                 await asyncio.sleep(30)  # Check every 30 seconds
                 
             except Exception as e:
@@ -543,6 +1166,7 @@ Optimization Report:
     
     async def _check_agent_health(self, agent: Agent):
         """Check individual agent health"""
+        was_healthy = agent.health_status == "healthy"
         try:
             session = self.active_sessions[agent.id]
             async with session.get(f"{agent.endpoint}/api/tags", timeout=aiohttp.ClientTimeout(total=10)) as response:
@@ -550,39 +1174,68 @@ Optimization Report:
                     agent.health_status = "healthy"
                 else:
                     agent.health_status = "unhealthy"
+            
+            if agent.health_status == "healthy":
+                await self._refresh_loaded_models(agent, session)
         except Exception:
             agent.health_status = "unreachable"
         
+        # Keep the healthy-agent counts used by selection in step
+        is_healthy = agent.health_status == "healthy"
+        if is_healthy != was_healthy:
+            for task_type in agent.specializations:
+                self.healthy_counts[task_type] = self.healthy_counts.get(task_type, 0) + (1 if is_healthy else -1)
+        
         # Update utilization metric
         utilization = (agent.current_load / agent.max_concurrent) * 100
         AGENT_UTILIZATION.labels(agent=agent.id).set(utilization)
     
+    async def _refresh_loaded_models(self, agent: Agent, session: aiohttp.ClientSession):
+        """Poll the models currently resident in the agent's VRAM"""
+        try:
+            async with session.get(f"{agent.endpoint}/api/ps", timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    agent.loaded_models = {
+                        normalize_model_name(model.get("name") or model.get("model", ""))
+                        for model in data.get("models", [])
+                    }
+                else:
+                    # Older Ollama versions have no /api/ps; treat residency as unknown
+                    agent.loaded_models = None
+        except Exception as e:
+            logger.debug(f"Loaded model poll failed for {agent.id}: {e}")
+            agent.loaded_models = None
+    
     async def _performance_optimizer(self):
         """Background performance optimization"""
         while True:
             try:
-                await self._optimize_agent_parameters()
                 await self._cleanup_completed_tasks()
                 await asyncio.sleep(300)  # Optimize every 5 minutes
             except Exception as e:
                 logger.error(f"Performance optimizer error: {e}")
                 await asyncio.sleep(300)
     
-    async def _optimize_agent_parameters(self):
-        """Dynamically optimize agent parameters based on performance"""
-        for agent in self.agents.values():
-            if agent.id in self.performance_history:
-                avg_response_time = sum(self.performance_history[agent.id]) / len(self.performance_history[agent.id])
-                
-                # Adjust max_concurrent based on performance
-                if avg_response_time < 10:  # Fast responses
-                    agent.max_concurrent = min(agent.max_concurrent + 1, 10)
-                elif avg_response_time > 30:  # Slow responses
-                    agent.max_concurrent = max(agent.max_concurrent - 1, 1)
+    async def _refresh_tasks(self, tasks: List[Task]):
+        """Pick up progress other replicas made on locally known tasks"""
+        records = await self.task_stream.load([
+            task.id for task in tasks if task.id not in self.stream_entries
+        ])
+        for task in tasks:
+            record = records.get(task.id)
+            if record:
+                task.status = record["status"]
+                task.result = record.get("result")
+                task.assigned_agent = record.get("assigned_agent")
     
     async def _cleanup_completed_tasks(self):
         """Clean up old completed tasks"""
         cutoff_time = time.time() - 3600  # Keep tasks for 1 hour
+        await self._refresh_tasks([
+            task for task in self.tasks.values()
+            if task.status not in ["completed", "failed"] and task.created_at < cutoff_time
+        ])
         tasks_to_remove = [
             task_id for task_id, task in self.tasks.items()
             if task.status in ["completed", "failed"] and task.created_at < cutoff_time
@@ -590,6 +1243,9 @@ Optimization Report:
         
         for task_id in tasks_to_remove:
             del self.tasks[task_id]
+            self.remaining_dependencies.pop(task_id, None)
+            self.dependents.pop(task_id, None)
+        await self.task_stream.forget(tasks_to_remove)
     
     async def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
         """Get comprehensive workflow status"""
@@ -601,6 +1257,8 @@ Optimization Report:
         if not workflow_tasks:
             return {"error": "Workflow not found"}
         
+        await self._refresh_tasks(workflow_tasks)
+        
         total_tasks = len(workflow_tasks)
         completed_tasks = sum(1 for task in workflow_tasks if task.status == "completed")
         failed_tasks = sum(1 for task in workflow_tasks if task.status == "failed")
@@ -628,6 +1286,12 @@ Optimization Report:
         """Clean shutdown of coordinator"""
         logger.info("Shutting down Distributed Coordinator")
         
+        # Cancel in-flight executions
+        for execution in list(self.running_tasks):
+            execution.cancel()
+        if self.running_tasks:
+            await asyncio.gather(*self.running_tasks, return_exceptions=True)
+        
         # Close all sessions
         for session in self.active_sessions.values():
             await session.close()
@@ -638,6 +1302,244 @@ Optimization Report:
         logger.info("Coordinator shutdown complete")
 
 
+class LocalResultCache:
+    """Size-bounded in-process LRU cache with per-entry TTL"""
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        # key -> (expires_at, size_bytes, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached value, dropping it if expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, _, value = entry
+        if expires_at < time.time():
+            self._remove(key)
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Dict[str, Any], size: int, ttl: int):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        
+        self._entries[key] = (time.time() + ttl, size, value)
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            CACHE_EVICTIONS.inc()
+        
+        CACHE_SIZE.set(self.current_bytes)
+    
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+        CACHE_SIZE.set(self.current_bytes)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TaskDurationPredictor:
+    """Predicts task durations from recorded execution history
+    
+    Uses Ollama's token statistics where available: expected output tokens per
+    (task type, model), generation and prompt-processing rates per model, and
+    model load time. Falls back to wall-clock averages per (task type, agent)
+    and then per task type.
+    """
+    
+    # Rough characters-per-token ratio for estimating prompt tokens from text length
+    CHARS_PER_TOKEN = 4
+    
+    def __init__(self, smoothing: float = 0.2, default_duration: float = 60.0):
+        self.smoothing = smoothing
+        self.default_duration = default_duration
+        self.generation_rates: Dict[str, float] = {}  # model -> tokens/s
+        self.prompt_rates: Dict[str, float] = {}  # model -> tokens/s
+        self.load_times: Dict[str, float] = {}  # model -> seconds
+        self.output_tokens: Dict[Tuple[TaskType, str], float] = {}
+        self.agent_durations: Dict[Tuple[TaskType, str], float] = {}
+        self.type_durations: Dict[TaskType, float] = {}
+    
+    def _observe(self, table: Dict, key, value: float):
+        """Fold a sample into an exponential moving average"""
+        previous = table.get(key)
+        if previous is None:
+            table[key] = value
+        else:
+            table[key] = (1 - self.smoothing) * previous + self.smoothing * value
+    
+    def record(self, task_type: TaskType, agent: Agent, num_predict: int,
+               result: Dict[str, Any], duration: float):
+        """Record a completed execution"""
+        self._observe(self.agent_durations, (task_type, agent.id), duration)
+        self._observe(self.type_durations, task_type, duration)
+        
+        # Ollama reports durations in nanoseconds
+        eval_count = result.get("eval_count")
+        eval_duration = result.get("eval_duration")
+        if eval_count and eval_duration:
+            self._observe(self.generation_rates, agent.model, eval_count / (eval_duration / 1e9))
+            self._observe(self.output_tokens, (task_type, agent.model), min(eval_count, num_predict))
+        
+        prompt_eval_count = result.get("prompt_eval_count")
+        prompt_eval_duration = result.get("prompt_eval_duration")
+        if prompt_eval_count and prompt_eval_duration:
+            self._observe(self.prompt_rates, agent.model, prompt_eval_count / (prompt_eval_duration / 1e9))
+        
+        if result.get("load_duration") is not None:
+            self._observe(self.load_times, agent.model, result["load_duration"] / 1e9)
+    
+    def predict(self, task_type: TaskType, agent: Agent, prompt_size: int, num_predict: int) -> float:
+        """Predict the duration in seconds of a task on an agent"""
+        generation_rate = self.generation_rates.get(agent.model)
+        output_tokens = self.output_tokens.get((task_type, agent.model))
+        if generation_rate and output_tokens:
+            estimate = min(output_tokens, num_predict) / generation_rate
+            prompt_rate = self.prompt_rates.get(agent.model)
+            if prompt_rate:
+                estimate += (prompt_size / self.CHARS_PER_TOKEN) / prompt_rate
+            return estimate + self.load_times.get(agent.model, 0.0)
+        
+        if (task_type, agent.id) in self.agent_durations:
+            return self.agent_durations[(task_type, agent.id)]
+        return self.type_durations.get(task_type, self.default_duration)
+
+
+class CircuitBreaker:
+    """Per-agent circuit breaker driven by live request outcomes
+    
+    Opens after consecutive failures so the agent stops receiving tasks, then
+    after a cooldown lets a single probe request through (half-open) to decide
+    whether to close again.
+    """
+    
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    
+    def __init__(self, agent_id: str, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.agent_id = agent_id
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+    
+    def allows_request(self) -> bool:
+        """Whether a new request may be sent to the agent; never changes the state"""
+        if self.state == self.HALF_OPEN:
+            return not self.probe_in_flight
+        if self.state == self.OPEN:
+            # Once the cooldown has passed, the next dispatch becomes the probe
+            return time.time() - self.opened_at >= self.cooldown
+        return True
+    
+    def on_dispatch(self) -> bool:
+        """Note a request being sent and return whether it is the half-open probe"""
+        if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+    
+    def release_probe(self):
+        """Free the probe slot of a request that ended without an outcome, e.g. when cancelled"""
+        self.probe_in_flight = False
+    
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+            logger.info(f"Circuit closed for agent {self.agent_id}")
+    
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened for agent {self.agent_id} after {self.consecutive_failures} failures")
+            self._set_state(self.OPEN)
+            self.opened_at = time.time()
+    
+    def _set_state(self, state: str):
+        self.state = state
+        CIRCUIT_STATE.labels(agent=self.agent_id).set(self._STATE_VALUES[state])
+
+
+class AdaptiveConcurrencyLimit:
+    """Per-agent concurrency limit adjusted on every completion
+    
+    Follows the latency-gradient approach of Netflix's Gradient2 limiter: the
+    ratio of the agent's uncontended baseline latency to the latest sample
+    shrinks the limit once latency rises past the tolerance, and a headroom
+    term proportional to the limit lets it probe upwards while latency stays
+    flat. Failures back the limit off multiplicatively.
+    """
+    
+    def __init__(self, initial_limit: int, min_limit: int = 1, max_limit: int = 10,
+                 smoothing: float = 0.2, tolerance: float = 1.5,
+                 headroom: float = 0.1, backoff_ratio: float = 0.9):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.headroom = headroom
+        self.backoff_ratio = backoff_ratio
+        self.baseline_latency: Optional[float] = None
+    
+    @property
+    def current(self) -> int:
+        """Current limit as a whole number of slots"""
+        return max(self.min_limit, int(self.limit))
+    
+    def on_sample(self, latency: float, inflight: int) -> int:
+        """Fold in the latency of a successful request and return the new limit"""
+        if latency <= 0:
+            return self.current
+        
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        elif latency < self.baseline_latency or inflight <= 1:
+            # Follow faster samples down, but only a request running alone may raise
+            # the baseline, or it would drift up with the very load it should detect
+            self.baseline_latency += (latency - self.baseline_latency) * self.smoothing
+        
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline_latency / latency))
+        new_limit = self.limit * (gradient + self.headroom)
+        
+        # Samples taken well below the limit say nothing about higher concurrency
+        if inflight < self.limit / 2:
+            new_limit = min(new_limit, self.limit)
+        
+        self.limit = (1 - self.smoothing) * self.limit + self.smoothing * new_limit
+        self.limit = max(self.min_limit, min(self.max_limit, self.limit))
+        return self.current
+    
+    def on_drop(self) -> int:
+        """Back off after a failed or timed-out request and return the new limit"""
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        return self.current
+
+
 class AdaptiveLoadBalancer:
     """Adaptive load balancer for optimal task distribution"""
     
@@ -6,15 +6,23 @@ Orchestrates multiple Ollama agents for distributed ROCm development
 
 import asyncio
 import aiohttp
+import heapq
+import itertools
 import json
 import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 from enum import Enum
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from ..models.agent import Agent as ORMAgent
-from ..core.database import SessionLocal
+from ..core.database import SessionLocal, AsyncSessionLocal
 from ..cli_agents.cli_agent_manager import get_cli_agent_manager
+from .ollama_streaming import OLLAMA_STREAM_RESPONSES, stream_generate, socketio_progress
+from ..services.performance_service import TIME_TO_FIRST_TOKEN
+
+# Seconds between write-behind flushes of agent load to the agents table
+LOAD_FLUSH_INTERVAL = 5.0
 
 class AgentType(Enum):
     KERNEL_DEV = "kernel_dev"
@@ -58,13 +66,66 @@ class Task:
     created_at: float = None
     completed_at: Optional[float] = None
 
+class TaskScheduler:
+    """Priority queue of pending tasks with O(log n) enqueue/dequeue.
+
+    Tasks are kept in one binary heap per agent type, ordered by priority
+    (highest first) with FIFO tie-breaking on insertion order. Agents only
+    serve their own specialty, so types never compete for the same agent and
+    can be drained independently.
+    """
+
+    def __init__(self):
+        self._heaps: Dict[AgentType, List[Tuple[int, int, Task]]] = {}
+        self._counter = itertools.count()
+        self._size = 0
+
+    def push(self, task: Task):
+        """Enqueue a task"""
+        heap = self._heaps.setdefault(task.type, [])
+        heapq.heappush(heap, (-task.priority, next(self._counter), task))
+        self._size += 1
+
+    def pop(self, task_type: AgentType) -> Optional[Task]:
+        """Dequeue the highest priority task of the given type"""
+        heap = self._heaps.get(task_type)
+        if not heap:
+            return None
+        _, _, task = heapq.heappop(heap)
+        self._size -= 1
+        if not heap:
+            del self._heaps[task_type]
+        return task
+
+    def pending_types(self) -> List[AgentType]:
+        """Agent types that currently have queued tasks"""
+        return list(self._heaps.keys())
+
+    def count(self, task_type: AgentType) -> int:
+        """Number of queued tasks of the given type"""
+        return len(self._heaps.get(task_type, ()))
+
+    def __len__(self) -> int:
+        return self._size
+
 class HiveCoordinator:
     def __init__(self):
         self.tasks: Dict[str, Task] = {}
-        self.task_queue: List[Task] = []
+        self.task_queue = TaskScheduler()
         self.is_initialized = False
+        
+        # In-memory agent registry; current_tasks here is authoritative and is
+        # written behind to the agents table every LOAD_FLUSH_INTERVAL seconds
+        self.agents: Dict[str, Agent] = {}
+        self.agents_by_type: Dict[AgentType, List[Agent]] = {}
+        self._dirty_agents: Set[str] = set()
+        self.load_flusher = None
         self.cli_agent_manager = None
         
+        # Streaming generation forwards partial output to Socket.IO rooms when a manager is attached
+        self.stream_responses = OLLAMA_STREAM_RESPONSES
+        self.socketio_manager = None
+        
         # Agent prompts with compressed notation for efficient inter-agent communication
         self.agent_prompts = {
             AgentType.KERNEL_DEV: """[GPU-kernel-expert]→[ROCm+HIP+CUDA]|[RDNA3>CDNA3]
@@ -133,6 +194,7 @@ FOCUS:[logical-analysis]→[analyze+deduce+explain+conclude]"""
             db.add(db_agent)
             db.commit()
             db.refresh(db_agent)
+            self._register_agent(agent)
             
             # If it's a CLI agent, register with CLI agent manager
             if agent.agent_type == "cli" and agent.cli_config:
@@ -159,45 +221,44 @@ FOCUS:[logical-analysis]→[analyze+deduce+explain+conclude]"""
             created_at=time.time()
         )
         self.tasks[task_id] = task
-        self.task_queue.append(task)
-        self.task_queue.sort(key=lambda t: t.priority, reverse=True)
+        self.task_queue.push(task)
         print(f"Created task {task_id} with priority {priority}")
         return task
     
+    def _register_agent(self, agent: Agent):
+        """Track an agent in the in-memory registry"""
+        previous = self.agents.get(agent.id)
+        if previous:
+            self.agents_by_type[previous.specialty].remove(previous)
+        self.agents[agent.id] = agent
+        self.agents_by_type.setdefault(agent.specialty, []).append(agent)
+    
     def get_available_agent(self, task_type: AgentType) -> Optional[Agent]:
-        """Find an available agent for the task type from the database"""
-        with SessionLocal() as db:
-            available_agents_orm = db.query(ORMAgent).filter(
-                ORMAgent.specialty == task_type.value,
-                ORMAgent.current_tasks < ORMAgent.max_concurrent
-            ).all()
-            
-            if available_agents_orm:
-                # Convert ORM agent to dataclass Agent
-                db_agent = available_agents_orm[0]
-                return Agent(
-                    id=db_agent.id,
-                    endpoint=db_agent.endpoint,
-                    model=db_agent.model,
-                    specialty=AgentType(db_agent.specialty),
-                    max_concurrent=db_agent.max_concurrent,
-                    current_tasks=db_agent.current_tasks,
-                    agent_type=db_agent.agent_type or "ollama",
-                    cli_config=db_agent.cli_config
-                )
-            return None
+        """Find the least loaded agent for the task type with a free slot"""
+        available_agents = [
+            agent for agent in self.agents_by_type.get(task_type, ())
+            if agent.current_tasks < agent.max_concurrent
+        ]
+        return min(available_agents, key=lambda agent: agent.current_tasks / agent.max_concurrent, default=None)
+    
+    def _acquire_agent(self, agent: Agent) -> Agent:
+        """Reserve one of the agent's slots"""
+        agent = self.agents.setdefault(agent.id, agent)
+        agent.current_tasks += 1
+        self._dirty_agents.add(agent.id)
+        return agent
+    
+    def _release_agent(self, agent: Agent):
+        """Free one of the agent's slots"""
+        agent.current_tasks = max(agent.current_tasks - 1, 0)
+        self._dirty_agents.add(agent.id)
     
     async def execute_task(self, task: Task, agent: Agent) -> Dict:
         """Execute a task on a specific agent with improved error handling"""
-        with SessionLocal() as db:
-            db_agent = db.query(ORMAgent).filter(ORMAgent.id == agent.id).first()
-            if db_agent:
-                db_agent.current_tasks += 1
-                db.add(db_agent)
-                db.commit()
-                db.refresh(db_agent)
-                agent.current_tasks = db_agent.current_tasks # Update in-memory object
-            
+        return await self._run_task(task, self._acquire_agent(agent))
+    
+    async def _run_task(self, task: Task, agent: Agent) -> Dict:
+        """Run a task on an agent whose slot is already reserved"""
         task.status = TaskStatus.IN_PROGRESS
         task.assigned_agent = agent.id
         
@@ -221,14 +282,59 @@ FOCUS:[logical-analysis]→[analyze+deduce+explain+conclude]"""
             return {"error": str(e)}
         
         finally:
-            with SessionLocal() as db:
-                db_agent = db.query(ORMAgent).filter(ORMAgent.id == agent.id).first()
-                if db_agent:
-                    db_agent.current_tasks -= 1
-                    db.add(db_agent)
-                    db.commit()
-                    db.refresh(db_agent)
-                    agent.current_tasks = db_agent.current_tasks # Update in-memory object
+            self._release_agent(agent)
+    
+    async def _load_agents(self):
+        """Populate the registry from the agents table; nothing is in flight after a restart"""
+        async with AsyncSessionLocal() as db:
+            db_agents = (await db.execute(select(ORMAgent))).scalars().all()
+        
+        for db_agent in db_agents:
+            try:
+                specialty = AgentType(db_agent.specialty)
+            except ValueError:
+                continue
+            self._register_agent(Agent(
+                id=db_agent.id,
+                endpoint=db_agent.endpoint,
+                model=db_agent.model,
+                specialty=specialty,
+                max_concurrent=db_agent.max_concurrent,
+                current_tasks=0,
+                agent_type=db_agent.agent_type or "ollama",
+                cli_config=db_agent.cli_config
+            ))
+            if db_agent.current_tasks:
+                self._dirty_agents.add(db_agent.id)
+    
+    async def flush_agent_load(self):
+        """Write changed agent loads to the agents table in one batched UPDATE"""
+        if not self._dirty_agents:
+            return
+        dirty, self._dirty_agents = self._dirty_agents, set()
+        rows = [
+            {"id": agent_id, "current_tasks": self.agents[agent_id].current_tasks}
+            for agent_id in dirty if agent_id in self.agents
+        ]
+        if not rows:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(ORMAgent), rows)
+                await db.commit()
+        except Exception:
+            # Retry these agents on the next flush
+            self._dirty_agents |= dirty
+            raise
+    
+    async def _load_flush_loop(self):
+        """Periodically write agent load behind to the database"""
+        while True:
+            await asyncio.sleep(LOAD_FLUSH_INTERVAL)
+            try:
+                await self.flush_agent_load()
+            except Exception as e:
+                print(f"⚠️ Agent load flush failed: {e}")
     
     async def _execute_cli_task(self, task: Task, agent: Agent) -> Dict:
         """Execute task on CLI agent"""
@@ -267,6 +373,18 @@ Complete task → respond JSON format specified above."""
         if not session:
             raise Exception("HTTP session not initialized")
         
+        if self.stream_responses:
+            result = await stream_generate(
+                session,
+                agent.endpoint,
+                payload,
+                timeout=aiohttp.ClientTimeout(total=300),
+                on_progress=socketio_progress(self.socketio_manager, task.id, agent.id)
+            )
+            if result["time_to_first_token"] is not None:
+                TIME_TO_FIRST_TOKEN.labels(task_type=task.type.value, agent=agent.id).observe(result["time_to_first_token"])
+            return result
+        
         async with session.post(
             f"{agent.endpoint}/api/generate", 
             json=payload,
@@ -282,17 +400,18 @@ Complete task → respond JSON format specified above."""
     async def process_queue(self):
         """Process the task queue with available agents"""
         while self.task_queue:
-            pending_tasks = [t for t in self.task_queue if t.status == TaskStatus.PENDING]
-            if not pending_tasks:
-                break
-                
             active_tasks = []
             
-            for task in pending_tasks[:]:  # Copy to avoid modification during iteration
-                agent = self.get_available_agent(task.type)
-                if agent:
-                    self.task_queue.remove(task)
-                    active_tasks.append(self.execute_task(task, agent))
+            for task_type in self.task_queue.pending_types():
+                # Each queued task gets at most one dispatch attempt per round;
+                # once no agent is free for a type, the rest of it waits
+                for _ in range(self.task_queue.count(task_type)):
+                    agent = self.get_available_agent(task_type)
+                    if not agent:
+                        break
+                    task = self.task_queue.pop(task_type)
+                    # Reserve the slot now so the next pick sees this agent's new load
+                    active_tasks.append(self._run_task(task, self._acquire_agent(agent)))
             
             if active_tasks:
                 await asyncio.gather(*active_tasks, return_exceptions=True)
@@ -405,6 +524,10 @@ Complete task → respond JSON format specified above."""
             # Initialize task processing
             self.task_processor = None
             
+            # Load agents into the in-memory registry and start the write-behind flusher
+            await self._load_agents()
+            self.load_flusher = asyncio.create_task(self._load_flush_loop())
+            
             # Test connectivity to any configured agents
             await self._test_initial_connectivity()
             
@@ -450,6 +573,16 @@ Complete task → respond JSON format specified above."""
                 except asyncio.CancelledError:
                     pass
             
+            # Stop the load flusher and write the final agent loads
+            if self.load_flusher:
+                self.load_flusher.cancel()
+                try:
+                    await self.load_flusher
+                except asyncio.CancelledError:
+                    pass
+                self.load_flusher = None
+            await self.flush_agent_load()
+            
             self.is_initialized = False
             print("✅ Hive Coordinator shutdown")
             
@@ -471,8 +604,8 @@ Complete task → respond JSON format specified above."""
 
     async def get_health_status(self):
         """Get health status"""
-        with SessionLocal() as db:
-            db_agents = db.query(ORMAgent).all()
+        async with AsyncSessionLocal() as db:
+            db_agents = (await db.execute(select(ORMAgent))).scalars().all()
             agents_status = {agent.id: "available" for agent in db_agents}
         return {
             "status": "healthy" if self.is_initialized else "unhealthy",
@@ -487,8 +620,8 @@ Complete task → respond JSON format specified above."""
 
     async def get_comprehensive_status(self):
         """Get comprehensive system status"""
-        with SessionLocal() as db:
-            db_agents = db.query(ORMAgent).all()
+        async with AsyncSessionLocal() as db:
+            db_agents = (await db.execute(select(ORMAgent))).scalars().all()
             total_agents = len(db_agents)
             available_agents = len([a for a in db_agents if a.current_tasks < a.max_concurrent])
             busy_agents = len([a for a in db_agents if a.current_tasks >= a.max_concurrent])
@@ -527,8 +660,8 @@ Complete task → respond JSON format specified above."""
         """Get Prometheus formatted metrics"""
         metrics = []
         
-        with SessionLocal() as db:
-            db_agents = db.query(ORMAgent).all()
+        async with AsyncSessionLocal() as db:
+            db_agents = (await db.execute(select(ORMAgent))).scalars().all()
             total_agents = len(db_agents)
             available_agents = len([a for a in db_agents if a.current_tasks < a.max_concurrent])
 
@@ -0,0 +1,121 @@
+"""
+Ollama Streaming Generation
+Incremental consumption of Ollama's NDJSON /api/generate stream with
+token-level progress events and time-to-first-token measurement
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Socket.IO room and event used for partial task output
+PROGRESS_ROOM = "task_updates"
+PROGRESS_EVENT = "task_progress"
+
+# Agent calls stream by default; set OLLAMA_STREAM_RESPONSES=false to wait for whole responses
+OLLAMA_STREAM_RESPONSES = os.getenv("OLLAMA_STREAM_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+# Socket.IO manager registered by the application at startup
+_socketio_manager = None
+
+
+def set_socketio_manager(manager):
+    """Register the SocketIOManager that progress callbacks forward to by default"""
+    global _socketio_manager
+    _socketio_manager = manager
+
+
+async def stream_generate(
+    session: aiohttp.ClientSession,
+    endpoint: str,
+    payload: Dict[str, Any],
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 0.5
+) -> Dict[str, Any]:
+    """
+    Run a streaming generation and return a result shaped like the non-streaming response.
+
+    Partial output is passed to ``on_progress`` at most every ``progress_interval``
+    seconds. The returned dict carries the concatenated ``response`` plus the fields
+    of Ollama's final chunk, with ``time_to_first_token`` and ``total_latency`` in seconds.
+    """
+    start_time = time.time()
+    first_token_at: Optional[float] = None
+    last_progress_at = start_time
+    tokens = []
+    pending = []
+    final_chunk: Dict[str, Any] = {}
+
+    async def emit_progress():
+        await on_progress({
+            "delta": "".join(pending),
+            "tokens": len(tokens),
+            "elapsed": time.time() - start_time
+        })
+        pending.clear()
+
+    async with session.post(
+        f"{endpoint}/api/generate",
+        json={**payload, "stream": True},
+        timeout=timeout
+    ) as response:
+        if response.status != 200:
+            error_text = await response.text()
+            raise Exception(f"HTTP {response.status}: {error_text}")
+
+        async for line in response.content:
+            line = line.strip()
+            if not line:
+                continue
+
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise Exception(chunk["error"])
+
+            token = chunk.get("response", "")
+            if token:
+                if first_token_at is None:
+                    first_token_at = time.time()
+                tokens.append(token)
+                pending.append(token)
+
+            if chunk.get("done"):
+                final_chunk = chunk
+                break
+
+            if on_progress and pending and time.time() - last_progress_at >= progress_interval:
+                await emit_progress()
+                last_progress_at = time.time()
+
+    if on_progress and pending:
+        await emit_progress()
+
+    result = dict(final_chunk)
+    result["response"] = "".join(tokens)
+    result["time_to_first_token"] = first_token_at - start_time if first_token_at else None
+    result["total_latency"] = time.time() - start_time
+    return result
+
+
+def socketio_progress(manager, task_id: str, agent_id: str, room: str = PROGRESS_ROOM) -> Optional[ProgressCallback]:
+    """Build a progress callback forwarding partial output to a SocketIOManager room"""
+    manager = manager or _socketio_manager
+    if manager is None:
+        return None
+
+    async def forward(progress: Dict[str, Any]):
+        await manager.send_to_room(room, PROGRESS_EVENT, {
+            "task_id": task_id,
+            "agent": agent_id,
+            **progress,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    return forward
@@ -2,10 +2,12 @@
 Security utilities for JWT token generation, validation, and API key management.
 """
 
+import hashlib
 import os
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import jwt
 from fastapi import HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -18,6 +20,13 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
+# API key lookup: stored prefix length ("hive_" plus 5 random characters; keys
+# issued before this used 8) and how long a verified key skips the bcrypt check
+API_KEY_PREFIX_LENGTH = 10
+LEGACY_API_KEY_PREFIX_LENGTH = 8
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "60"))
+API_KEY_CACHE_SIZE = 10000
+
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
@@ -115,6 +124,9 @@ class TokenManager:
 class APIKeyManager:
     """Manages API key generation, validation, and permissions."""
     
+    # SHA-256 of recently verified keys -> (api key id, cache expiry on the monotonic clock)
+    _verified_keys: Dict[str, Tuple[int, float]] = {}
+    
     @staticmethod
     def generate_api_key() -> tuple[str, str, str]:
         """
@@ -123,43 +135,76 @@ class APIKeyManager:
         """
         from app.models.auth import APIKey
         plain_key, hashed_key = APIKey.generate_api_key()
-        prefix = plain_key[:8]  # First 8 characters for identification
+        prefix = plain_key[:API_KEY_PREFIX_LENGTH]  # Indexed for lookup and shown for identification
         return plain_key, hashed_key, prefix
     
-    @staticmethod
-    def validate_api_key(session: Session, api_key: str) -> Optional[Dict[str, Any]]:
+    @classmethod
+    def _remember_verified_key(cls, digest: str, key_id: int):
+        """Cache a verified key, dropping expired entries once the cache is full"""
+        now = time.monotonic()
+        if len(cls._verified_keys) >= API_KEY_CACHE_SIZE:
+            cls._verified_keys = {
+                d: entry for d, entry in cls._verified_keys.items() if entry[1] > now
+            }
+            if len(cls._verified_keys) >= API_KEY_CACHE_SIZE:
+                cls._verified_keys.clear()
+        cls._verified_keys[digest] = (key_id, now + API_KEY_CACHE_TTL)
+    
+    @classmethod
+    def validate_api_key(cls, session: Session, api_key: str) -> Optional[Dict[str, Any]]:
         """
         Validate an API key and return user/key information.
         Returns None if invalid.
+        
+        Only keys sharing the presented key's prefix are hash-checked, and a
+        verified key skips the hash check for API_KEY_CACHE_TTL seconds. The key
+        row is still loaded on every call, so revocation applies immediately.
         """
         from app.models.auth import APIKey, User
         
-        # Find API key by trying to match the hash
-        api_keys = session.query(APIKey).filter(APIKey.is_active == True).all()
+        digest = hashlib.sha256(api_key.encode()).hexdigest()
+        key_record = None
         
-        for key_record in api_keys:
-            if APIKey.verify_api_key(api_key, key_record.key_hash):
-                if not key_record.is_valid():
-                    return None
-                
-                # Get user information
-                user = session.query(User).filter(User.id == key_record.user_id).first()
-                if not user or not user.is_active:
-                    return None
-                
-                # Record usage
-                key_record.record_usage()
-                session.commit()
-                
-                return {
-                    "user_id": user.id,
-                    "username": user.username,
-                    "api_key_id": key_record.id,
-                    "scopes": key_record.get_scopes(),
-                    "is_superuser": user.is_superuser,
-                }
+        cached = cls._verified_keys.get(digest)
+        if cached and cached[1] > time.monotonic():
+            key_record = session.query(APIKey).filter(APIKey.id == cached[0]).first()
+        
+        if key_record is None:
+            candidates = session.query(APIKey).filter(
+                APIKey.key_prefix.in_({
+                    api_key[:API_KEY_PREFIX_LENGTH],
+                    api_key[:LEGACY_API_KEY_PREFIX_LENGTH]
+                }),
+                APIKey.is_active == True
+            ).all()
+            key_record = next(
+                (k for k in candidates if APIKey.verify_api_key(api_key, k.key_hash)),
+                None
+            )
+            if key_record is None:
+                return None
+            cls._remember_verified_key(digest, key_record.id)
+        
+        if not key_record.is_valid():
+            cls._verified_keys.pop(digest, None)
+            return None
+        
+        # Get user information
+        user = session.query(User).filter(User.id == key_record.user_id).first()
+        if not user or not user.is_active:
+            return None
         
-        return None
+        # Record usage
+        key_record.record_usage()
+        session.commit()
+        
+        return {
+            "user_id": user.id,
+            "username": user.username,
+            "api_key_id": key_record.id,
+            "scopes": key_record.get_scopes(),
+            "is_superuser": user.is_superuser,
+        }
     
     @staticmethod
     def check_scope_permission(user_scopes: List[str], required_scope: str) -> bool:
@@ -0,0 +1,191 @@
+"""
+Task Archive
+Aged task rows moved out of the tasks table into zstd-compressed JSON Lines
+segments, each with a manifest that lets queries skip segments they cannot match
+"""
+
+import io
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import orjson
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+# Archiving is opt-in: unless a directory is configured, aged tasks are just deleted
+TASK_ARCHIVE_DIR = os.getenv("TASK_ARCHIVE_DIR") or None
+
+SEGMENT_SUFFIX = ".jsonl.zst"
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def _utc(value: Optional[Any]) -> Optional[datetime]:
+    """Parse an archived timestamp, treating naive values as UTC"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class ArchiveSegment:
+    """One segment being written; invisible to readers until close() renames it into place"""
+
+    def __init__(self, directory: str, compression_level: int = 10):
+        name = f"tasks-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(directory, name + SEGMENT_SUFFIX)
+        self.manifest_path = os.path.join(directory, name + MANIFEST_SUFFIX)
+        self._tmp_path = self.path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._writer = zstandard.ZstdCompressor(level=compression_level).stream_writer(self._file, closefd=False)
+        self.rows = 0
+        # Rows written per status, used to verify a source table before it is dropped
+        self.statuses: Dict[str, int] = {}
+        self._created = [None, None]
+        self._completed = [None, None]
+        self._types = set()
+        self._agents = set()
+
+    def write(self, rows: Iterable[Mapping[str, Any]]):
+        """Append task rows (tasks table column names as keys)"""
+        for row in rows:
+            row = dict(row)
+            self._writer.write(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+            self.rows += 1
+            self._extend(self._created, _utc(row.get("created_at")))
+            self._extend(self._completed, _utc(row.get("completed_at")))
+            task_status = row.get("status") or "unknown"
+            self.statuses[task_status] = self.statuses.get(task_status, 0) + 1
+            self._types.add(row.get("type"))
+            self._agents.add(row.get("assigned_agent_id"))
+
+    @staticmethod
+    def _extend(bounds: List[Optional[datetime]], value: Optional[datetime]):
+        if value is None:
+            return
+        if bounds[0] is None or value < bounds[0]:
+            bounds[0] = value
+        if bounds[1] is None or value > bounds[1]:
+            bounds[1] = value
+
+    def close(self) -> Optional[str]:
+        """Durably publish the segment and its manifest; an empty segment is dropped"""
+        self._writer.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if not self.rows:
+            os.remove(self._tmp_path)
+            return None
+
+        manifest = {
+            "rows": self.rows,
+            "created_at": self._created,
+            "completed_at": self._completed,
+            "statuses": self.statuses,
+            "types": sorted(t for t in self._types if t is not None),
+            "agents": sorted(a for a in self._agents if a is not None),
+        }
+        with open(self.manifest_path, "wb") as f:
+            f.write(orjson.dumps(manifest))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def discard(self):
+        """Remove everything this segment wrote, e.g. when the source rows were not deleted"""
+        if not self._writer.closed:
+            self._writer.close()
+        self._file.close()
+        for path in (self._tmp_path, self.path, self.manifest_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class TaskArchive:
+    """Directory of archived task segments"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def ensure_directory(self):
+        """Create the archive directory; raises OSError if it cannot be written to"""
+        os.makedirs(self.directory, exist_ok=True)
+
+    def open_segment(self) -> ArchiveSegment:
+        self.ensure_directory()
+        return ArchiveSegment(self.directory)
+
+    def _manifests(self) -> List[Dict[str, Any]]:
+        """Manifests of all published segments, oldest tasks first"""
+        if not os.path.isdir(self.directory):
+            return []
+        manifests = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path[:-len(SEGMENT_SUFFIX)] + MANIFEST_SUFFIX, "rb") as f:
+                    manifest = orjson.loads(f.read())
+            except FileNotFoundError:
+                logger.warning(f"⚠️ Archive segment {name} has no manifest, skipping")
+                continue
+            manifest["path"] = path
+            manifest["created_at"] = [_utc(v) for v in manifest["created_at"]]
+            manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m["created_at"][0])
+
+    def query(self, created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+              status: Optional[str] = None, task_type: Optional[str] = None,
+              agent_id: Optional[str] = None, limit: int = 1000) -> Dict[str, Any]:
+        """Archived tasks matching every given predicate, oldest segments first.
+
+        Manifests rule out whole segments before any decompression; only the
+        remaining segments are streamed and filtered row by row.
+        """
+        created_after, created_before = _utc(created_after), _utc(created_before)
+        manifests = self._manifests()
+        candidates = [
+            m for m in manifests
+            if not (created_after and m["created_at"][1] < created_after)
+            and not (created_before and m["created_at"][0] >= created_before)
+            and not (status and status not in m["statuses"])
+            and not (task_type and task_type not in m["types"])
+            and not (agent_id and agent_id not in m["agents"])
+        ]
+
+        tasks = []
+        for manifest in candidates:
+            with open(manifest["path"], "rb") as f:
+                reader = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True))
+                for line in reader:
+                    row = orjson.loads(line)
+                    created_at = _utc(row.get("created_at"))
+                    if created_after and created_at < created_after:
+                        continue
+                    if created_before and created_at >= created_before:
+                        continue
+                    if status and row.get("status") != status:
+                        continue
+                    if task_type and row.get("type") != task_type:
+                        continue
+                    if agent_id and row.get("assigned_agent_id") != agent_id:
+                        continue
+                    tasks.append(row)
+                    if len(tasks) >= limit:
+                        break
+            if len(tasks) >= limit:
+                break
+
+        return {
+            "tasks": tasks,
+            "total": len(tasks),
+            "segments_total": len(manifests),
+            "segments_matched": len(candidates),
+        }
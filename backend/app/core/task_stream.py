@@ -0,0 +1,195 @@
+"""
+Durable Task Stream
+Redis Streams backed task queue shared by coordinator replicas, with consumer
+group leases, lease renewal and reclaim of entries left behind by crashed replicas
+"""
+
+import json
+import logging
+import os
+import socket
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+# Stream entry id and the task id it carries
+StreamEntry = Tuple[str, str]
+
+# Decrement a dependent's remaining-dependency count at most once per finished
+# parent and publish the dependent when the count reaches zero
+RELEASE_DEPENDENCY_SCRIPT = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+    return -1
+end
+local remaining = redis.call('HINCRBY', KEYS[2], ARGV[1], -1)
+if remaining == 0 then
+    redis.call('XADD', KEYS[3], '*', 'task_id', ARGV[1])
+end
+return remaining
+"""
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisTaskStream:
+    """Ready tasks in a Redis stream, with task records and dependency counts kept alongside"""
+
+    def __init__(self, client: redis.Redis,
+                 stream: str = "hive:task_stream",
+                 group: str = "hive-coordinators",
+                 consumer: Optional[str] = None,
+                 lease_timeout: float = 120.0,
+                 max_deliveries: int = 3,
+                 prefix: str = "hive"):
+        self.client = client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_timeout = lease_timeout
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = f"{stream}:dead"
+        self.records_key = f"{prefix}:tasks"
+        self.remaining_key = f"{prefix}:task_dependencies"
+        self.released_prefix = f"{prefix}:task_released"
+        self._release_dependency = client.register_script(RELEASE_DEPENDENCY_SCRIPT)
+
+    async def ensure_group(self):
+        """Create the stream and consumer group if they do not exist yet"""
+        try:
+            await self.client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def save(self, records: List[Dict[str, Any]], remaining: Optional[Dict[str, int]] = None):
+        """Store task records and, for newly submitted tasks, their dependency counts"""
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self.records_key, mapping={
+                record["id"]: json.dumps(record) for record in records
+            })
+            if remaining:
+                pipe.hset(self.remaining_key, mapping=remaining)
+            await pipe.execute()
+
+    async def load(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch the stored records of the given tasks"""
+        if not task_ids:
+            return {}
+        values = await self.client.hmget(self.records_key, task_ids)
+        return {
+            task_id: json.loads(value)
+            for task_id, value in zip(task_ids, values)
+            if value is not None
+        }
+
+    async def forget(self, task_ids: List[str]):
+        """Drop the records and dependency bookkeeping of finished tasks"""
+        if not task_ids:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hdel(self.records_key, *task_ids)
+            pipe.hdel(self.remaining_key, *task_ids)
+            pipe.delete(*(f"{self.released_prefix}:{task_id}" for task_id in task_ids))
+            await pipe.execute()
+
+    async def publish(self, task_id: str) -> str:
+        """Append a ready task to the stream"""
+        return _decode(await self.client.xadd(self.stream, {"task_id": task_id}))
+
+    async def release_dependency(self, parent_id: str, task_id: str) -> int:
+        """Mark one dependency of a task as finished, publishing the task once none remain.
+        Returns the remaining count, or -1 if this parent was already released."""
+        return int(await self._release_dependency(
+            keys=[f"{self.released_prefix}:{parent_id}", self.remaining_key, self.stream],
+            args=[task_id]
+        ))
+
+    async def read(self, count: int, block_ms: int = 1000) -> List[StreamEntry]:
+        """Lease up to ``count`` new entries to this consumer"""
+        return self._entries(await self.client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=count, block=block_ms
+        ))
+
+    async def read_own_pending(self, count: int = 1000) -> List[StreamEntry]:
+        """Entries already leased to this consumer name, e.g. before a restart"""
+        return self._entries(await self.client.xreadgroup(
+            self.group, self.consumer, {self.stream: "0"}, count=count
+        ))
+
+    async def renew(self, entry_ids: Iterable[str]):
+        """Reset the idle time of entries this consumer is still working on"""
+        entry_ids = list(entry_ids)
+        if entry_ids:
+            await self.client.xclaim(
+                self.stream, self.group, self.consumer, 0, entry_ids, justid=True
+            )
+
+    async def reclaim(self, count: int = 100) -> Tuple[List[StreamEntry], List[StreamEntry]]:
+        """Take over entries whose lease expired on another consumer.
+        Returns the reclaimed entries and those moved to the dead-letter stream
+        after too many deliveries."""
+        min_idle_ms = int(self.lease_timeout * 1000)
+        pending = await self.client.xpending_range(
+            self.stream, self.group, min="-", max="+", count=count, idle=min_idle_ms
+        )
+
+        claim_ids = []
+        dead_ids = []
+        for entry in pending:
+            if _decode(entry["consumer"]) == self.consumer:
+                continue
+            if entry["times_delivered"] >= self.max_deliveries:
+                dead_ids.append(entry["message_id"])
+            else:
+                claim_ids.append(entry["message_id"])
+
+        reclaimed: List[StreamEntry] = []
+        if claim_ids:
+            claimed = await self.client.xclaim(
+                self.stream, self.group, self.consumer, min_idle_ms, claim_ids
+            )
+            reclaimed = self._stream_entries(claimed)
+
+        dead: List[StreamEntry] = []
+        if dead_ids:
+            claimed = await self.client.xclaim(
+                self.stream, self.group, self.consumer, min_idle_ms, dead_ids
+            )
+            dead = self._stream_entries(claimed)
+            for entry_id, task_id in dead:
+                await self.client.xadd(self.dead_letter_stream, {"task_id": task_id, "entry_id": entry_id})
+                await self.ack(entry_id)
+            if dead:
+                logger.warning(f"Moved {len(dead)} tasks to {self.dead_letter_stream} after {self.max_deliveries} deliveries")
+
+        return reclaimed, dead
+
+    async def ack(self, entry_id: str):
+        """Acknowledge a finished entry and remove it from the stream"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.xack(self.stream, self.group, entry_id)
+            pipe.xdel(self.stream, entry_id)
+            await pipe.execute()
+
+    def _entries(self, response) -> List[StreamEntry]:
+        entries: List[StreamEntry] = []
+        for _, stream_entries in response or []:
+            entries.extend(self._stream_entries(stream_entries))
+        return entries
+
+    @staticmethod
+    def _stream_entries(stream_entries) -> List[StreamEntry]:
+        entries: List[StreamEntry] = []
+        for entry_id, fields in stream_entries:
+            # Entries deleted while still pending come back without fields
+            if not fields:
+                continue
+            task_id = fields.get(b"task_id") or fields.get("task_id")
+            if task_id is not None:
+                entries.append((_decode(entry_id), _decode(task_id)))
+        return entries
@@ -7,18 +7,30 @@ which is the primary task consumption method for the Bzzz agents.
 
 import asyncio
 import logging
+import socket
 import time
-from typing import Dict, Optional, Any
+import uuid
+from dataclasses import asdict
+from typing import Dict, List, Optional, Any, Tuple
 
 from ..services.agent_service import AgentService, AgentType
 from ..services.task_service import TaskService
-from ..services.workflow_service import WorkflowService, Task, TaskStatus
+from ..services.workflow_service import WorkflowService, Task, TaskStatus, WORKFLOW_LEASE_SECONDS
 from ..services.performance_service import PerformanceService
 from ..services.background_service import BackgroundService
 from ..services.github_service import GitHubService  # Import the new service
+from .task_archive import TaskArchive, TASK_ARCHIVE_DIR
 
 logger = logging.getLogger(__name__)
 
+# Pending tasks claimed from the tasks table per dispatch round, and how long a
+# claim lasts before the lease reaper hands the task to another replica
+DISPATCH_BATCH_SIZE = 10
+DISPATCH_LEASE_SECONDS = 300
+
+# Longest the dispatcher sleeps before polling for tasks created by other replicas
+DISPATCH_POLL_INTERVAL = 5.0
+
 
 class UnifiedCoordinatorRefactored:
     """
@@ -31,11 +43,15 @@ class UnifiedCoordinatorRefactored:
         self.is_initialized = False
         self.running = False
         
+        # Replicas claim pending tasks from the shared tasks table under this id
+        self.worker_id = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self._dispatch_wakeup = asyncio.Event()
+        
         # Services
         self.github_service: Optional[GitHubService] = None
         self.agent_service = AgentService()
-        self.task_service = TaskService()
-        self.workflow_service = WorkflowService()
+        self.task_service = TaskService(archive=TaskArchive(TASK_ARCHIVE_DIR) if TASK_ARCHIVE_DIR else None)
+        self.workflow_service = WorkflowService(owner=self.worker_id)
         self.performance_service = PerformanceService()
         self.background_service = BackgroundService()
 
@@ -58,7 +74,7 @@ class UnifiedCoordinatorRefactored:
             # Initialize other services
             await self.agent_service.initialize()
             self.task_service.initialize()
-            self.workflow_service.initialize()
+            await self.workflow_service.initialize()
             self.performance_service.initialize()
             self.background_service.initialize(
                 self.agent_service, self.task_service, self.workflow_service, self.performance_service
@@ -76,6 +92,11 @@ class UnifiedCoordinatorRefactored:
             await self.initialize()
         self.running = True
         await self.background_service.start()
+        if self.github_service:
+            self.background_service.add_background_task(self._dispatch_loop())
+        self.background_service.add_background_task(self._workflow_lease_loop())
+        # Continue workflows resumed from checkpoints where they left off
+        await self._dispatch_ready_workflow_tasks()
         logger.info("🚀 Hive Coordinator background processes started")
 
     async def shutdown(self):
@@ -88,12 +109,12 @@ class UnifiedCoordinatorRefactored:
     # TASK COORDINATION (Delegates to Bzzz via GitHub Issues)
     # =========================================================================
 
-    def create_task(self, task_type: AgentType, context: Dict, priority: int = 3) -> Task:
+    async def create_task(self, task_type: AgentType, context: Dict, priority: int = 3) -> Task:
         """
-        Creates a task, persists it, and then creates a corresponding
-        GitHub issue for the Bzzz network to consume.
+        Creates a task and persists it as pending; the dispatcher then claims
+        it and creates the corresponding GitHub issue for the Bzzz network.
         """
-        task_id = f"task_{int(time.time())}_{len(self.tasks)}"
+        task_id = str(uuid.uuid4())
         task = Task(
             id=task_id,
             type=task_type,
@@ -103,14 +124,16 @@ class UnifiedCoordinatorRefactored:
         )
         
         # 1. Persist task to the Hive database
+        persisted = False
         try:
             task_dict = {
                 'id': task.id, 'title': f"Task {task.type.value}", 'description': "Task created in Hive",
-                'priority': task.priority, 'status': task.status.value, 'assigned_agent': "BzzzP2PNetwork",
+                'priority': task.priority, 'status': task.status.value, 'assigned_agent': None,
                 'context': task.context, 'payload': task.payload, 'type': task.type.value,
                 'created_at': task.created_at, 'completed_at': None
             }
-            self.task_service.create_task(task_dict)
+            await self.task_service.create_task(task_dict)
+            persisted = True
             logger.info(f"💾 Task {task_id} persisted to Hive database")
         except Exception as e:
             logger.error(f"❌ Failed to persist task {task_id} to database: {e}")
@@ -118,30 +141,226 @@ class UnifiedCoordinatorRefactored:
         # 2. Add to in-memory cache
         self.tasks[task_id] = task
         
-        # 3. Create the GitHub issue for the Bzzz network
+        # 3. Hand the task to the Bzzz network
         if self.github_service:
-            logger.info(f"🌉 Creating GitHub issue for Hive task {task_id}...")
-            # Fire and forget. In a production system, this would have retry logic.
-            asyncio.create_task(
-                self.github_service.create_bzzz_task_issue(task.dict())
-            )
+            if persisted:
+                self._dispatch_wakeup.set()
+            else:
+                # No row for the dispatcher to claim; bridge directly from this replica
+                logger.info(f"🌉 Creating GitHub issue for Hive task {task_id}...")
+                asyncio.create_task(self._bridge_tasks([task]))
         else:
             logger.warning(f"⚠️ GitHub service not available. Task {task_id} was created but not bridged to Bzzz.")
             
         logger.info(f"📝 Created task: {task_id} ({task_type.value}, priority: {priority})")
         return task
 
+    async def create_tasks(self, specs: List[Tuple[AgentType, Dict, int]]) -> List[Task]:
+        """
+        Creates many tasks at once: one multi-row database insert and one
+        background job that bridges all of them to GitHub issues.
+        """
+        tasks = [
+            Task(
+                id=str(uuid.uuid4()),
+                type=task_type,
+                context=context,
+                priority=priority,
+                payload=context
+            )
+            for task_type, context, priority in specs
+        ]
+        
+        # 1. Persist all tasks to the Hive database in one transaction
+        await self.task_service.create_tasks([
+            {
+                'id': task.id, 'title': f"Task {task.type.value}", 'description': "Task created in Hive",
+                'priority': task.priority, 'status': task.status.value, 'assigned_agent': None,
+                'context': task.context, 'payload': task.payload, 'type': task.type.value
+            }
+            for task in tasks
+        ])
+        logger.info(f"💾 {len(tasks)} tasks persisted to Hive database")
+        
+        # 2. Add to in-memory cache
+        for task in tasks:
+            self.tasks[task.id] = task
+        
+        # 3. Let the dispatcher claim and bridge them to the Bzzz network
+        if self.github_service:
+            self._dispatch_wakeup.set()
+        else:
+            logger.warning(f"⚠️ GitHub service not available. {len(tasks)} tasks were created but not bridged to Bzzz.")
+        
+        logger.info(f"📝 Created {len(tasks)} tasks in bulk")
+        return tasks
+
+    async def _bridge_tasks(self, tasks: List[Task]):
+        """Create the GitHub issues for a batch of tasks"""
+        logger.info(f"🌉 Creating GitHub issues for {len(tasks)} Hive tasks...")
+        for task in tasks:
+            try:
+                await self.github_service.create_bzzz_task_issue(asdict(task))
+            except Exception as e:
+                logger.error(f"❌ Failed to bridge task {task.id} to Bzzz: {e}")
+
+    async def _dispatch_loop(self):
+        """Claim pending tasks from the shared tasks table and bridge them to Bzzz"""
+        while self.running:
+            try:
+                if await self._dispatch_claimed_tasks():
+                    continue
+                try:
+                    await asyncio.wait_for(self._dispatch_wakeup.wait(), timeout=DISPATCH_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._dispatch_wakeup.clear()
+            except Exception as e:
+                logger.error(f"❌ Task dispatch error: {e}")
+                await asyncio.sleep(DISPATCH_POLL_INTERVAL)
+
+    async def _dispatch_claimed_tasks(self) -> int:
+        """
+        Claims one batch of pending tasks and creates their GitHub issues.
+        Rows locked by another replica's claim are skipped, so each task is
+        bridged once. A task whose issue could not be created keeps its lease
+        until the reaper returns it to the pending pool for a retry.
+        Returns the number of tasks claimed.
+        """
+        claimed = await self.task_service.claim_tasks(
+            self.worker_id, limit=DISPATCH_BATCH_SIZE, lease_seconds=DISPATCH_LEASE_SECONDS
+        )
+        
+        handed_off = []
+        renewed_at = time.monotonic()
+        for index, orm_task in enumerate(claimed):
+            if time.monotonic() - renewed_at > DISPATCH_LEASE_SECONDS / 3:
+                # Keep the rest of the batch leased while slow issue creation runs
+                await self.task_service.renew_leases(
+                    [str(row.id) for row in claimed[index:]], self.worker_id, DISPATCH_LEASE_SECONDS
+                )
+                renewed_at = time.monotonic()
+            
+            task = self._claimed_task(orm_task)
+            if task is None:
+                await self.task_service.record_status(str(orm_task.id), TaskStatus.FAILED.value)
+                continue
+            result = await self.github_service.create_bzzz_task_issue(asdict(task))
+            if result.get("success"):
+                handed_off.append(task.id)
+            else:
+                logger.warning(f"⚠️ Could not bridge task {task.id} to Bzzz, retrying after its lease expires")
+        
+        await self.task_service.hand_off_tasks(handed_off, self.worker_id)
+        if handed_off:
+            logger.info(f"🌉 Bridged {len(handed_off)} Hive tasks to Bzzz")
+        return len(claimed)
+
+    def _claimed_task(self, orm_task) -> Optional[Task]:
+        """The task for a claimed row, rebuilt from the row if another replica created it"""
+        task = self.tasks.get(str(orm_task.id))
+        if task:
+            return task
+        
+        task_data = self.task_service.coordinator_task_from_orm(orm_task)
+        try:
+            task_type = AgentType(task_data['type'])
+        except ValueError:
+            logger.error(f"❌ Task {task_data['id']} has unknown type {task_data['type']}, failing it")
+            return None
+        return Task(
+            id=task_data['id'],
+            type=task_type,
+            priority=task_data['priority'],
+            context=task_data['context'],
+            payload=task_data['payload']
+        )
+
+    async def update_task_status(self, task_id: str, status: TaskStatus,
+                                 assigned_agent: Optional[str] = None, result: Optional[Dict] = None):
+        """
+        Records a task transition in memory and buffers it for the database;
+        terminal transitions are persisted before this returns.
+        """
+        task = self.tasks.get(task_id)
+        if task:
+            task.status = status
+            task.assigned_agent = assigned_agent or task.assigned_agent
+            if result is not None:
+                task.result = result
+            if status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+                task.completed_at = time.time()
+        
+        # Workflow stages have no tasks row; their status is persisted by the stage checkpoint
+        if not (task and task.workflow_id):
+            try:
+                await self.task_service.record_status(task_id, status.value, assigned_agent=assigned_agent)
+            except Exception as e:
+                logger.error(f"❌ Failed to persist status of task {task_id}: {e}")
+        
+        # A finished stage is checkpointed and may unblock the next ones
+        if task and task.workflow_id and status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+            await self.workflow_service.handle_task_completion(task)
+            await self._dispatch_ready_workflow_tasks()
+
+    # =========================================================================
+    # WORKFLOW COORDINATION
+    # =========================================================================
+
+    async def submit_workflow(self, workflow: Dict[str, Any]) -> str:
+        """Submits a workflow and dispatches the stages that have no unmet dependencies."""
+        workflow_id = await self.workflow_service.submit_workflow(workflow)
+        await self._dispatch_ready_workflow_tasks()
+        return workflow_id
+
+    async def _workflow_lease_loop(self):
+        """Keep leases on the workflow executions this replica drives and take over
+        executions whose replica stopped renewing them"""
+        while self.running:
+            try:
+                await asyncio.sleep(WORKFLOW_LEASE_SECONDS / 3)
+                await self.workflow_service.renew_execution_leases()
+                resumed = await self.workflow_service.resume_executions()
+                if resumed > 0:
+                    logger.info(f"♻️ Took over {resumed} workflow executions with expired leases")
+                    await self._dispatch_ready_workflow_tasks()
+            except Exception as e:
+                logger.error(f"❌ Workflow lease error: {e}")
+
+    async def _dispatch_ready_workflow_tasks(self):
+        """
+        Checkpoints every workflow stage whose dependencies have completed as
+        in progress and bridges it to Bzzz.
+        """
+        ready = self.workflow_service.get_ready_workflow_tasks(self.tasks)
+        if not ready:
+            return
+        if not self.github_service:
+            logger.warning(f"⚠️ GitHub service not available. {len(ready)} workflow tasks are ready but not bridged to Bzzz.")
+            return
+        
+        for task in ready:
+            self.tasks[task.id] = task
+            await self.workflow_service.handle_task_dispatch(task)
+        asyncio.create_task(self._bridge_tasks(ready))
+        logger.info(f"🔄 Dispatched {len(ready)} ready workflow tasks")
+
+    async def cancel_task(self, task_id: str):
+        """Cancels a task that has not finished yet."""
+        await self.update_task_status(task_id, TaskStatus.CANCELLED)
+        logger.info(f"🚫 Cancelled task: {task_id}")
+
     # =========================================================================
     # STATUS & HEALTH (Unchanged)
     # =========================================================================
 
-    def get_task_status(self, task_id: str) -> Optional[Dict]:
+    async def get_task_status(self, task_id: str) -> Optional[Dict]:
         """Get status of a specific task from local cache or database."""
         task = self.tasks.get(task_id)
         if task:
             return task.dict()
         try:
-            orm_task = self.task_service.get_task(task_id)
+            orm_task = await self.task_service.get_task(task_id)
             if orm_task:
                 # This needs a proper conversion method
                 return {k: v for k, v in orm_task.__dict__.items() if not k.startswith('_')}
@@ -8,6 +8,9 @@ import json
 from datetime import datetime
 import uuid
 
+from .ollama_streaming import OLLAMA_STREAM_RESPONSES, stream_generate, socketio_progress
+from ..services.performance_service import TIME_TO_FIRST_TOKEN
+
 # Add the McPlan project root to the Python path
 mcplan_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(mcplan_root))
@@ -48,6 +51,10 @@ class MultiAgentOrchestrator:
     """
     
     def __init__(self):
+        # Streaming generation forwards partial output to Socket.IO rooms when a manager is attached
+        self.stream_responses = OLLAMA_STREAM_RESPONSES
+        self.socketio_manager = None
+        
         # Available Ollama agents from cluster
         self.agents = {
             'acacia': {
@@ -130,8 +137,29 @@ Please execute this task and provide a structured response."""
             }
         }
         
+        task_id = task.get('id', str(uuid.uuid4()))
+        
         try:
             async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=agent['timeout'])) as session:
+                if self.stream_responses:
+                    result = await stream_generate(
+                        session,
+                        agent['endpoint'],
+                        payload,
+                        on_progress=socketio_progress(self.socketio_manager, task_id, agent_id)
+                    )
+                    if result['time_to_first_token'] is not None:
+                        TIME_TO_FIRST_TOKEN.labels(task_type=task.get('type', 'general'), agent=agent_id).observe(result['time_to_first_token'])
+                    return {
+                        "success": True,
+                        "agent": agent_id,
+                        "response": result.get('response', ''),
+                        "model": agent['model'],
+                        "task_id": task_id,
+                        "time_to_first_token": result.get('time_to_first_token'),
+                        "total_latency": result.get('total_latency')
+                    }
+                
                 async with session.post(f"{agent['endpoint']}/api/generate", json=payload) as response:
                     if response.status == 200:
                         result = await response.json()
@@ -140,7 +168,7 @@ Please execute this task and provide a structured response."""
                             "agent": agent_id,
                             "response": result.get('response', ''),
                             "model": agent['model'],
-                            "task_id": task.get('id', str(uuid.uuid4()))
+                            "task_id": task_id
                         }
                     else:
                         return {
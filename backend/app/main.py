@@ -12,7 +12,8 @@ from pathlib import Path
 import socketio
 
 from .core.unified_coordinator_refactored import UnifiedCoordinatorRefactored as UnifiedCoordinator
-from .core.database import engine, get_db, init_database_with_retry, test_database_connection
+from .core.ollama_streaming import set_socketio_manager
+from .core.database import engine, async_engine, get_db, init_database_with_retry, test_database_connection
 from .models.user import Base
 from .models import agent, project # Import the new agent and project models
 
@@ -74,6 +75,7 @@ async def lifespan(app: FastAPI):
         print("🛑 Shutting down Hive Orchestrator...")
         try:
             await unified_coordinator.shutdown()
+            await async_engine.dispose()
             print("✅ Hive Orchestrator stopped")
         except Exception as e:
             print(f"❌ Shutdown error: {e}")
@@ -512,6 +514,9 @@ class SocketIOManager:
 
 manager = SocketIOManager(sio)
 
+# Streaming agent calls forward partial output through this manager
+set_socketio_manager(manager)
+
 # Socket.IO integration with FastAPI
 # The socket.io server is integrated below in the app creation
 
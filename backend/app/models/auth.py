@@ -29,7 +29,7 @@ class APIKey(Base):
     # API Key details
     name = Column(String(255), nullable=False)  # Human-readable name
     key_hash = Column(String(255), unique=True, index=True, nullable=False)  # Hashed API key
-    key_prefix = Column(String(10), nullable=False)  # First 8 chars for identification
+    key_prefix = Column(String(10), index=True, nullable=False)  # Leading chars for lookup and identification
     
     # Permissions and scope
     scopes = Column(Text, nullable=True)  # JSON list of permissions
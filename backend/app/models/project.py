@@ -24,7 +24,7 @@ class Project(Base):
     github_token_required = Column(Boolean, default=False)
     
     # Additional metadata
-    metadata = Column(JSON, nullable=True)
+    project_metadata = Column("metadata", JSON, nullable=True)
     tags = Column(JSON, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
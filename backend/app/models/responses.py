@@ -17,6 +17,7 @@ class StatusEnum(str, Enum):
     ERROR = "error"
     WARNING = "warning"
     PENDING = "pending"
+    ASSIGNED = "assigned"
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
@@ -209,6 +210,7 @@ class TaskListResponse(BaseResponse):
     total: int = Field(..., description="Total number of tasks", example=10, ge=0)
     filtered: bool = Field(default=False, description="Whether results are filtered")
     filters_applied: Optional[Dict[str, Any]] = Field(None, description="Applied filter criteria")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; absent on the last page")
     
     class Config:
         schema_extra = {
@@ -251,6 +253,24 @@ class TaskCreationResponse(BaseResponse):
         }
 
 
+class TaskBatchCreationResponse(BaseResponse):
+    """Response model for bulk task creation"""
+    status: StatusEnum = Field(StatusEnum.SUCCESS)
+    task_ids: List[str] = Field(..., description="IDs of the created tasks, in request order")
+    count: int = Field(..., description="Number of tasks created", example=2, ge=0)
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "status": "success",
+                "timestamp": "2024-01-01T12:00:00Z",
+                "message": "2 tasks created successfully",
+                "task_ids": ["9b2f0c3e-5d7a-4e0b-9a51-0c8f3b6f7a10", "4c1e8d2a-7b3f-4a6e-8d90-1f2e3a4b5c6d"],
+                "count": 2
+            }
+        }
+
+
 # System Status Response Models
 class ComponentStatus(BaseModel):
     """Individual component status"""
@@ -664,4 +684,19 @@ class TaskCreationRequest(BaseModel):
                 "preferred_agent": "walnut-codellama",
                 "timeout": 300
             }
-        }
\ No newline at end of file
+        }
+
+
+class TaskBatchCreationRequest(BaseModel):
+    """Request model for bulk task creation"""
+    tasks: List[TaskCreationRequest] = Field(..., description="Tasks to create", min_items=1, max_items=5000)
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "tasks": [
+                    {"type": "code_analysis", "priority": 2, "context": {"file_path": "/src/api.py"}},
+                    {"type": "code_analysis", "priority": 2, "context": {"file_path": "/src/models.py"}}
+                ]
+            }
+        }
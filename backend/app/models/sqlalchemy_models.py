@@ -60,4 +60,54 @@ class Execution(Base):
     
     # Relationships
     workflow = relationship("Workflow", back_populates="executions")
-    tasks = relationship("Task", back_populates="execution")
\ No newline at end of file
+    tasks = relationship("Task", back_populates="execution")
+
+
+class WorkflowCheckpoint(Base):
+    __tablename__ = "workflow_checkpoints"
+    
+    # Coordinator execution identifiers
+    execution_id = Column(String(255), primary_key=True)
+    workflow_id = Column(String(255), nullable=False, index=True)
+    
+    # Execution state
+    status = Column(String(50), default='running')
+    execution_metadata = Column("metadata", JSONB)
+    
+    # Coordinator replica driving the execution and until when; another replica
+    # only resumes it once the lease has lapsed
+    owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    stages = relationship("WorkflowStageCheckpoint", back_populates="checkpoint", cascade="all, delete-orphan")
+
+
+class WorkflowStageCheckpoint(Base):
+    __tablename__ = "workflow_stage_checkpoints"
+    
+    # Primary identification
+    task_id = Column(String(255), primary_key=True)
+    execution_id = Column(String(255), ForeignKey("workflow_checkpoints.execution_id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Stage definition (one DAG node)
+    position = Column(Integer, nullable=False)
+    task_type = Column(String(50), nullable=False)
+    priority = Column(Integer, default=3)
+    dependencies = Column(JSONB)
+    context = Column(JSONB)
+    payload = Column(JSONB)
+    
+    # Stage outcome
+    status = Column(String(50), default='pending')
+    assigned_agent = Column(String(255), nullable=True)
+    result = Column(JSONB, nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    checkpoint = relationship("WorkflowCheckpoint", back_populates="stages")
@@ -2,7 +2,7 @@
 Task model for SQLAlchemy ORM
 """
 
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, UUID as SqlUUID
+from sqlalchemy import BigInteger, Column, String, Text, Integer, DateTime, ForeignKey, UUID as SqlUUID
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -27,15 +27,30 @@ class Task(Base):
     workflow_id = Column(SqlUUID(as_uuid=True), ForeignKey("workflows.id"), nullable=True)
     execution_id = Column(SqlUUID(as_uuid=True), ForeignKey("executions.id"), nullable=True)
     
+    # Scheduler claim: which replica holds the task and until when
+    claimed_by = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Task type, promoted out of metadata so type-scoped listings can use an index
+    task_type = Column("type", String(100), nullable=True)
+    
     # Task metadata (includes context and payload)
     task_metadata = Column("metadata", JSONB, nullable=True)
     
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Timestamps (created_at is also the daily partition key of tasks)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     assigned_agent = relationship("Agent", back_populates="tasks")
     workflow = relationship("Workflow", back_populates="tasks")
-    execution = relationship("Execution", back_populates="tasks")
\ No newline at end of file
+    execution = relationship("Execution", back_populates="tasks")
+
+
+class TaskStatusCount(Base):
+    """Number of tasks per status, maintained by statement-level triggers on tasks"""
+    __tablename__ = "task_status_counts"
+    
+    status = Column(String(50), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
@@ -9,6 +9,8 @@ import logging
 from typing import Set, Optional, Callable
 from concurrent.futures import ThreadPoolExecutor
 
+from .task_service import STATUS_FLUSH_INTERVAL
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,6 +53,8 @@ class BackgroundService:
         self._background_tasks.add(asyncio.create_task(self._health_monitor()))
         self._background_tasks.add(asyncio.create_task(self._performance_optimizer()))
         self._background_tasks.add(asyncio.create_task(self._cleanup_manager()))
+        self._background_tasks.add(asyncio.create_task(self._lease_reaper()))
+        self._background_tasks.add(asyncio.create_task(self._status_flusher()))
         
         logger.info("🚀 Background Service processes started")
     
@@ -68,6 +72,13 @@ class BackgroundService:
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
         
+        # Write out any status transitions still buffered
+        if self.task_service:
+            try:
+                await self.task_service.flush_status_updates()
+            except Exception as e:
+                logger.error(f"❌ Final status flush failed: {e}")
+        
         # Shutdown executor
         self.executor.shutdown(wait=True)
         
@@ -100,8 +111,17 @@ class BackgroundService:
     async def _cleanup_manager(self):
         """Background cleanup management"""
         while self.running:
+            # Keep daily task partitions ahead of the clock; a failure here must not stop retention
+            try:
+                if self.task_service:
+                    created_partitions = await self.task_service.ensure_task_partitions()
+                    if created_partitions > 0:
+                        logger.info(f"🗂️ Created {created_partitions} task partitions")
+            except Exception as e:
+                logger.error(f"❌ Task partition maintenance error: {e}")
+            
             try:
-                # Cleanup completed tasks
+                # Drop expired tasks
                 if self.task_service:
                     cleaned_count = await self._cleanup_completed_tasks()
                     if cleaned_count > 0:
@@ -109,7 +129,7 @@ class BackgroundService:
                 
                 # Cleanup workflows
                 if self.workflow_service:
-                    workflow_cleaned = self.workflow_service.cleanup_completed_workflows(max_age_hours=24)
+                    workflow_cleaned = await self.workflow_service.cleanup_completed_workflows(max_age_hours=24)
                     if workflow_cleaned > 0:
                         logger.info(f"🧹 Cleaned up {workflow_cleaned} old workflows")
                 
@@ -118,11 +138,35 @@ class BackgroundService:
                 logger.error(f"❌ Cleanup manager error: {e}")
                 await asyncio.sleep(1800)  # Retry in 30 minutes
     
+    async def _lease_reaper(self):
+        """Return tasks held by crashed schedulers to the pending pool"""
+        while self.running:
+            try:
+                if self.task_service:
+                    requeued = await self.task_service.requeue_expired_leases()
+                    if requeued > 0:
+                        logger.info(f"♻️ Requeued {requeued} tasks with expired leases")
+                await asyncio.sleep(30)  # Check every 30 seconds
+            except Exception as e:
+                logger.error(f"❌ Lease reaper error: {e}")
+                await asyncio.sleep(60)
+    
+    async def _status_flusher(self):
+        """Write buffered task status transitions behind in batches"""
+        while self.running:
+            try:
+                if self.task_service:
+                    await self.task_service.flush_status_updates()
+                await asyncio.sleep(STATUS_FLUSH_INTERVAL)
+            except Exception as e:
+                logger.error(f"❌ Status flush error: {e}")
+                await asyncio.sleep(5)
+    
     async def _cleanup_completed_tasks(self) -> int:
         """Clean up old completed tasks"""
         try:
             # Clean up database tasks (older ones)
-            db_cleaned_count = self.task_service.cleanup_completed_tasks(max_age_hours=24)
+            db_cleaned_count = await self.task_service.cleanup_completed_tasks(max_age_hours=24)
             return db_cleaned_count
         except Exception as e:
             logger.error(f"❌ Failed to cleanup completed tasks: {e}")
@@ -16,6 +16,7 @@ TASK_COUNTER = Counter('hive_tasks_total', 'Total tasks processed', ['task_type'
 TASK_DURATION = Histogram('hive_task_duration_seconds', 'Task execution time', ['task_type', 'agent'])
 ACTIVE_TASKS = Gauge('hive_active_tasks', 'Currently active tasks', ['agent'])
 AGENT_UTILIZATION = Gauge('hive_agent_utilization', 'Agent utilization percentage', ['agent'])
+TIME_TO_FIRST_TOKEN = Histogram('hive_time_to_first_token_seconds', 'Time until the first generated token arrives', ['task_type', 'agent'])
 
 
 class AdaptiveLoadBalancer:
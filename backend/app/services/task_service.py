@@ -3,17 +3,25 @@ Task service for database operations
 Handles CRUD operations for tasks and integrates with the UnifiedCoordinator
 """
 
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import (
+    DateTime, String, UUID as SqlUUID, bindparam, case, cast, column, delete, desc, exists, func, insert,
+    or_, select, text, tuple_, update, values
+)
 from datetime import datetime, timedelta
+import asyncio
+import base64
+import logging
 import uuid
 
-from ..models.task import Task as ORMTask
-from ..core.database import SessionLocal
+from ..models.task import Task as ORMTask, TaskStatusCount
+from ..core.database import AsyncSessionLocal, async_engine
+from ..core.task_archive import TaskArchive
 from typing import Dict, List, Optional, Any
 from enum import Enum
 
+logger = logging.getLogger(__name__)
+
 # Define these locally to avoid circular imports
 class TaskStatus(Enum):
     PENDING = "pending"
@@ -23,6 +31,28 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+# Statuses in which a scheduler holds a lease on the task
+CLAIMED_STATUSES = ('assigned', 'in_progress')
+
+# Statuses after which a task does not change again; recording one flushes immediately
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'timeout')
+
+# Seconds between write-behind flushes of buffered status transitions
+STATUS_FLUSH_INTERVAL = 0.25
+
+# Statuses removed by retention once completed_at passes the cutoff
+EXPIRABLE_STATUSES = ('completed', 'failed')
+
+# Daily tasks partitions are named tasks_pYYYYMMDD and created this many days ahead
+TASK_PARTITION_PREFIX = 'tasks_p'
+TASK_PARTITION_DAYS_AHEAD = 7
+
+# Longest a partition DETACH may wait for the lock on tasks before retention retries later
+TASK_PARTITION_LOCK_TIMEOUT = '5s'
+
+# Rows moved per archive segment when archiving by DELETE ... RETURNING
+TASK_ARCHIVE_BATCH_SIZE = 50000
+
 class AgentType(Enum):
     PYTHON = "python"
     JAVASCRIPT = "javascript"
@@ -33,57 +63,96 @@ class AgentType(Enum):
 class TaskService:
     """Service for managing task persistence and database operations"""
     
-    def __init__(self):
-        pass
+    def __init__(self, archive: Optional[TaskArchive] = None):
+        # Where expired tasks go before they leave the table; None just deletes them
+        self.archive = archive
+        
+        # Latest unflushed transition per task, coalesced between flushes
+        self._status_updates: Dict[uuid.UUID, Dict[str, Any]] = {}
+        self._status_flush_lock = asyncio.Lock()
     
     def initialize(self):
-        """Initialize the task service - placeholder for any setup needed"""
-        pass
+        """Initialize the task service"""
+        if self.archive:
+            try:
+                self.archive.ensure_directory()
+            except OSError as e:
+                # Retention keeps expired rows until the archive can be written
+                logger.error(f"❌ Task archive directory {self.archive.directory} is not writable: {e}")
     
-    def create_task(self, task_data: Dict[str, Any]) -> ORMTask:
+    def _task_row(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map coordinator task data to tasks table column values"""
+        row = {
+            'id': uuid.UUID(task_data['id']) if isinstance(task_data.get('id'), str) else task_data.get('id', uuid.uuid4()),
+            'title': task_data.get('title', f"Task {task_data.get('type', 'unknown')}"),
+            'description': task_data.get('description', ''),
+            'priority': task_data.get('priority', 5),
+            'status': task_data.get('status', 'pending'),
+            'assigned_agent_id': task_data.get('assigned_agent'),
+            'workflow_id': uuid.UUID(task_data['workflow_id']) if task_data.get('workflow_id') else None,
+            'task_type': task_data.get('type', 'unknown'),
+            'task_metadata': {
+                'context': task_data.get('context', {}),
+                'payload': task_data.get('payload', {}),
+                'type': task_data.get('type', 'unknown')
+            },
+            'started_at': None,
+            'completed_at': None
+        }
+        
+        if task_data.get('status') == 'in_progress' and task_data.get('started_at'):
+            row['started_at'] = datetime.fromisoformat(task_data['started_at']) if isinstance(task_data['started_at'], str) else task_data['started_at']
+            
+        if task_data.get('status') == 'completed' and task_data.get('completed_at'):
+            row['completed_at'] = datetime.fromisoformat(task_data['completed_at']) if isinstance(task_data['completed_at'], str) else task_data['completed_at']
+        
+        return row
+    
+    async def create_task(self, task_data: Dict[str, Any]) -> ORMTask:
         """Create a task in the database from a coordinator task"""
-        with SessionLocal() as db:
+        async with AsyncSessionLocal() as db:
             try:
                 # Create task from data dictionary
-                db_task = ORMTask(
-                    id=uuid.UUID(task_data['id']) if isinstance(task_data.get('id'), str) else task_data.get('id', uuid.uuid4()),
-                    title=task_data.get('title', f"Task {task_data.get('type', 'unknown')}"),
-                    description=task_data.get('description', ''),
-                    priority=task_data.get('priority', 5),
-                    status=task_data.get('status', 'pending'),
-                    assigned_agent_id=task_data.get('assigned_agent'),
-                    workflow_id=uuid.UUID(task_data['workflow_id']) if task_data.get('workflow_id') else None,
-                    task_metadata={
-                        'context': task_data.get('context', {}),
-                        'payload': task_data.get('payload', {}),
-                        'type': task_data.get('type', 'unknown')
-                    }
-                )
-                
-                if task_data.get('status') == 'in_progress' and task_data.get('started_at'):
-                    db_task.started_at = datetime.fromisoformat(task_data['started_at']) if isinstance(task_data['started_at'], str) else task_data['started_at']
-                    
-                if task_data.get('status') == 'completed' and task_data.get('completed_at'):
-                    db_task.completed_at = datetime.fromisoformat(task_data['completed_at']) if isinstance(task_data['completed_at'], str) else task_data['completed_at']
+                db_task = ORMTask(**self._task_row(task_data))
                 
                 db.add(db_task)
-                db.commit()
-                db.refresh(db_task)
+                await db.commit()
+                await db.refresh(db_task)
                 
                 return db_task
                 
             except Exception as e:
-                db.rollback()
+                await db.rollback()
+                raise e
+    
+    async def create_tasks(self, tasks_data: List[Dict[str, Any]]) -> int:
+        """Create many tasks with batched multi-row INSERTs in a single transaction"""
+        if not tasks_data:
+            return 0
+        async with AsyncSessionLocal() as db:
+            try:
+                rows = [self._task_row(task_data) for task_data in tasks_data]
+                await db.execute(insert(ORMTask), rows)
+                await db.commit()
+                return len(rows)
+                
+            except Exception as e:
+                await db.rollback()
                 raise e
     
-    def update_task(self, task_id: str, task_data: Dict[str, Any]) -> Optional[ORMTask]:
+    async def update_task(self, task_id: str, task_data: Dict[str, Any]) -> Optional[ORMTask]:
         """Update a task in the database"""
-        with SessionLocal() as db:
+        # Convert string ID to UUID if needed
+        uuid_id = uuid.UUID(task_id) if isinstance(task_id, str) else task_id
+        
+        # Buffered transitions are older than this update and must land first
+        if uuid_id in self._status_updates:
+            await self.flush_status_updates()
+        
+        async with AsyncSessionLocal() as db:
             try:
-                # Convert string ID to UUID if needed
-                uuid_id = uuid.UUID(task_id) if isinstance(task_id, str) else task_id
                 
-                db_task = db.query(ORMTask).filter(ORMTask.id == uuid_id).first()
+                db_task = await db.get(ORMTask, uuid_id)
                 if not db_task:
                     return None
                 
@@ -95,13 +164,14 @@ class TaskService:
                 db_task.assigned_agent_id = task_data.get('assigned_agent', db_task.assigned_agent_id)
                 
                 # Update metadata with context and payload
-                current_metadata = db_task.task_metadata or {}
+                current_metadata = dict(db_task.task_metadata or {})
                 current_metadata.update({
                     'context': task_data.get('context', current_metadata.get('context', {})),
                     'payload': task_data.get('payload', current_metadata.get('payload', {})),
                     'type': task_data.get('type', current_metadata.get('type', 'unknown'))
                 })
                 db_task.task_metadata = current_metadata
+                db_task.task_type = current_metadata['type']
                 
                 # Update timestamps based on status
                 if task_data.get('status') == 'in_progress' and not db_task.started_at:
@@ -110,80 +180,526 @@ class TaskService:
                 if task_data.get('status') == 'completed' and not db_task.completed_at:
                     db_task.completed_at = datetime.utcnow()
                 
-                db.commit()
-                db.refresh(db_task)
+                # Finished tasks no longer hold a scheduler lease
+                if db_task.status not in CLAIMED_STATUSES:
+                    db_task.claimed_by = None
+                    db_task.lease_expires_at = None
+                
+                await db.commit()
+                await db.refresh(db_task)
                 
                 return db_task
                 
             except Exception as e:
-                db.rollback()
+                await db.rollback()
                 raise e
     
-    def get_task(self, task_id: str) -> Optional[ORMTask]:
+    async def record_status(self, task_id: str, status: str, assigned_agent: Optional[str] = None):
+        """Buffer a status transition for the next batched flush.
+        
+        Transitions for the same task coalesce into one row update. Terminal
+        statuses are flushed before returning, so a finished task is durable
+        once this call completes.
+        """
+        uuid_id = uuid.UUID(task_id) if isinstance(task_id, str) else task_id
+        now = datetime.utcnow()
+        
+        pending = self._status_updates.setdefault(
+            uuid_id, {'assigned_agent_id': None, 'started_at': None, 'completed_at': None}
+        )
+        pending['status'] = status
+        if assigned_agent:
+            pending['assigned_agent_id'] = assigned_agent
+        if status == 'in_progress' and not pending['started_at']:
+            pending['started_at'] = now
+        if status in TERMINAL_STATUSES:
+            pending['completed_at'] = now
+            await self.flush_status_updates()
+    
+    async def flush_status_updates(self) -> int:
+        """Apply all buffered transitions in one batched UPDATE"""
+        async with self._status_flush_lock:
+            if not self._status_updates:
+                return 0
+            pending, self._status_updates = self._status_updates, {}
+            
+            try:
+                async with AsyncSessionLocal() as db:
+                    if async_engine.dialect.name == 'postgresql':
+                        await db.execute(self._status_update_from_values(pending))
+                    else:
+                        # No UPDATE ... FROM (VALUES ...) elsewhere (e.g. SQLite), so run
+                        # the same per-row update as one executemany keyed by primary key
+                        await db.execute(self._status_update_by_id(), [
+                            {
+                                'b_id': task_id,
+                                'b_status': u['status'],
+                                'b_assigned_agent_id': u['assigned_agent_id'],
+                                'b_started_at': u['started_at'],
+                                'b_completed_at': u['completed_at'],
+                            }
+                            for task_id, u in pending.items()
+                        ])
+                    await db.commit()
+            except Exception:
+                # Put the batch back underneath anything recorded since, for the next flush
+                for task_id, older in pending.items():
+                    newer = self._status_updates.get(task_id)
+                    if newer is None:
+                        self._status_updates[task_id] = older
+                        continue
+                    for key in ('assigned_agent_id', 'started_at', 'completed_at'):
+                        newer[key] = newer[key] or older[key]
+                raise
+            
+            return len(pending)
+    
+    def _status_update_from_values(self, pending: Dict[uuid.UUID, Dict[str, Any]]):
+        """UPDATE ... FROM (VALUES ...) applying every buffered transition in one statement"""
+        transitions = values(
+            column('id', SqlUUID(as_uuid=True)),
+            column('status', String(50)),
+            column('assigned_agent_id', String(255)),
+            column('started_at', DateTime(timezone=True)),
+            column('completed_at', DateTime(timezone=True)),
+            name='transitions'
+        ).data([
+            (task_id, u['status'], u['assigned_agent_id'], u['started_at'], u['completed_at'])
+            for task_id, u in pending.items()
+        ])
+        still_claimed = transitions.c.status.in_(CLAIMED_STATUSES)
+        # A VALUES column that is NULL in every row is typed text; cast back for COALESCE
+        agent_id = cast(transitions.c.assigned_agent_id, String(255))
+        started_at = cast(transitions.c.started_at, DateTime(timezone=True))
+        completed_at = cast(transitions.c.completed_at, DateTime(timezone=True))
+        
+        return update(ORMTask).where(ORMTask.id == transitions.c.id).values(
+            status=transitions.c.status,
+            assigned_agent_id=func.coalesce(agent_id, ORMTask.assigned_agent_id),
+            started_at=func.coalesce(ORMTask.started_at, started_at),
+            completed_at=func.coalesce(completed_at, ORMTask.completed_at),
+            # Finished tasks no longer hold a scheduler lease
+            claimed_by=case((still_claimed, ORMTask.claimed_by)),
+            lease_expires_at=case((still_claimed, ORMTask.lease_expires_at))
+        ).execution_options(synchronize_session=False)
+    
+    def _status_update_by_id(self):
+        """Single-row form of the transition update, for executemany over the buffered rows"""
+        tasks = ORMTask.__table__
+        status = bindparam('b_status', type_=String(50))
+        still_claimed = status.in_(CLAIMED_STATUSES)
+        
+        return tasks.update().where(tasks.c.id == bindparam('b_id', type_=SqlUUID(as_uuid=True))).values(
+            status=status,
+            assigned_agent_id=func.coalesce(
+                bindparam('b_assigned_agent_id', type_=String(255)), tasks.c.assigned_agent_id
+            ),
+            started_at=func.coalesce(
+                tasks.c.started_at, bindparam('b_started_at', type_=DateTime(timezone=True))
+            ),
+            completed_at=func.coalesce(
+                bindparam('b_completed_at', type_=DateTime(timezone=True)), tasks.c.completed_at
+            ),
+            # Finished tasks no longer hold a scheduler lease
+            claimed_by=case((still_claimed, tasks.c.claimed_by)),
+            lease_expires_at=case((still_claimed, tasks.c.lease_expires_at))
+        )
+    
+    async def get_task(self, task_id: str) -> Optional[ORMTask]:
         """Get a task by ID"""
-        with SessionLocal() as db:
+        async with AsyncSessionLocal() as db:
             uuid_id = uuid.UUID(task_id) if isinstance(task_id, str) else task_id
-            return db.query(ORMTask).filter(ORMTask.id == uuid_id).first()
+            return await db.get(ORMTask, uuid_id)
+    
+    @staticmethod
+    def encode_cursor(task: ORMTask) -> str:
+        """Encode a task's (created_at, id) sort key as an opaque page cursor"""
+        key = f"{task.created_at.isoformat()}|{task.id}"
+        return base64.urlsafe_b64encode(key.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+        """Decode a page cursor back into its (created_at, id) sort key"""
+        try:
+            created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+            return datetime.fromisoformat(created_at), uuid.UUID(task_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
     
-    def get_tasks(self, status: Optional[str] = None, agent_id: Optional[str] = None, 
-                  workflow_id: Optional[str] = None, limit: int = 100) -> List[ORMTask]:
-        """Get tasks with optional filtering"""
-        with SessionLocal() as db:
-            query = db.query(ORMTask)
+    async def get_tasks(self, status: Optional[str] = None, agent_id: Optional[str] = None, 
+                        workflow_id: Optional[str] = None, limit: int = 100, offset: int = 0,
+                        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+                        task_type: Optional[str] = None,
+                        metadata_contains: Optional[Dict[str, Any]] = None) -> List[ORMTask]:
+        """Get tasks with optional filtering, newest first.
+        
+        Pass the decoded cursor of the last task seen as `after` to fetch the next
+        page; the seek on (created_at, id) keeps deep pages on the index instead of
+        scanning past `offset` rows. `metadata_contains` is a JSONB containment
+        predicate (e.g. {"payload": {"repo": "hive"}}) served by the metadata GIN index.
+        """
+        async with AsyncSessionLocal() as db:
+            query = select(ORMTask)
             
             if status:
-                query = query.filter(ORMTask.status == status)
+                query = query.where(ORMTask.status == status)
             if agent_id:
-                query = query.filter(ORMTask.assigned_agent_id == agent_id)
+                query = query.where(ORMTask.assigned_agent_id == agent_id)
             if workflow_id:
                 uuid_workflow_id = uuid.UUID(workflow_id) if isinstance(workflow_id, str) else workflow_id
-                query = query.filter(ORMTask.workflow_id == uuid_workflow_id)
+                query = query.where(ORMTask.workflow_id == uuid_workflow_id)
+            if task_type:
+                query = query.where(ORMTask.task_type == task_type)
+            if metadata_contains:
+                query = query.where(ORMTask.task_metadata.contains(metadata_contains))
+            if after:
+                query = query.where(tuple_(ORMTask.created_at, ORMTask.id) < tuple_(*after))
+            elif offset:
+                query = query.offset(offset)
             
-            return query.order_by(desc(ORMTask.created_at)).limit(limit).all()
+            result = await db.execute(
+                query.order_by(desc(ORMTask.created_at), desc(ORMTask.id)).limit(limit)
+            )
+            return list(result.scalars().all())
     
-    def get_pending_tasks(self, limit: int = 50) -> List[ORMTask]:
+    async def get_pending_tasks(self, limit: int = 50) -> List[ORMTask]:
         """Get pending tasks ordered by priority"""
-        with SessionLocal() as db:
-            return db.query(ORMTask).filter(
-                ORMTask.status == 'pending'
-            ).order_by(
-                ORMTask.priority.asc(),  # Lower number = higher priority
-                ORMTask.created_at.asc()
-            ).limit(limit).all()
-    
-    def delete_task(self, task_id: str) -> bool:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ORMTask).where(
+                    ORMTask.status == 'pending'
+                ).order_by(
+                    ORMTask.priority.asc(),  # Lower number = higher priority
+                    ORMTask.created_at.asc()
+                ).limit(limit)
+            )
+            return list(result.scalars().all())
+    
+    async def claim_tasks(self, worker_id: str, limit: int = 10, lease_seconds: int = 300) -> List[ORMTask]:
+        """Atomically claim up to `limit` pending tasks for one scheduler.
+        
+        Rows locked by a concurrent claim are skipped, so replicas pull disjoint
+        batches without waiting on each other.
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                claimable = select(ORMTask.id).where(
+                    ORMTask.status == 'pending'
+                ).order_by(
+                    ORMTask.priority.asc(),  # Lower number = higher priority
+                    ORMTask.created_at.asc()
+                ).limit(limit).with_for_update(skip_locked=True)
+                
+                result = await db.execute(
+                    update(ORMTask)
+                    .where(ORMTask.id.in_(claimable))
+                    .values(
+                        status='assigned',
+                        claimed_by=worker_id,
+                        lease_expires_at=func.now() + timedelta(seconds=lease_seconds)
+                    )
+                    .returning(ORMTask)
+                    .execution_options(synchronize_session=False)
+                )
+                claimed = result.scalars().all()
+                
+                await db.commit()
+                return sorted(claimed, key=lambda task: (task.priority, task.created_at))
+                
+            except Exception as e:
+                await db.rollback()
+                raise e
+    
+    async def renew_leases(self, task_ids: List[str], worker_id: str, lease_seconds: int = 300) -> int:
+        """Extend the leases a scheduler still holds; returns how many were renewed"""
+        if not task_ids:
+            return 0
+        async with AsyncSessionLocal() as db:
+            try:
+                uuid_ids = [uuid.UUID(task_id) if isinstance(task_id, str) else task_id for task_id in task_ids]
+                result = await db.execute(
+                    update(ORMTask)
+                    .where(
+                        ORMTask.id.in_(uuid_ids),
+                        ORMTask.claimed_by == worker_id,
+                        ORMTask.status.in_(CLAIMED_STATUSES)
+                    )
+                    .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+                    .execution_options(synchronize_session=False)
+                )
+                
+                await db.commit()
+                return result.rowcount
+                
+            except Exception as e:
+                await db.rollback()
+                raise e
+    
+    async def hand_off_tasks(self, task_ids: List[str], worker_id: str) -> int:
+        """End the leases of claimed tasks once their executor has accepted them.
+        
+        The tasks stay assigned to `worker_id`, but the lease reaper no longer
+        returns them to the pending pool.
+        """
+        if not task_ids:
+            return 0
+        async with AsyncSessionLocal() as db:
+            try:
+                uuid_ids = [uuid.UUID(task_id) if isinstance(task_id, str) else task_id for task_id in task_ids]
+                result = await db.execute(
+                    update(ORMTask)
+                    .where(
+                        ORMTask.id.in_(uuid_ids),
+                        ORMTask.claimed_by == worker_id,
+                        ORMTask.status.in_(CLAIMED_STATUSES)
+                    )
+                    .values(lease_expires_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+                
+                await db.commit()
+                return result.rowcount
+                
+            except Exception as e:
+                await db.rollback()
+                raise e
+    
+    async def requeue_expired_leases(self) -> int:
+        """Return tasks whose scheduler lease lapsed to the pending pool"""
+        async with AsyncSessionLocal() as db:
+            try:
+                result = await db.execute(
+                    update(ORMTask)
+                    .where(
+                        ORMTask.status.in_(CLAIMED_STATUSES),
+                        ORMTask.lease_expires_at < func.now()
+                    )
+                    .values(status='pending', claimed_by=None, lease_expires_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+                
+                await db.commit()
+                return result.rowcount
+                
+            except Exception as e:
+                await db.rollback()
+                raise e
+    
+    async def delete_task(self, task_id: str) -> bool:
         """Delete a task"""
-        with SessionLocal() as db:
+        async with AsyncSessionLocal() as db:
             try:
                 uuid_id = uuid.UUID(task_id) if isinstance(task_id, str) else task_id
-                task = db.query(ORMTask).filter(ORMTask.id == uuid_id).first()
+                task = await db.get(ORMTask, uuid_id)
                 if task:
-                    db.delete(task)
-                    db.commit()
+                    await db.delete(task)
+                    await db.commit()
                     return True
                 return False
             except Exception as e:
-                db.rollback()
+                await db.rollback()
                 raise e
     
-    def cleanup_completed_tasks(self, max_age_hours: int = 24) -> int:
-        """Clean up old completed tasks"""
-        with SessionLocal() as db:
+    async def _tasks_partitioned(self, db) -> bool:
+        """Whether tasks is a partitioned table (databases built by create_all are not)"""
+        if async_engine.dialect.name != 'postgresql':
+            return False
+        result = await db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('tasks'))"
+        ))
+        return bool(result.scalar())
+    
+    async def ensure_task_partitions(self, days_ahead: int = TASK_PARTITION_DAYS_AHEAD) -> int:
+        """Create the daily tasks partitions for today and the next `days_ahead` days.
+        
+        Each day is created in its own transaction, so a day that cannot be
+        created is logged and retried next cycle without holding up the rest.
+        """
+        async with AsyncSessionLocal() as db:
+            if not await self._tasks_partitioned(db):
+                return 0
+        
+        today = datetime.utcnow().date()
+        created = 0
+        for day_offset in range(days_ahead + 1):
+            day = today + timedelta(days=day_offset)
+            async with AsyncSessionLocal() as db:
+                try:
+                    result = await db.execute(text("SELECT ensure_task_partition(:day)"), {'day': day})
+                    await db.commit()
+                    created += bool(result.scalar())
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"❌ Could not create tasks partition for {day}: {e}")
+        
+        return created
+    
+    async def cleanup_completed_tasks(self, max_age_hours: int = 24) -> int:
+        """Clean up old completed tasks.
+        
+        On a partitioned tasks table, whole daily partitions past the cutoff are
+        dropped instead of deleting their rows one by one. With an archive
+        configured, expired rows are written to it before they leave the table.
+        """
+        cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
+        async with AsyncSessionLocal() as db:
+            try:
+                if not await self._tasks_partitioned(db):
+                    return await self._delete_expired(
+                        db,
+                        ORMTask.status.in_(EXPIRABLE_STATUSES),
+                        ORMTask.completed_at < cutoff_time
+                    )
+                
+                partitions = (await db.execute(text(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'tasks'::regclass"
+                ))).scalars().all()
+                
+            except Exception as e:
+                await db.rollback()
+                raise e
+        
+        removed = 0
+        for partition in sorted(partitions):
+            if not partition.startswith(TASK_PARTITION_PREFIX):
+                continue
+            day_start = datetime.strptime(partition[len(TASK_PARTITION_PREFIX):], '%Y%m%d')
+            day_end = day_start + timedelta(days=1)
+            if day_end > cutoff_time:
+                break
+            removed += await self._expire_task_partition(partition, day_start, day_end, cutoff_time)
+        
+        return removed
+    
+    async def _expire_task_partition(self, partition: str, day_start: datetime,
+                                     day_end: datetime, cutoff_time: datetime) -> int:
+        """Drop one expired daily partition, or delete its expired rows if others must survive.
+        
+        The archive export reads the still-attached partition in its own transaction;
+        only the short DETACH, row count check and DROP lock the tasks table.
+        """
+        segment = None
+        async with AsyncSessionLocal() as db:
+            try:
+                in_partition = (ORMTask.created_at >= day_start, ORMTask.created_at < day_end)
+                has_survivors = (await db.execute(select(exists().where(
+                    *in_partition,
+                    or_(
+                        ORMTask.status.is_(None),
+                        ORMTask.status.not_in(EXPIRABLE_STATUSES),
+                        ORMTask.completed_at.is_(None),
+                        ORMTask.completed_at >= cutoff_time
+                    )
+                )))).scalar()
+                
+                if has_survivors:
+                    # Unfinished work keeps the partition; remove only what retention covers
+                    return await self._delete_expired(
+                        db,
+                        *in_partition,
+                        ORMTask.status.in_(EXPIRABLE_STATUSES),
+                        ORMTask.completed_at < cutoff_time
+                    )
+                
+                if self.archive:
+                    segment = self.archive.open_segment()
+                    rows = await db.stream(text(f'SELECT * FROM "{partition}"'))
+                    async for chunk in rows.mappings().partitions(TASK_ARCHIVE_BATCH_SIZE):
+                        await asyncio.to_thread(segment.write, chunk)
+                    await asyncio.to_thread(segment.close)
+                await db.commit()
+                
+            except OSError as e:
+                await db.rollback()
+                if segment:
+                    segment.discard()
+                logger.error(f"❌ Could not archive tasks partition {partition}, keeping it: {e}")
+                return 0
+            except Exception as e:
+                await db.rollback()
+                if segment:
+                    segment.discard()
+                raise e
+        
+        async with AsyncSessionLocal() as db:
             try:
-                cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
+                # Give up rather than queue every task query behind the DETACH
+                await db.execute(text(f"SET LOCAL lock_timeout = '{TASK_PARTITION_LOCK_TIMEOUT}'"))
+                await db.execute(text(f'ALTER TABLE tasks DETACH PARTITION "{partition}"'))
+                
+                counts = dict((await db.execute(text(
+                    f"""SELECT COALESCE(status, 'unknown'), COUNT(*) FROM "{partition}" GROUP BY 1"""
+                ))).all())
+                if segment is not None and counts != segment.statuses:
+                    # Rows changed since the export; rolling back reattaches the partition
+                    await db.rollback()
+                    segment.discard()
+                    logger.warning(f"⚠️ Tasks partition {partition} changed while being archived, keeping it")
+                    return 0
                 
-                deleted_count = db.query(ORMTask).filter(
-                    ORMTask.status.in_(['completed', 'failed']),
-                    ORMTask.completed_at < cutoff_time
-                ).delete(synchronize_session=False)
+                # Dropping a table fires no DELETE triggers, so settle the status counters here
+                for task_status, count in counts.items():
+                    await db.execute(
+                        update(TaskStatusCount).where(
+                            TaskStatusCount.status == task_status
+                        ).values(count=TaskStatusCount.count - count)
+                    )
                 
-                db.commit()
-                return deleted_count
+                await db.execute(text(f'DROP TABLE "{partition}"'))
+                await db.commit()
+                return sum(counts.values())
                 
             except Exception as e:
-                db.rollback()
+                await db.rollback()
+                if segment:
+                    segment.discard()
                 raise e
     
+    async def _delete_expired(self, db, *conditions) -> int:
+        """Delete tasks matching conditions, archiving them first when an archive is configured.
+        
+        Each archived batch is one DELETE ... RETURNING whose segment is made durable
+        before the transaction commits, so a failure leaves rows in the table
+        rather than losing them.
+        """
+        if not self.archive:
+            result = await db.execute(
+                delete(ORMTask).where(*conditions).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return result.rowcount
+        
+        removed = 0
+        while True:
+            batch = select(ORMTask.id).where(*conditions).limit(TASK_ARCHIVE_BATCH_SIZE)
+            segment = None
+            try:
+                segment = self.archive.open_segment()
+                rows = (await db.execute(
+                    delete(ORMTask).where(
+                        *conditions, ORMTask.id.in_(batch.scalar_subquery())
+                    ).returning(*ORMTask.__table__.columns).execution_options(synchronize_session=False)
+                )).mappings().all()
+                await asyncio.to_thread(segment.write, rows)
+                await asyncio.to_thread(segment.close)
+                await db.commit()
+            except OSError as e:
+                # An unwritable archive keeps the rows in place rather than stopping retention
+                await db.rollback()
+                if segment:
+                    segment.discard()
+                logger.error(f"❌ Could not archive expired tasks, keeping them: {e}")
+                return removed
+            except Exception:
+                if segment:
+                    segment.discard()
+                raise
+            
+            removed += len(rows)
+            if len(rows) < TASK_ARCHIVE_BATCH_SIZE:
+                return removed
+    
     def coordinator_task_from_orm(self, orm_task: ORMTask) -> Dict[str, Any]:
         """Convert ORM task back to coordinator task data"""        
         metadata = orm_task.task_metadata or {}
@@ -191,7 +707,7 @@ class TaskService:
             'id': str(orm_task.id),
             'title': orm_task.title,
             'description': orm_task.description,
-            'type': metadata.get('type', 'unknown'),
+            'type': orm_task.task_type or metadata.get('type', 'unknown'),
             'priority': orm_task.priority,
             'status': orm_task.status,
             'context': metadata.get('context', {}),
@@ -203,14 +719,25 @@ class TaskService:
             'completed_at': orm_task.completed_at.isoformat() if orm_task.completed_at else None
         }
     
-    def get_task_statistics(self) -> Dict[str, Any]:
+    async def get_task_statistics(self) -> Dict[str, Any]:
         """Get task statistics"""
-        with SessionLocal() as db:
-            total_tasks = db.query(ORMTask).count()
-            pending_tasks = db.query(ORMTask).filter(ORMTask.status == 'pending').count()
-            in_progress_tasks = db.query(ORMTask).filter(ORMTask.status == 'in_progress').count()
-            completed_tasks = db.query(ORMTask).filter(ORMTask.status == 'completed').count()
-            failed_tasks = db.query(ORMTask).filter(ORMTask.status == 'failed').count()
+        async with AsyncSessionLocal() as db:
+            # Counters kept current by triggers on tasks: one tiny read regardless of table size
+            counts = dict((await db.execute(
+                select(TaskStatusCount.status, TaskStatusCount.count)
+            )).all())
+            
+            if not counts:
+                # No maintained counters (empty table, or a database without the triggers)
+                counts = dict((await db.execute(
+                    select(ORMTask.status, func.count()).group_by(ORMTask.status)
+                )).all())
+            
+            total_tasks = sum(counts.values())
+            pending_tasks = counts.get('pending', 0)
+            in_progress_tasks = counts.get('in_progress', 0)
+            completed_tasks = counts.get('completed', 0)
+            failed_tasks = counts.get('failed', 0)
             
             return {
                 'total_tasks': total_tasks,
@@ -219,4 +746,4 @@ class TaskService:
                 'completed_tasks': completed_tasks,
                 'failed_tasks': failed_tasks,
                 'success_rate': completed_tasks / total_tasks if total_tasks > 0 else 0
-            }
\ No newline at end of file
+            }
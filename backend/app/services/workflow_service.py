@@ -6,15 +6,28 @@ Handles workflow parsing, scheduling, dependency tracking, and execution managem
 
 import time
 import logging
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import selectinload
+
+from ..core.database import AsyncSessionLocal
+from ..models.sqlalchemy_models import WorkflowCheckpoint, WorkflowStageCheckpoint
+
 # Import shared types
 from .agent_service import AgentType
 
 logger = logging.getLogger(__name__)
 
+# How long a replica holds a running execution without renewing; once it lapses
+# another replica resumes the execution from its checkpoint
+WORKFLOW_LEASE_SECONDS = 120
+
 
 class TaskStatus(Enum):
     """Task status tracking"""
@@ -22,6 +35,7 @@ class TaskStatus(Enum):
     IN_PROGRESS = "in_progress" 
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 @dataclass
@@ -69,22 +83,28 @@ class WorkflowExecution:
 class WorkflowService:
     """Service for managing workflows and their execution"""
     
-    def __init__(self):
+    def __init__(self, owner: Optional[str] = None):
+        # Replica id under which this service leases the executions it drives
+        self.owner = owner or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
         self.workflow_tasks: Dict[str, List[Task]] = {}
         self.workflow_executions: Dict[str, WorkflowExecution] = {}
         self._initialized = False
     
-    def initialize(self):
+    async def initialize(self):
         """Initialize the workflow service"""
         if self._initialized:
             return
             
+        resumed = await self.resume_executions()
+        if resumed > 0:
+            logger.info(f"♻️ Resumed {resumed} workflow executions from checkpoints")
+        
         self._initialized = True
         logger.info("✅ Workflow Service initialized successfully")
     
     async def submit_workflow(self, workflow: Dict[str, Any]) -> str:
         """Submit a workflow for execution"""
-        workflow_id = f"workflow_{int(time.time())}"
+        workflow_id = f"workflow_{uuid.uuid4().hex}"
         execution_id = f"exec_{workflow_id}"
         
         tasks = self._parse_workflow_to_tasks(workflow, workflow_id)
@@ -100,6 +120,7 @@ class WorkflowService:
         
         self.workflow_tasks[workflow_id] = tasks
         self.workflow_executions[execution_id] = execution
+        await self._checkpoint_execution(execution)
         
         logger.info(f"🔄 Submitted workflow: {workflow_id} with {len(tasks)} tasks")
         return workflow_id
@@ -119,7 +140,11 @@ class WorkflowService:
                 workflow_id=workflow_id,
                 context=task_def.get('context', {}),
                 payload=task_def.get('payload', {}),
-                dependencies=task_def.get('dependencies', []),
+                # Dependencies name earlier tasks by id or by position in the definition
+                dependencies=[
+                    f"{workflow_id}_task_{dep}" if isinstance(dep, int) else dep
+                    for dep in task_def.get('dependencies', [])
+                ],
                 priority=task_def.get('priority', 3)
             )
             tasks.append(task)
@@ -131,9 +156,11 @@ class WorkflowService:
         ready_tasks = []
         
         for workflow_id, workflow_tasks in self.workflow_tasks.items():
+            # Stages restored from a checkpoint are only known to this service
+            known_tasks = {**{t.id: t for t in workflow_tasks}, **all_tasks}
             for task in workflow_tasks:
                 if (task.status == TaskStatus.PENDING and 
-                    self._dependencies_satisfied(task, all_tasks)):
+                    self._dependencies_satisfied(task, known_tasks)):
                     ready_tasks.append(task)
         
         return ready_tasks
@@ -146,10 +173,17 @@ class WorkflowService:
                 return False
         return True
     
-    def handle_task_completion(self, task: Task):
+    async def handle_task_dispatch(self, task: Task):
+        """Mark a ready workflow task as handed to an agent"""
+        task.status = TaskStatus.IN_PROGRESS
+        await self._checkpoint_stage(task)
+    
+    async def handle_task_completion(self, task: Task):
         """Handle completion of a workflow task"""
         if not task.workflow_id:
             return
+        
+        await self._checkpoint_stage(task)
             
         # Check if workflow is complete
         workflow_tasks = self.workflow_tasks.get(task.workflow_id, [])
@@ -162,10 +196,12 @@ class WorkflowService:
                 if len(failed_tasks) > 0:
                     execution.status = "failed"
                     execution.completed_at = time.time()
+                    await self._checkpoint_execution_status(execution)
                     logger.info(f"❌ Workflow {task.workflow_id} failed")
                 elif len(completed_tasks) == len(workflow_tasks):
                     execution.status = "completed"
                     execution.completed_at = time.time()
+                    await self._checkpoint_execution_status(execution)
                     logger.info(f"🎉 Workflow {task.workflow_id} completed")
                 break
     
@@ -226,7 +262,7 @@ class WorkflowService:
         executions.sort(key=lambda x: x["created_at"], reverse=True)
         return executions
     
-    def cleanup_completed_workflows(self, max_age_hours: int = 24):
+    async def cleanup_completed_workflows(self, max_age_hours: int = 24):
         """Clean up old completed workflow executions"""
         cutoff_time = time.time() - (max_age_hours * 3600)
         
@@ -257,7 +293,237 @@ class WorkflowService:
             del self.workflow_executions[execution_id]
             removed_count += 1
         
+        await self._delete_checkpoints(cutoff_time)
+        
         if removed_count > 0:
             logger.info(f"🧹 Cleaned up {removed_count} old workflow executions")
         
-        return removed_count
\ No newline at end of file
+        return removed_count
+    
+    # =========================================================================
+    # CHECKPOINTING
+    # =========================================================================
+    
+    async def resume_executions(self) -> int:
+        """Take over running executions whose owner's lease lapsed, keeping completed stages.
+        
+        Checkpoints are claimed with FOR UPDATE SKIP LOCKED, so when several
+        replicas start together each execution is resumed by exactly one of them,
+        and executions a live replica still renews are left alone.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                claimable = select(WorkflowCheckpoint.execution_id).where(
+                    WorkflowCheckpoint.status == "running",
+                    or_(
+                        WorkflowCheckpoint.lease_expires_at.is_(None),
+                        WorkflowCheckpoint.lease_expires_at < func.now()
+                    )
+                ).with_for_update(skip_locked=True)
+                
+                claimed = (await db.execute(
+                    update(WorkflowCheckpoint)
+                    .where(WorkflowCheckpoint.execution_id.in_(claimable))
+                    .values(owner=self.owner, lease_expires_at=self._lease_expiry())
+                    .returning(WorkflowCheckpoint.execution_id)
+                    .execution_options(synchronize_session=False)
+                )).scalars().all()
+                await db.commit()
+                
+                checkpoints = (await db.execute(
+                    select(WorkflowCheckpoint)
+                    .where(WorkflowCheckpoint.execution_id.in_(claimed))
+                    .options(selectinload(WorkflowCheckpoint.stages))
+                )).scalars().all()
+                
+                resumed = 0
+                for checkpoint in checkpoints:
+                    if checkpoint.execution_id in self.workflow_executions:
+                        # Our own lease lapsed and was won back; the local state is current
+                        continue
+                    stages = sorted(checkpoint.stages, key=lambda stage: stage.position)
+                    tasks = [self._task_from_stage(checkpoint.workflow_id, stage) for stage in stages]
+                    
+                    self.workflow_tasks[checkpoint.workflow_id] = tasks
+                    self.workflow_executions[checkpoint.execution_id] = WorkflowExecution(
+                        workflow_id=checkpoint.workflow_id,
+                        execution_id=checkpoint.execution_id,
+                        tasks=tasks,
+                        created_at=checkpoint.created_at.timestamp() if checkpoint.created_at else time.time(),
+                        metadata=checkpoint.execution_metadata or {}
+                    )
+                    resumed += 1
+                
+                return resumed
+        except Exception as e:
+            logger.error(f"❌ Failed to resume workflow executions: {e}")
+            return 0
+    
+    async def renew_execution_leases(self) -> int:
+        """Extend the leases on running executions.
+        
+        Executions whose checkpoint now names another owner were taken over and
+        are dropped here; ones whose checkpoint was never written are written again.
+        """
+        running = [
+            execution.execution_id for execution in self.workflow_executions.values()
+            if execution.status == "running"
+        ]
+        if not running:
+            return 0
+        
+        async with AsyncSessionLocal() as db:
+            renewed = set((await db.execute(
+                update(WorkflowCheckpoint)
+                .where(
+                    WorkflowCheckpoint.execution_id.in_(running),
+                    WorkflowCheckpoint.owner == self.owner,
+                    WorkflowCheckpoint.status == "running"
+                )
+                .values(lease_expires_at=self._lease_expiry())
+                .returning(WorkflowCheckpoint.execution_id)
+                .execution_options(synchronize_session=False)
+            )).scalars().all())
+            await db.commit()
+            
+            missed = [execution_id for execution_id in running if execution_id not in renewed]
+            owners = dict((await db.execute(
+                select(WorkflowCheckpoint.execution_id, WorkflowCheckpoint.owner)
+                .where(WorkflowCheckpoint.execution_id.in_(missed))
+            )).all()) if missed else {}
+        
+        for execution_id in missed:
+            execution = self.workflow_executions[execution_id]
+            if execution_id not in owners:
+                # The checkpoint insert failed when the workflow was submitted
+                if await self._checkpoint_execution(execution):
+                    renewed.add(execution_id)
+            elif owners[execution_id] != self.owner:
+                del self.workflow_executions[execution_id]
+                self.workflow_tasks.pop(execution.workflow_id, None)
+                logger.warning(f"⚠️ Lost the lease on workflow {execution.workflow_id}, another replica resumed it")
+        return len(renewed)
+    
+    @staticmethod
+    def _lease_expiry():
+        return func.now() + timedelta(seconds=WORKFLOW_LEASE_SECONDS)
+    
+    def _owned_executions(self):
+        """Executions this replica holds, so a replica that lost one stops writing to it"""
+        return select(WorkflowCheckpoint.execution_id).where(WorkflowCheckpoint.owner == self.owner)
+    
+    def _task_from_stage(self, workflow_id: str, stage: WorkflowStageCheckpoint) -> Task:
+        """Rebuild a workflow task from its stage checkpoint"""
+        status = TaskStatus(stage.status)
+        if status == TaskStatus.IN_PROGRESS:
+            # The generation died with the previous process; run the stage again
+            status = TaskStatus.PENDING
+        
+        return Task(
+            id=stage.task_id,
+            type=AgentType(stage.task_type),
+            priority=stage.priority,
+            status=status,
+            context=stage.context or {},
+            payload=stage.payload or {},
+            assigned_agent=stage.assigned_agent,
+            result=stage.result,
+            completed_at=stage.completed_at.timestamp() if stage.completed_at else None,
+            workflow_id=workflow_id,
+            dependencies=stage.dependencies or []
+        )
+    
+    async def _checkpoint_execution(self, execution: WorkflowExecution) -> bool:
+        """Persist a new execution and its DAG of stages; returns whether it was stored"""
+        try:
+            async with AsyncSessionLocal() as db:
+                checkpoint = WorkflowCheckpoint(
+                    execution_id=execution.execution_id,
+                    workflow_id=execution.workflow_id,
+                    status=execution.status,
+                    execution_metadata=execution.metadata,
+                    owner=self.owner,
+                    lease_expires_at=self._lease_expiry()
+                )
+                checkpoint.stages = [
+                    WorkflowStageCheckpoint(
+                        task_id=task.id,
+                        position=position,
+                        task_type=task.type.value,
+                        priority=task.priority,
+                        dependencies=task.dependencies,
+                        context=task.context,
+                        payload=task.payload,
+                        status=task.status.value
+                    )
+                    for position, task in enumerate(execution.tasks)
+                ]
+                db.add(checkpoint)
+                await db.commit()
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to checkpoint workflow {execution.workflow_id}: {e}")
+            return False
+    
+    async def _checkpoint_stage(self, task: Task):
+        """Persist one stage's status and result"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(WorkflowStageCheckpoint)
+                    .where(
+                        WorkflowStageCheckpoint.task_id == task.id,
+                        WorkflowStageCheckpoint.execution_id.in_(self._owned_executions())
+                    )
+                    .values(
+                        status=task.status.value,
+                        assigned_agent=task.assigned_agent,
+                        result=task.result,
+                        completed_at=self._to_datetime(task.completed_at)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"❌ Failed to checkpoint task {task.id}: {e}")
+    
+    async def _checkpoint_execution_status(self, execution: WorkflowExecution):
+        """Persist an execution's final status"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(WorkflowCheckpoint)
+                    .where(
+                        WorkflowCheckpoint.execution_id == execution.execution_id,
+                        WorkflowCheckpoint.owner == self.owner
+                    )
+                    .values(
+                        status=execution.status,
+                        completed_at=self._to_datetime(execution.completed_at)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"❌ Failed to checkpoint workflow {execution.workflow_id} status: {e}")
+    
+    async def _delete_checkpoints(self, cutoff_time: float):
+        """Drop checkpoints of executions that finished before the cutoff"""
+        try:
+            async with AsyncSessionLocal() as db:
+                # Stages go with their execution via ON DELETE CASCADE
+                await db.execute(
+                    delete(WorkflowCheckpoint)
+                    .where(
+                        WorkflowCheckpoint.status.in_(["completed", "failed"]),
+                        WorkflowCheckpoint.completed_at < self._to_datetime(cutoff_time)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"❌ Failed to delete workflow checkpoints: {e}")
+    
+    @staticmethod
+    def _to_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp else None
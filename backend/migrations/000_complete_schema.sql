@@ -9,7 +9,10 @@ DROP TABLE IF EXISTS refresh_tokens CASCADE;
 DROP TABLE IF EXISTS api_keys CASCADE;
 DROP TABLE IF EXISTS agent_metrics CASCADE;
 DROP TABLE IF EXISTS alerts CASCADE;
+DROP TABLE IF EXISTS task_status_counts CASCADE;
 DROP TABLE IF EXISTS tasks CASCADE;
+DROP TABLE IF EXISTS workflow_stage_checkpoints CASCADE;
+DROP TABLE IF EXISTS workflow_checkpoints CASCADE;
 DROP TABLE IF EXISTS executions CASCADE;
 DROP TABLE IF EXISTS workflows CASCADE;
 DROP TABLE IF EXISTS agents CASCADE;
@@ -174,13 +177,42 @@ CREATE TABLE executions (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Coordinator workflow checkpoints, used to resume executions after a restart
+CREATE TABLE workflow_checkpoints (
+    execution_id VARCHAR(255) PRIMARY KEY,
+    workflow_id VARCHAR(255) NOT NULL,
+    status VARCHAR(50) DEFAULT 'running',
+    metadata JSONB,
+    owner VARCHAR(255),
+    lease_expires_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Per-stage DAG state and results of checkpointed workflows
+CREATE TABLE workflow_stage_checkpoints (
+    task_id VARCHAR(255) PRIMARY KEY,
+    execution_id VARCHAR(255) NOT NULL REFERENCES workflow_checkpoints(execution_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    task_type VARCHAR(50) NOT NULL,
+    priority INTEGER DEFAULT 3,
+    dependencies JSONB,
+    context JSONB,
+    payload JSONB,
+    status VARCHAR(50) DEFAULT 'pending',
+    assigned_agent VARCHAR(255),
+    result JSONB,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
 -- =============================================================================
 -- TASK MANAGEMENT
 -- =============================================================================
 
--- Individual tasks
+-- Individual tasks, partitioned by day of creation so retention drops whole partitions
 CREATE TABLE tasks (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
     title VARCHAR(255) NOT NULL,
     description TEXT,
     priority INTEGER DEFAULT 5,
@@ -188,12 +220,89 @@ CREATE TABLE tasks (
     assigned_agent_id VARCHAR(255) REFERENCES agents(id) ON DELETE SET NULL,
     workflow_id UUID REFERENCES workflows(id) ON DELETE SET NULL,
     execution_id UUID REFERENCES executions(id) ON DELETE SET NULL,
+    claimed_by VARCHAR(255),
+    lease_expires_at TIMESTAMP WITH TIME ZONE,
+    type VARCHAR(100),
     metadata JSONB,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     started_at TIMESTAMP WITH TIME ZONE,
-    completed_at TIMESTAMP WITH TIME ZONE
+    completed_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Creates the tasks partition for one UTC day, taking over any of its rows that
+-- landed in the default partition meanwhile; returns false if it already exists
+CREATE OR REPLACE FUNCTION ensure_task_partition(day DATE) RETURNS boolean AS $$
+DECLARE
+    partition_name TEXT := 'tasks_p' || to_char(day, 'YYYYMMDD');
+    day_start TIMESTAMPTZ := day::timestamp AT TIME ZONE 'UTC';
+    day_end TIMESTAMPTZ := (day + 1)::timestamp AT TIME ZONE 'UTC';
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN false;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE tasks INCLUDING DEFAULTS)', partition_name);
+    IF to_regclass('tasks_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM tasks_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            day_start, day_end, partition_name
+        );
+    END IF;
+    EXECUTE format(
+        'ALTER TABLE tasks ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, day_start, day_end
+    );
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Catches rows for days whose partition has not been created yet
+CREATE TABLE tasks_default PARTITION OF tasks DEFAULT;
+SELECT ensure_task_partition((NOW() AT TIME ZONE 'UTC')::date + days_ahead)
+FROM generate_series(0, 7) AS days_ahead;
+
+-- Per-status task counts, kept current by statement-level triggers on tasks
+CREATE TABLE task_status_counts (
+    status VARCHAR(50) PRIMARY KEY,
+    count BIGINT NOT NULL DEFAULT 0
 );
 
+CREATE OR REPLACE FUNCTION maintain_task_status_counts() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_status_counts (status, count)
+        SELECT COALESCE(status, 'unknown'), COUNT(*) FROM new_rows GROUP BY 1
+        ON CONFLICT (status) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_status_counts (status, count)
+        SELECT COALESCE(status, 'unknown'), -COUNT(*) FROM old_rows GROUP BY 1
+        ON CONFLICT (status) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO task_status_counts (status, count)
+        SELECT status, SUM(delta) FROM (
+            SELECT COALESCE(status, 'unknown') AS status, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT COALESCE(status, 'unknown') AS status, 1 AS delta FROM new_rows
+        ) deltas
+        GROUP BY status
+        HAVING SUM(delta) <> 0
+        ON CONFLICT (status) DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tasks_status_counts_insert AFTER INSERT ON tasks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts();
+CREATE TRIGGER tasks_status_counts_update AFTER UPDATE ON tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts();
+CREATE TRIGGER tasks_status_counts_delete AFTER DELETE ON tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_status_counts();
+
 -- =============================================================================
 -- PROJECTS (Optional - for future use)
 -- =============================================================================
@@ -235,6 +344,7 @@ CREATE INDEX idx_users_active ON users(is_active);
 
 -- Authentication indexes
 CREATE INDEX idx_api_keys_user_id ON api_keys(user_id);
+CREATE INDEX idx_api_keys_key_prefix ON api_keys(key_prefix);
 CREATE INDEX idx_api_keys_key_hash ON api_keys(key_hash);
 CREATE INDEX idx_api_keys_active ON api_keys(is_active);
 CREATE INDEX idx_refresh_tokens_user_id ON refresh_tokens(user_id);
@@ -256,11 +366,21 @@ CREATE INDEX idx_workflows_created_by ON workflows(created_by);
 -- Execution indexes
 CREATE INDEX idx_executions_status ON executions(status, created_at);
 CREATE INDEX idx_executions_workflow ON executions(workflow_id);
+CREATE INDEX idx_workflow_checkpoints_workflow ON workflow_checkpoints(workflow_id);
+CREATE INDEX idx_workflow_checkpoints_status ON workflow_checkpoints(status);
+CREATE INDEX idx_workflow_checkpoints_lease_expiry ON workflow_checkpoints(lease_expires_at) WHERE status = 'running';
+CREATE INDEX idx_workflow_stage_checkpoints_execution ON workflow_stage_checkpoints(execution_id);
 
 -- Task indexes
 CREATE INDEX idx_tasks_status_priority ON tasks(status, priority DESC, created_at);
-CREATE INDEX idx_tasks_agent ON tasks(assigned_agent_id);
-CREATE INDEX idx_tasks_workflow ON tasks(workflow_id);
+CREATE INDEX idx_tasks_created ON tasks(created_at DESC, id DESC);
+CREATE INDEX idx_tasks_status_created ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_agent_created ON tasks(assigned_agent_id, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_workflow_created ON tasks(workflow_id, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_type_created ON tasks(type, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_metadata ON tasks USING GIN (metadata jsonb_path_ops);
+CREATE INDEX idx_tasks_claimable ON tasks(priority, created_at) WHERE status = 'pending';
+CREATE INDEX idx_tasks_lease_expiry ON tasks(lease_expires_at) WHERE lease_expires_at IS NOT NULL;
 
 -- Metrics indexes
 CREATE INDEX idx_agent_metrics_timestamp ON agent_metrics(timestamp);
@@ -0,0 +1,69 @@
+"""
+Shared fixtures for backend tests, run against a throwaway SQLite database
+"""
+
+import operator
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+# The database engines are created at import time, so point them at SQLite first
+_db_dir = tempfile.mkdtemp(prefix="hive-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'hive.db')}")
+# Same import roots as the container's PYTHONPATH
+_backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [_backend_dir, os.path.join(_backend_dir, "ccli_src")]
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import functions
+from sqlalchemy.sql.elements import BinaryExpression
+
+from app.core.database import Base, async_engine
+from app.models import agent, auth, project, sqlalchemy_models, task, user  # noqa: F401  (registers the tables)
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(BinaryExpression, "sqlite")
+def _compile_lease_expiry_sqlite(element, compiler, **kw):
+    # now() + timedelta, as used for lease expiry, in SQLite's date arithmetic
+    interval = getattr(element.right, "value", None)
+    if element.operator is operator.add and isinstance(element.left, functions.now) \
+            and isinstance(interval, timedelta):
+        return f"datetime('now', '+{interval.total_seconds()} seconds')"
+    return compiler.visit_binary(element, **kw)
+
+
+@pytest_asyncio.fixture
+async def database():
+    """Fresh schema for each test"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_engine
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest_asyncio.fixture
+async def foreign_keys(database):
+    """Enforce foreign keys like Postgres does (SQLite leaves them off by default)"""
+    await async_engine.dispose()
+    event.listen(async_engine.sync_engine, "connect", _enable_foreign_keys)
+    yield
+    event.remove(async_engine.sync_engine, "connect", _enable_foreign_keys)
+    await async_engine.dispose()
@@ -0,0 +1,389 @@
+"""
+Tests for the distributed coordinator's per-agent flow control
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+
+from app.core.distributed_coordinator import (
+    AdaptiveConcurrencyLimit, Agent, CircuitBreaker, DistributedCoordinator,
+    Task, TaskPriority, TaskType
+)
+
+
+def make_agent(agent_id, specializations=(TaskType.TESTING,), max_concurrent=2):
+    return Agent(
+        id=agent_id, endpoint=f"http://{agent_id}:11434", model="llama3",
+        gpu_type="test", specializations=list(specializations), max_concurrent=max_concurrent
+    )
+
+
+@pytest_asyncio.fixture
+async def coordinator():
+    coordinator = DistributedCoordinator()
+    for agent_id in list(coordinator.agents):
+        await coordinator.remove_agent(agent_id)
+    yield coordinator
+    await coordinator.redis.aclose()
+    coordinator.executor.shutdown(wait=False)
+
+
+class TestAgentSelection:
+
+    @pytest.mark.asyncio
+    async def test_add_and_remove_keep_selection_indexes_in_step(self, coordinator):
+        first, second = make_agent("first"), make_agent("second", (TaskType.TESTING, TaskType.DEPLOYMENT))
+        coordinator.add_agent(first)
+        coordinator.add_agent(second)
+
+        assert coordinator.agent_pool == [first, second]
+        assert coordinator.agents_by_type[TaskType.TESTING] == [first, second]
+        assert coordinator.healthy_counts[TaskType.DEPLOYMENT] == 1
+
+        await coordinator.remove_agent("second")
+
+        assert coordinator.agent_pool == [first]
+        assert coordinator.agents_by_type[TaskType.TESTING] == [first]
+        assert coordinator.healthy_counts[TaskType.DEPLOYMENT] == 0
+
+    @pytest.mark.asyncio
+    async def test_saturated_pool_returns_no_agent(self, coordinator):
+        for i in range(20):
+            agent = make_agent(f"agent-{i}")
+            agent.current_load = agent.max_concurrent
+            coordinator.add_agent(agent)
+        task = Task(id="task", type=TaskType.TESTING, priority=TaskPriority.NORMAL, payload={})
+
+        assert await coordinator._select_optimal_agent(task) is None
+
+        coordinator.agents["agent-7"].current_load = 0
+        coordinator.agents["agent-12"].current_load = 0
+        selected = [await coordinator._select_optimal_agent(task) for _ in range(50)]
+        assert {agent.id for agent in selected if agent} <= {"agent-7", "agent-12"}
+        assert any(selected)
+
+
+    @pytest.mark.asyncio
+    async def test_idle_agents_missed_by_the_probes_still_take_the_task(self, coordinator):
+        for i in range(20):
+            agent = make_agent(f"agent-{i}")
+            agent.current_load = 0 if i in (3, 16) else agent.max_concurrent
+            coordinator.add_agent(agent)
+        coordinator._execute_task = AsyncMock()
+        coordinator._get_cached_result = AsyncMock(return_value=None)
+
+        for i in range(50):
+            task = Task(id=f"task-{i}", type=TaskType.TESTING, priority=TaskPriority.NORMAL,
+                        payload={"test_types": [str(i)]})
+            await coordinator._dispatch_task(task)
+
+            assert not coordinator.parked_tasks
+            started_on = coordinator._execute_task.call_args.args[1]
+            assert started_on.id in ("agent-3", "agent-16")
+            started_on.current_load -= 1
+
+    @pytest.mark.asyncio
+    async def test_parked_task_goes_to_the_agent_that_released_a_slot(self, coordinator):
+        for i in range(200):
+            agent = make_agent(f"agent-{i}")
+            agent.current_load = agent.max_concurrent
+            coordinator.add_agent(agent)
+        coordinator._execute_task = AsyncMock()
+        coordinator._get_cached_result = AsyncMock(return_value=None)
+
+        for i in range(20):
+            task = Task(id=f"task-{i}", type=TaskType.TESTING, priority=TaskPriority.NORMAL,
+                        payload={"test_types": [str(i)]})
+            await coordinator._dispatch_task(task)
+            assert coordinator.parked_tasks[TaskType.TESTING]
+
+            released = coordinator.agents[f"agent-{i * 7}"]
+            released.current_load -= 1
+            await coordinator._dispatch_parked_tasks(released=released)
+
+            assert not coordinator.parked_tasks
+            assert coordinator._execute_task.call_args.args[1] is released
+            assert released.current_load == released.max_concurrent
+
+class TestSharedStream:
+
+    @pytest.mark.asyncio
+    async def test_workflows_submitted_in_the_same_second_get_distinct_ids(self, coordinator):
+        coordinator.add_agent(make_agent("agent", list(TaskType)))
+        coordinator.task_stream.save = AsyncMock()
+        coordinator.task_stream.publish = AsyncMock()
+
+        first = await coordinator.submit_workflow({"requirements": "a"})
+        second = await coordinator.submit_workflow({"requirements": "b"})
+
+        assert first != second
+        assert len(coordinator.tasks) == 10
+
+    @pytest.mark.asyncio
+    async def test_dead_lettered_task_fails_locally(self, coordinator):
+        task = Task(id="stuck", type=TaskType.TESTING, priority=TaskPriority.NORMAL, payload={},
+                    status="executing", assigned_agent="agent")
+        coordinator.tasks[task.id] = task
+        coordinator.task_stream.load = AsyncMock(return_value={task.id: task.to_record()})
+        coordinator.task_stream.save = AsyncMock()
+
+        await coordinator._fail_dead_letters([("1-0", task.id)])
+
+        assert task.status == "failed"
+        saved = coordinator.task_stream.save.await_args.args[0]
+        assert saved[0]["status"] == "failed"
+
+
+class TestPrewarm:
+
+    @pytest.mark.asyncio
+    async def test_dependent_dispatches_to_the_agent_warmed_for_it(self, coordinator):
+        for i in range(6):
+            agent = make_agent(f"agent-{i}", (TaskType.CODE_GENERATION, TaskType.CODE_REVIEW), max_concurrent=4)
+            agent.loaded_models = set()
+            coordinator.add_agent(agent)
+        coordinator.task_stream.save = AsyncMock()
+        coordinator._prewarm_agent_model = AsyncMock()
+        coordinator._execute_task = AsyncMock()
+
+        upstream = Task(id="generate", type=TaskType.CODE_GENERATION, priority=TaskPriority.HIGH, payload={})
+        review = Task(id="review", type=TaskType.CODE_REVIEW, priority=TaskPriority.HIGH, payload={},
+                      dependencies=["generate"])
+        for task in (upstream, review):
+            coordinator.tasks[task.id] = task
+            coordinator._index_dependencies(task)
+
+        await coordinator._prewarm_next_stage(upstream)
+        await asyncio.sleep(0)
+
+        warmed = coordinator._prewarm_agent_model.await_args.args[0]
+        assert review.preferred_agent == warmed.id
+        assert coordinator.task_stream.save.await_args.args[0][0]["preferred_agent"] == warmed.id
+
+        for _ in range(10):
+            assert await coordinator._try_start_task(review)
+            started_on = coordinator._execute_task.call_args.args[1]
+            assert started_on is warmed
+            started_on.current_load -= 1
+
+    @pytest.mark.asyncio
+    async def test_busy_warm_agent_does_not_hold_up_the_dependent(self, coordinator):
+        warm, other = make_agent("warm"), make_agent("other")
+        coordinator.add_agent(warm)
+        coordinator.add_agent(other)
+        coordinator._execute_task = AsyncMock()
+        warm.current_load = warm.max_concurrent
+
+        task = Task(id="test", type=TaskType.TESTING, priority=TaskPriority.NORMAL, payload={},
+                    preferred_agent="warm")
+
+        assert await coordinator._try_start_task(task)
+        assert coordinator._execute_task.call_args.args[1] is other
+
+
+class TestExecution:
+
+    def _prepare(self, coordinator, agent_ids, generate):
+        agents = []
+        for agent_id in agent_ids:
+            agent = make_agent(agent_id)
+            agent.concurrency_limit.on_sample = MagicMock(wraps=agent.concurrency_limit.on_sample)
+            coordinator.add_agent(agent)
+            coordinator.active_sessions[agent_id] = MagicMock()
+            agents.append(agent)
+        coordinator.task_stream.save = AsyncMock()
+        coordinator.task_stream.ack = AsyncMock()
+        coordinator.redis.setex = AsyncMock()
+        coordinator._generate = generate
+        return agents
+
+    @pytest.mark.asyncio
+    async def test_unhedged_generation_completes_on_its_agent(self, coordinator):
+        async def generate(session, agent, payload, task):
+            return {"response": "ok", "eval_count": 10}
+        agent, = self._prepare(coordinator, ["agent"], generate)
+        agent.current_load = 1
+        task = Task(id="task", type=TaskType.TESTING, priority=TaskPriority.NORMAL,
+                    payload={"test_types": ["unit"]})
+
+        await coordinator._execute_task(task, agent)
+
+        assert task.status == "completed"
+        assert task.assigned_agent == "agent"
+        assert task.result["response"] == "ok"
+        agent.concurrency_limit.on_sample.assert_called_once()
+        assert coordinator.performance_history["agent"]
+
+    @pytest.mark.asyncio
+    async def test_hedged_generation_records_the_winning_agent(self, coordinator):
+        async def generate(session, agent, payload, task):
+            if agent.id == "slow":
+                await asyncio.sleep(10)
+            return {"response": agent.id, "eval_count": 10}
+        slow, fast = self._prepare(coordinator, ["slow", "fast"], generate)
+        coordinator.hedge_requests = True
+        coordinator.performance_history["slow"] = [0.01] * 20
+        slow.current_load = 1
+        task = Task(id="task", type=TaskType.TESTING, priority=TaskPriority.NORMAL,
+                    payload={"test_types": ["unit"]})
+
+        await coordinator._execute_task(task, slow)
+
+        assert task.status == "completed"
+        assert task.assigned_agent == "fast"
+        assert task.result["response"] == "fast"
+        fast.concurrency_limit.on_sample.assert_called_once()
+        slow.concurrency_limit.on_sample.assert_not_called()
+        assert slow.current_load == fast.current_load == 0
+
+
+    @pytest.mark.asyncio
+    async def test_identical_stages_of_two_workflows_share_one_generation(self, coordinator):
+        release = asyncio.Event()
+        generations = []
+
+        async def generate(session, agent, payload, task):
+            generations.append(task.id)
+            await release.wait()
+            return {"response": "def add(a, b): return a + b", "eval_count": 10}
+        self._prepare(coordinator, ["agent"], generate)
+        coordinator.task_stream.publish = AsyncMock()
+        coordinator.task_stream.release_dependency = AsyncMock(return_value=1)
+        coordinator._get_cached_result = AsyncMock(return_value=None)
+        coordinator._prewarm_agent_model = AsyncMock()
+
+        workflow = {"requirements": "add two numbers", "language": "python"}
+        first = await coordinator.submit_workflow(workflow)
+        second = await coordinator.submit_workflow(workflow)
+        stages = [coordinator.tasks[f"{workflow_id}_code_generation"] for workflow_id in (first, second)]
+        assert stages[0].cache_key == stages[1].cache_key
+
+        for task in stages:
+            await coordinator._dispatch_task(task)
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*coordinator.running_tasks)
+
+        assert len(generations) == 1
+        assert [task.status for task in stages] == ["completed", "completed"]
+        assert stages[0].result == stages[1].result
+
+    @pytest.mark.asyncio
+    async def test_waiters_finish_when_the_task_store_is_down(self, coordinator):
+        release = asyncio.Event()
+
+        async def generate(session, agent, payload, task):
+            await release.wait()
+            return {"response": "ok", "eval_count": 10}
+        agent, = self._prepare(coordinator, ["agent"], generate)
+        coordinator.task_stream.save = AsyncMock(side_effect=ConnectionError("redis down"))
+        coordinator._get_cached_result = AsyncMock(return_value=None)
+
+        tasks = [
+            Task(id=f"task-{i}", type=TaskType.TESTING, priority=TaskPriority.NORMAL,
+                 payload={"test_types": ["unit"]})
+            for i in range(2)
+        ]
+        for task in tasks:
+            coordinator.tasks[task.id] = task
+            coordinator.stream_entries[task.id] = f"{task.id}-entry"
+            await coordinator._dispatch_task(task)
+        release.set()
+        await asyncio.gather(*coordinator.running_tasks)
+
+        assert [task.status for task in tasks] == ["completed", "completed"]
+        assert not coordinator.inflight_tasks
+        assert agent.current_load == 0
+        # Their leases lapse so a redelivery retries the completion
+        assert not coordinator.stream_entries
+
+class TestCircuitBreaker:
+
+    def _cooled_down(self):
+        breaker = CircuitBreaker("agent", failure_threshold=1, cooldown=30.0)
+        breaker.record_failure()
+        breaker.opened_at = time.time() - 31
+        return breaker
+
+    def test_allows_request_does_not_change_state(self):
+        breaker = self._cooled_down()
+
+        assert breaker.allows_request()
+        assert breaker.allows_request()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_dispatch_after_cooldown_is_the_only_probe(self):
+        breaker = self._cooled_down()
+
+        assert breaker.on_dispatch()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allows_request()
+        assert not breaker.on_dispatch()
+
+    def test_released_probe_lets_another_probe_through(self):
+        breaker = self._cooled_down()
+        breaker.on_dispatch()
+
+        # A cancelled probe reports neither success nor failure
+        breaker.release_probe()
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allows_request()
+        assert breaker.on_dispatch()
+
+    def test_probe_outcome_closes_or_reopens(self):
+        breaker = self._cooled_down()
+        breaker.on_dispatch()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker = self._cooled_down()
+        breaker.on_dispatch()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allows_request()
+
+
+class TestAdaptiveConcurrencyLimit:
+
+    def _run(self, limit, latency_at, samples=300):
+        """Keep the agent saturated and feed back the latency seen at each concurrency"""
+        history = []
+        for _ in range(samples):
+            inflight = limit.current
+            limit.on_sample(latency_at(inflight), inflight)
+            history.append(limit.current)
+        return history
+
+    def test_limit_shrinks_back_when_latency_rises_with_concurrency(self):
+        limit = AdaptiveConcurrencyLimit(initial_limit=2, max_limit=8)
+
+        history = self._run(limit, lambda inflight: 1.0 * inflight)
+
+        # Each extra slot only adds latency, so the limit must settle near where it started
+        assert max(history) <= 4
+        assert history[-1] <= 4
+
+    def test_limit_grows_to_the_cap_while_latency_stays_flat(self):
+        limit = AdaptiveConcurrencyLimit(initial_limit=2, max_limit=8)
+
+        history = self._run(limit, lambda inflight: 1.0)
+
+        assert history[-1] == 8
+
+    @pytest.mark.asyncio
+    async def test_agent_never_exceeds_its_configured_concurrency(self):
+        agent = Agent(
+            id="agent", endpoint="http://agent:11434", model="llama3",
+            gpu_type="test", specializations=[TaskType.TESTING], max_concurrent=2
+        )
+        try:
+            history = self._run(agent.concurrency_limit, lambda inflight: 1.0 * inflight)
+        finally:
+            await agent.connection_pool.close()
+
+        assert max(history) <= 2
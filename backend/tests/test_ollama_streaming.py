@@ -0,0 +1,74 @@
+"""
+Tests for streaming agent calls
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import ollama_streaming
+from app.core.hive_coordinator import Agent, AgentType, HiveCoordinator, Task
+from app.core.ollama_streaming import PROGRESS_EVENT, PROGRESS_ROOM
+
+
+class FakeStreamResponse:
+    """An Ollama /api/generate response delivering one NDJSON chunk per line"""
+
+    def __init__(self, chunks):
+        self.status = 200
+        self.content = self._lines(chunks)
+
+    async def _lines(self, chunks):
+        for chunk in chunks:
+            yield json.dumps(chunk).encode() + b"\n"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.payloads = []
+
+    def post(self, url, json=None, timeout=None):
+        self.payloads.append(json)
+        return FakeStreamResponse(self.chunks)
+
+
+class TestHiveCoordinatorStreaming:
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        manager = AsyncMock()
+        monkeypatch.setattr(ollama_streaming, "_socketio_manager", manager)
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_streams_to_the_registered_manager_and_records_ttft(self, manager):
+        coordinator = HiveCoordinator()
+        coordinator.session = FakeSession([
+            {"response": "def ", "done": False},
+            {"response": "f(): pass", "done": False},
+            {"response": "", "done": True, "eval_count": 2},
+        ])
+        agent = Agent(id="walnut", endpoint="http://walnut:11434", model="starcoder2:15b", specialty=AgentType.TESTER)
+        task = Task(id="t1", type=AgentType.TESTER, priority=3, context={}, expected_output="code")
+        labels = {"task_type": "tester", "agent": "walnut"}
+        before = REGISTRY.get_sample_value("hive_time_to_first_token_seconds_count", labels) or 0
+
+        result = await coordinator._execute_ollama_task(task, agent)
+
+        assert coordinator.session.payloads[0]["stream"] is True
+        assert result["response"] == "def f(): pass"
+        assert result["eval_count"] == 2
+        room, event, progress = manager.send_to_room.await_args.args
+        assert (room, event) == (PROGRESS_ROOM, PROGRESS_EVENT)
+        assert progress["task_id"] == "t1"
+        assert progress["delta"] == "def f(): pass"
+        assert REGISTRY.get_sample_value("hive_time_to_first_token_seconds_count", labels) == before + 1
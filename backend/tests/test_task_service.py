@@ -0,0 +1,104 @@
+"""
+Tests for write-behind task status transitions and task retention
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal
+from app.models.task import Task as ORMTask
+from app.services.background_service import BackgroundService
+from app.services.task_service import TaskService
+
+
+class TestStatusWriteBehind:
+
+    async def _seed(self, **columns):
+        task_id = uuid.uuid4()
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(ORMTask), [{
+                "id": task_id, "title": "Task", "status": "pending", "task_type": "testing", **columns
+            }])
+            await db.commit()
+        return task_id
+
+    async def _load(self, task_id):
+        async with AsyncSessionLocal() as db:
+            return await db.get(ORMTask, task_id)
+
+    @pytest.mark.asyncio
+    async def test_transitions_coalesce_into_one_row_update(self, database):
+        service = TaskService()
+        task_id = await self._seed()
+
+        await service.record_status(str(task_id), "assigned", "agent-a")
+        await service.record_status(str(task_id), "in_progress")
+
+        assert len(service._status_updates) == 1
+        assert (await self._load(task_id)).status == "pending"
+
+        assert await service.flush_status_updates() == 1
+        task = await self._load(task_id)
+        assert task.status == "in_progress"
+        assert task.assigned_agent_id == "agent-a"
+        assert task.started_at is not None
+        assert task.completed_at is None
+
+    @pytest.mark.asyncio
+    async def test_terminal_status_is_flushed_before_returning(self, database):
+        service = TaskService()
+        task_id = await self._seed(assigned_agent_id="agent-a")
+
+        await service.record_status(str(task_id), "in_progress")
+        await service.record_status(str(task_id), "completed")
+
+        assert not service._status_updates
+        task = await self._load(task_id)
+        assert task.status == "completed"
+        assert task.assigned_agent_id == "agent-a"
+        assert task.started_at is not None
+        assert task.completed_at is not None
+
+    @pytest.mark.asyncio
+    async def test_lease_is_kept_while_claimed_and_cleared_when_finished(self, database):
+        service = TaskService()
+        lease = datetime.utcnow() + timedelta(minutes=2)
+        task_id = await self._seed(status="assigned", claimed_by="replica-1", lease_expires_at=lease)
+
+        await service.record_status(str(task_id), "in_progress")
+        await service.flush_status_updates()
+        task = await self._load(task_id)
+        assert task.claimed_by == "replica-1"
+        assert task.lease_expires_at is not None
+
+        await service.record_status(str(task_id), "failed")
+        task = await self._load(task_id)
+        assert task.status == "failed"
+        assert task.claimed_by is None
+        assert task.lease_expires_at is None
+
+
+class TestRetention:
+
+    @pytest.mark.asyncio
+    async def test_partition_failure_does_not_stop_retention(self):
+        task_service = TaskService()
+        task_service.ensure_task_partitions = AsyncMock(side_effect=RuntimeError("rows in tasks_default"))
+        task_service.cleanup_completed_tasks = AsyncMock(return_value=3)
+        background = BackgroundService()
+        background.initialize(None, task_service, None, None)
+        background.running = True
+
+        async def stop(seconds):
+            background.running = False
+
+        with patch("app.services.background_service.asyncio.sleep", stop):
+            await background._cleanup_manager()
+        background.executor.shutdown(wait=False)
+
+        task_service.ensure_task_partitions.assert_awaited_once()
+        task_service.cleanup_completed_tasks.assert_awaited_once()
@@ -0,0 +1,96 @@
+"""
+Tests for the task listing endpoint
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import insert
+
+from app.api import tasks as tasks_api
+from app.core.auth_deps import get_current_user_context
+from app.core.database import AsyncSessionLocal
+from app.models.task import Task as ORMTask
+from app.services.task_service import TaskService
+
+
+class TestTaskListing:
+
+    @pytest.fixture
+    def coordinator(self):
+        # Tasks only exist in the database, so a memory fallback would return none
+        return SimpleNamespace(task_service=TaskService(), get_all_tasks=lambda: [])
+
+    @pytest.fixture
+    def client(self, database, coordinator):
+        app = FastAPI()
+        app.include_router(tasks_api.router)
+        app.dependency_overrides[tasks_api.get_coordinator] = lambda: coordinator
+        app.dependency_overrides[get_current_user_context] = lambda: {"user_id": "test"}
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def _seed(self, count):
+        """Insert tasks one minute apart and return their ids, newest first"""
+        base = datetime(2026, 1, 1)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "title": f"Task {i}",
+                "priority": 3,
+                "status": "pending",
+                "task_type": "code_generation",
+                "task_metadata": {"context": {"index": i}, "payload": {}},
+                "created_at": base + timedelta(minutes=i),
+            }
+            for i in range(count)
+        ]
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(ORMTask), rows)
+            await db.commit()
+        return [str(row["id"]) for row in reversed(rows)]
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_through_every_task_once(self, client):
+        expected = await self._seed(5)
+
+        seen, cursor, pages = [], None, 0
+        async with client:
+            while True:
+                params = {"limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get("/tasks", params=params)
+                assert response.status_code == 200
+                body = response.json()
+                seen.extend(task["id"] for task in body["tasks"])
+                cursor = body["next_cursor"]
+                pages += 1
+                assert pages <= 4, "cursor never reached the last page"
+                if cursor is None:
+                    break
+
+        assert seen == expected
+        assert pages == 3
+
+    @pytest.mark.asyncio
+    async def test_memory_fallback_returns_no_cursor(self, client, coordinator):
+        async def unavailable(**kwargs):
+            raise RuntimeError("database unavailable")
+
+        coordinator.task_service.get_tasks = unavailable
+        coordinator.get_all_tasks = lambda: [
+            {"id": f"task-{i}", "type": "testing", "priority": 3, "status": "pending", "context": {}}
+            for i in range(3)
+        ]
+
+        async with client:
+            response = await client.get("/tasks", params={"limit": 2})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["tasks"]) == 2
+        assert body["next_cursor"] is None
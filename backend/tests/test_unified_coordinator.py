@@ -0,0 +1,93 @@
+"""
+Tests for task creation through the unified coordinator
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.core.unified_coordinator_refactored import UnifiedCoordinatorRefactored
+from app.models.task import Task as ORMTask
+from app.services.agent_service import AgentType
+
+
+class TestCreateTasks:
+
+    @pytest.mark.asyncio
+    async def test_batch_inserts_unassigned_tasks_with_foreign_keys_enforced(self, foreign_keys):
+        coordinator = UnifiedCoordinatorRefactored()
+
+        tasks = await coordinator.create_tasks([
+            (AgentType.KERNEL_DEV, {"objective": "first"}, 3),
+            (AgentType.TESTER, {"objective": "second"}, 2),
+        ])
+
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(select(ORMTask.assigned_agent_id, ORMTask.status))).all()
+        assert len(tasks) == 2
+        assert rows == [(None, "pending"), (None, "pending")]
+
+
+class TestDispatch:
+
+    def _replica(self, issue_result):
+        coordinator = UnifiedCoordinatorRefactored()
+        coordinator.github_service = SimpleNamespace(
+            create_bzzz_task_issue=AsyncMock(return_value=issue_result)
+        )
+        return coordinator
+
+    @pytest.mark.asyncio
+    async def test_each_pending_task_is_claimed_and_bridged_once(self, database):
+        first = self._replica({"success": True})
+        second = self._replica({"success": True})
+        tasks = await first.create_tasks([(AgentType.TESTER, {"objective": str(i)}, 3) for i in range(3)])
+
+        assert await first._dispatch_claimed_tasks() == 3
+        assert await second._dispatch_claimed_tasks() == 0
+
+        bridged = [call.args[0]["id"] for call in first.github_service.create_bzzz_task_issue.await_args_list]
+        assert sorted(bridged) == sorted(task.id for task in tasks)
+        second.github_service.create_bzzz_task_issue.assert_not_awaited()
+
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(ORMTask.status, ORMTask.claimed_by, ORMTask.lease_expires_at)
+            )).all()
+        assert rows == [("assigned", first.worker_id, None)] * 3
+
+    @pytest.mark.asyncio
+    async def test_task_from_another_replica_is_rebuilt_from_its_row(self, database):
+        creator = self._replica({"success": True})
+        dispatcher = self._replica({"success": True})
+        [task] = await creator.create_tasks([(AgentType.TESTER, {"objective": "remote"}, 2)])
+
+        assert await dispatcher._dispatch_claimed_tasks() == 1
+
+        bridged = dispatcher.github_service.create_bzzz_task_issue.await_args.args[0]
+        assert bridged["id"] == task.id
+        assert bridged["type"] is AgentType.TESTER
+        assert bridged["context"] == {"objective": "remote"}
+
+    @pytest.mark.asyncio
+    async def test_failed_bridge_keeps_the_lease_for_the_reaper(self, database):
+        coordinator = self._replica({"success": False, "error": "rate limited"})
+        await coordinator.create_tasks([(AgentType.TESTER, {"objective": "retry"}, 3)])
+
+        assert await coordinator._dispatch_claimed_tasks() == 1
+
+        async with AsyncSessionLocal() as db:
+            status, lease = (await db.execute(select(ORMTask.status, ORMTask.lease_expires_at))).one()
+        assert status == "assigned"
+        assert lease is not None
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(ORMTask).values(lease_expires_at=datetime(2000, 1, 1)))
+            await db.commit()
+        assert await coordinator.task_service.requeue_expired_leases() == 1
+        assert await coordinator._dispatch_claimed_tasks() == 1
+        assert coordinator.github_service.create_bzzz_task_issue.await_count == 2
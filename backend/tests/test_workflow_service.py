@@ -0,0 +1,136 @@
+"""
+Tests for workflow checkpointing and resume
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.database import AsyncSessionLocal
+from app.core.unified_coordinator_refactored import UnifiedCoordinatorRefactored
+from app.models.sqlalchemy_models import WorkflowCheckpoint, WorkflowStageCheckpoint
+from app.services.workflow_service import TaskStatus
+
+
+class TestWorkflowResume:
+
+    async def _replica(self):
+        """A coordinator as it comes up after a restart, bridging into a mock"""
+        coordinator = UnifiedCoordinatorRefactored()
+        coordinator.github_service = SimpleNamespace(
+            create_bzzz_task_issue=AsyncMock(return_value={"success": True})
+        )
+        await coordinator.workflow_service.initialize()
+        await coordinator._dispatch_ready_workflow_tasks()
+        await asyncio.sleep(0)
+        return coordinator
+
+    async def _expire_leases(self):
+        """Simulate the owning replica dying: it stops renewing its leases"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(WorkflowCheckpoint).values(lease_expires_at=datetime.utcnow() - timedelta(minutes=1)))
+            await db.commit()
+
+    def _bridged(self, coordinator):
+        return [call.args[0]["id"] for call in coordinator.github_service.create_bzzz_task_issue.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_restart_resumes_from_the_last_completed_stage(self, database):
+        first = await self._replica()
+        workflow_id = await first.submit_workflow({"tasks": [
+            {"type": "tester", "context": {"stage": "generate"}},
+            {"type": "tester", "context": {"stage": "review"}, "dependencies": [0]},
+            {"type": "tester", "context": {"stage": "test"}, "dependencies": [1]},
+        ]})
+        stages = [f"{workflow_id}_task_{i}" for i in range(3)]
+        await asyncio.sleep(0)
+        assert self._bridged(first) == stages[:1]
+
+        await first.update_task_status(stages[0], TaskStatus.COMPLETED, result={"code": "print(1)"})
+        await asyncio.sleep(0)
+        assert self._bridged(first) == stages[:2]
+
+        # The process dies while the second stage runs
+        await self._expire_leases()
+        second = await self._replica()
+
+        assert self._bridged(second) == [stages[1]]
+        resumed = {task.id: task for task in second.workflow_service.get_workflow_tasks(workflow_id)}
+        assert resumed[stages[0]].status == TaskStatus.COMPLETED
+        assert resumed[stages[0]].result == {"code": "print(1)"}
+
+        await second.update_task_status(stages[1], TaskStatus.COMPLETED, result={"approved": True})
+        await asyncio.sleep(0)
+        assert self._bridged(second) == stages[1:]
+
+        await second.update_task_status(stages[2], TaskStatus.COMPLETED, result={"passed": True})
+        async with AsyncSessionLocal() as db:
+            checkpoint = (await db.execute(select(WorkflowCheckpoint))).scalar_one()
+        assert checkpoint.status == "completed"
+        assert second.workflow_service.get_workflow_status(workflow_id)["completed"]
+
+    @pytest.mark.asyncio
+    async def test_stage_transitions_only_touch_the_stage_checkpoint(self, database):
+        coordinator = await self._replica()
+        coordinator.task_service.record_status = AsyncMock()
+        workflow_id = await coordinator.submit_workflow({"tasks": [{"type": "tester"}]})
+        stage = f"{workflow_id}_task_0"
+
+        await coordinator.update_task_status(stage, TaskStatus.COMPLETED, result={"passed": True})
+
+        coordinator.task_service.record_status.assert_not_awaited()
+        async with AsyncSessionLocal() as db:
+            checkpoint = (await db.execute(select(WorkflowStageCheckpoint))).scalar_one()
+        assert checkpoint.status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_each_resumed_stage_is_dispatched_by_one_replica(self, database):
+        first = await self._replica()
+        workflow_id = await first.submit_workflow({"tasks": [
+            {"type": "tester", "context": {"stage": "generate"}},
+            {"type": "tester", "context": {"stage": "review"}, "dependencies": [0]},
+            {"type": "tester", "context": {"stage": "lint"}, "dependencies": [0]},
+        ]})
+        stages = [f"{workflow_id}_task_{i}" for i in range(3)]
+        await first.update_task_status(stages[0], TaskStatus.COMPLETED, result={"code": "print(1)"})
+        await asyncio.sleep(0)
+
+        # A replica starting while the owner is alive leaves its workflow alone
+        bystander = await self._replica()
+        assert self._bridged(bystander) == []
+        assert not bystander.workflow_service.get_workflow_tasks(workflow_id)
+
+        # Once the owner dies, two replicas come up together and split the work
+        await self._expire_leases()
+        second, third = await self._replica(), await self._replica()
+
+        bridged = self._bridged(second) + self._bridged(third)
+        assert sorted(bridged) == stages[1:]
+        async with AsyncSessionLocal() as db:
+            checkpoint = (await db.execute(select(WorkflowCheckpoint))).scalar_one()
+        assert checkpoint.owner in (second.worker_id, third.worker_id)
+
+        # The old owner notices it lost the execution and stops driving it
+        await first.workflow_service.renew_execution_leases()
+        assert not first.workflow_service.get_workflow_tasks(workflow_id)
+
+    @pytest.mark.asyncio
+    async def test_renewal_rewrites_a_checkpoint_that_failed_to_insert(self, database):
+        coordinator = await self._replica()
+        service = coordinator.workflow_service
+        checkpoint_execution = service._checkpoint_execution
+        service._checkpoint_execution = AsyncMock(return_value=False)
+        workflow_id = await coordinator.submit_workflow({"tasks": [{"type": "tester"}]})
+        service._checkpoint_execution = checkpoint_execution
+
+        assert await service.renew_execution_leases() == 1
+
+        assert service.get_workflow_tasks(workflow_id)
+        async with AsyncSessionLocal() as db:
+            checkpoint = (await db.execute(select(WorkflowCheckpoint))).scalar_one()
+        assert checkpoint.owner == coordinator.worker_id